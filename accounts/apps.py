@@ -3,9 +3,14 @@ Accounts App Configuration
 """
 
 from django.apps import AppConfig
+from django.core import checks
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
     verbose_name = 'Citizen Accounts'
+
+    def ready(self):
+        from mcms_config.sessions import check_session_cache
+        checks.register(check_session_cache, checks.Tags.caches)
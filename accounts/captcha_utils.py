@@ -3,11 +3,27 @@ CAPTCHA Generator Utility
 Custom image-based CAPTCHA for security
 """
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import random
 import string
 import os
+from functools import lru_cache
 from django.conf import settings
+from mcms_config.media_layout import fanout
+from mcms_config.metrics import CAPTCHA_RENDER_LATENCY
+
+# PIL is imported on first use: most workers never render a CAPTCHA and
+# importing it at module level added ~30ms to every worker boot.
+
+
+@lru_cache(maxsize=1)
+def _captcha_font():
+    from PIL import ImageFont
+    
+    # Try to use a system font, fallback to default
+    try:
+        return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 40)
+    except OSError:
+        return ImageFont.load_default()
 
 
 class CaptchaGenerator:
@@ -29,6 +45,8 @@ class CaptchaGenerator:
         Create CAPTCHA image with text
         Returns: PIL Image object
         """
+        from PIL import Image, ImageDraw, ImageFilter
+        
         # Create image with white background
         image = Image.new('RGB', (width, height), color='white')
         draw = ImageDraw.Draw(image)
@@ -47,11 +65,7 @@ class CaptchaGenerator:
             y = random.randint(0, height)
             draw.point((x, y), fill='lightgray')
         
-        # Try to use a system font, fallback to default
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 40)
-        except:
-            font = ImageFont.load_default()
+        font = _captcha_font()
         
         # Calculate text position
         text_bbox = draw.textbbox((0, 0), text, font=font)
@@ -83,16 +97,15 @@ class CaptchaGenerator:
     @staticmethod
     def save_captcha(text, filename):
         """
-        Generate and save CAPTCHA image
+        Generate and save CAPTCHA image under MEDIA_ROOT/captcha
         Returns: filepath
         """
         image = CaptchaGenerator.create_captcha_image(text)
         
         # Ensure captcha directory exists
-        captcha_dir = os.path.join(settings.MEDIA_ROOT, 'captcha')
-        os.makedirs(captcha_dir, exist_ok=True)
+        filepath = os.path.join(settings.MEDIA_ROOT, 'captcha', filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        filepath = os.path.join(captcha_dir, filename)
         image.save(filepath)
         
         return filepath
@@ -100,10 +113,13 @@ class CaptchaGenerator:
     @staticmethod
     def generate_and_save(session_key):
         """
-        Generate CAPTCHA, save image, and return text and path
+        Generate CAPTCHA, save image, and return text and path relative
+        to MEDIA_ROOT/captcha
         """
         text = CaptchaGenerator.generate_captcha_text()
-        filename = f'captcha_{session_key}.png'
-        filepath = CaptchaGenerator.save_captcha(text, filename)
+        name = f'captcha_{session_key}.png'
+        filename = f'{fanout(name)}/{name}'
+        with CAPTCHA_RENDER_LATENCY.time():
+            filepath = CaptchaGenerator.save_captcha(text, filename)
         
         return text, filename
@@ -0,0 +1,184 @@
+"""
+Pick password hasher costs for a target login latency on this machine
+
+    python manage.py calibrate_hashers --target-ms 250 --write
+
+Times PBKDF2-SHA256 and hashlib scrypt as a login verifies them (one full
+hash per attempt) and chooses the highest cost that stays within the
+target, never below Django's defaults. --write stores the result in
+PASSWORD_HASHER_CALIBRATION; restart the workers to apply it. Citizens
+are re-hashed with the new parameters when they next log in; --status
+shows how many stored hashes are still waiting for that.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import statistics
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import Citizen
+from mcms_config.hashers import (
+    DEFAULTS, CalibratedPBKDF2PasswordHasher, CalibratedScryptPasswordHasher,
+)
+
+PASSWORD = 'calibration-Passw0rd'
+SALT = 'calibrationsalt0123456'
+
+# Never weaker than what Django ships with
+MIN_ITERATIONS = DEFAULTS['PBKDF2_ITERATIONS']
+MIN_WORK_FACTOR = DEFAULTS['SCRYPT_WORK_FACTOR']
+MAX_PARALLELISM = 16
+
+
+def median_ms(func, samples):
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PBKDF2 and scrypt here and choose costs for a target login latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250,
+                            help='Time one password check may take')
+        parser.add_argument('--samples', type=int, default=5, help='Hashes timed per candidate')
+        parser.add_argument('--algorithm', choices=['auto', 'pbkdf2_sha256', 'scrypt'], default='auto',
+                            help='Preferred hasher; auto picks scrypt (memory-hard) when available')
+        parser.add_argument('--max-memory-mb', type=int, default=128,
+                            help='Memory one scrypt hash may use')
+        parser.add_argument('--write', action='store_true',
+                            help='Save the result to PASSWORD_HASHER_CALIBRATION')
+        parser.add_argument('--json', action='store_true', help='Machine-readable output')
+        parser.add_argument('--status', action='store_true',
+                            help='Only count stored citizen hashes not yet on the preferred parameters')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            return self.status()
+
+        target, samples = options['target_ms'], max(options['samples'], 1)
+        results = {'pbkdf2_sha256': self.calibrate_pbkdf2(target, samples)}
+        if hasattr(hashlib, 'scrypt'):
+            results['scrypt'] = self.calibrate_scrypt(target, samples, options['max_memory_mb'])
+
+        algorithm = options['algorithm']
+        if algorithm == 'auto':
+            algorithm = 'scrypt' if 'scrypt' in results else 'pbkdf2_sha256'
+        elif algorithm not in results:
+            raise CommandError(f'{algorithm} is not available in this Python build')
+
+        calibration = {'ALGORITHM': algorithm}
+        for result in results.values():
+            calibration.update(result['params'])
+        calibration.update({
+            'target_ms': target,
+            'measured_ms': results[algorithm]['ms'],
+            'calibrated_at': timezone.now().isoformat(timespec='seconds'),
+            'host': platform.node(),
+            'cpus': os.cpu_count(),
+        })
+
+        if options['json']:
+            self.stdout.write(json.dumps({'calibration': calibration, 'results': results}, indent=2))
+        else:
+            self.stdout.write(f'Target login latency {target:g}ms (median of {samples} hashes):')
+            for name, result in results.items():
+                marker = '*' if name == algorithm else ' '
+                self.stdout.write(
+                    f"  {marker} {name:<14} {result['summary']:<34} {result['ms']:7.1f}ms "
+                    f"{1000 / result['ms']:6.1f} logins/s/core"
+                )
+                if result['ms'] > target * 1.1:
+                    self.stderr.write(f'    {name} cannot meet the target at the minimum cost')
+
+        if options['write']:
+            path = settings.PASSWORD_HASHER_CALIBRATION
+            path.write_text(json.dumps(calibration, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(
+                f'Wrote {path}; restart the workers to hash new passwords with {algorithm}'
+            ))
+
+    def calibrate_pbkdf2(self, target, samples):
+        hasher = CalibratedPBKDF2PasswordHasher()
+
+        def cost(iterations):
+            return median_ms(lambda: hasher.encode(PASSWORD, SALT, iterations), samples)
+
+        # Runtime is linear in the iteration count: extrapolate, then correct
+        probe = 100000
+        iterations = probe * target / cost(probe)
+        for attempt in range(3):
+            iterations = max(MIN_ITERATIONS, int(iterations // 10000) * 10000)
+            ms = cost(iterations)
+            if abs(ms - target) <= target * 0.05 or iterations == MIN_ITERATIONS or attempt == 2:
+                break
+            iterations *= target / ms
+        return {
+            'params': {'PBKDF2_ITERATIONS': iterations},
+            'summary': f'iterations={iterations}',
+            'ms': round(ms, 1),
+        }
+
+    def calibrate_scrypt(self, target, samples, max_memory_mb):
+        hasher = CalibratedScryptPasswordHasher()
+        r = DEFAULTS['SCRYPT_BLOCK_SIZE']
+
+        def cost(n, p):
+            return median_ms(lambda: hasher.encode(PASSWORD, SALT, n, r, p), samples)
+
+        # Memory is what makes scrypt expensive to attack: take the largest
+        # work factor that fits the target, then fill the remaining time
+        # with parallelism (extra rounds over the same memory)
+        n, ms = MIN_WORK_FACTOR, cost(MIN_WORK_FACTOR, 1)
+        while 128 * r * n * 2 <= max_memory_mb * 1024 * 1024:
+            doubled = cost(n * 2, 1)
+            if doubled > target:
+                break
+            n, ms = n * 2, doubled
+        p = max(1, min(MAX_PARALLELISM, int(target / ms)))
+        if p > 1:
+            ms = cost(n, p)
+            while p > 1 and ms > target * 1.05:
+                p -= 1
+                ms = cost(n, p)
+        return {
+            'params': {'SCRYPT_WORK_FACTOR': n, 'SCRYPT_BLOCK_SIZE': r, 'SCRYPT_PARALLELISM': p},
+            'summary': f'n={n} r={r} p={p} ({128 * r * n // 2 ** 20} MiB)',
+            'ms': round(ms, 1),
+        }
+
+    def status(self):
+        preferred = get_hasher('default')
+        current, stale = 0, Counter()
+        passwords = Citizen.objects.exclude(password__startswith='!').values_list('password', flat=True)
+        for encoded in passwords.iterator(chunk_size=5000):
+            try:
+                hasher = identify_hasher(encoded)
+            except ValueError:
+                stale['unrecognised'] += 1
+                continue
+            if hasher.algorithm == preferred.algorithm and not preferred.must_update(encoded):
+                current += 1
+                continue
+            decoded = hasher.decode(encoded)
+            params = ' '.join(
+                f'{key}={value}' for key, value in decoded.items()
+                if key not in ('algorithm', 'salt', 'hash')
+            )
+            stale[f'{hasher.algorithm} {params}'.strip()] += 1
+
+        self.stdout.write(f'Preferred hasher: {preferred.algorithm} ({current} citizens up to date)')
+        for label, count in stale.most_common():
+            self.stdout.write(f'  {count:8d}  {label}  (re-hashed at next login)')
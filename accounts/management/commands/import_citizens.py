@@ -0,0 +1,278 @@
+"""
+Bulk-import citizens from a CSV or JSONL file
+
+    python manage.py import_citizens residents.csv --report errors.csv
+
+Columns / keys: username, email, mobile and optionally password (plain
+text, hashed here), password_hash (already Django-encoded) and is_verified.
+Rows without a password get an unusable one and must reset it.
+Validation follows CitizenRegistrationForm; failing rows are written to
+the report and every valid row is imported.
+"""
+
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from accounts.models import Citizen
+
+USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+MOBILE_RE = re.compile(r'^[6-9]\d{9}$')
+UNIQUE_FIELDS = ('username', 'email', 'mobile')
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+# SQLite allows 999 bound parameters per statement in older builds
+LOOKUP_CHUNK = 900
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mcms_config.settings')
+        django.setup()
+
+
+def _hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def read_rows(path, fmt):
+    """Yield (line_number, dict) from a CSV or JSONL file"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, {'__error__': f'Invalid JSON: {e}'}
+                    continue
+                yield line_number, row if isinstance(row, dict) else {'__error__': 'Expected a JSON object'}
+
+
+def existing_values(field, values):
+    """Set-based uniqueness check: which of `values` are already taken"""
+    values = list(values)
+    taken = set()
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        chunk = values[start:start + LOOKUP_CHUNK]
+        taken.update(
+            Citizen.objects.filter(**{f'{field}__in': chunk}).values_list(field, flat=True)
+        )
+    return taken
+
+
+class Command(BaseCommand):
+    help = 'Import citizens in bulk from CSV or JSONL with a per-row error report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Defaults to the file extension')
+        parser.add_argument('--report', help='Write rejected rows to this CSV file')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes used for password hashing')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per INSERT transaction')
+        parser.add_argument('--skip-password-validation', action='store_true',
+                            help='Do not run AUTH_PASSWORD_VALIDATORS on plain-text passwords')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        started = time.monotonic()
+
+        self.errors = []
+        rows = self.validate(read_rows(path, fmt), options)
+        rows = self.check_uniqueness(rows)
+        self.stdout.write(
+            f'Validated in {time.monotonic() - started:.1f}s: '
+            f'{len(rows)} valid, {len(self.errors)} rejected'
+        )
+
+        imported = 0
+        if rows and not options['dry_run']:
+            self.hash_passwords(rows, options['workers'])
+            imported = self.insert(rows, options['batch_size'])
+
+        if options['report']:
+            with open(options['report'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'username', 'field', 'error'])
+                writer.writerows(sorted(self.errors, key=lambda error: error[0]))
+            self.stdout.write(f"Error report written to {options['report']}")
+        else:
+            for line, username, field, error in sorted(self.errors)[:20]:
+                self.stderr.write(f'  line {line} ({username}): {field}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} citizens in {time.monotonic() - started:.1f}s '
+            f'({len(self.errors)} rows rejected)'
+        ))
+
+    def reject(self, line, row, field, message):
+        self.errors.append((line, row.get('username', ''), field, message))
+
+    def validate(self, source, options):
+        """Per-row checks that need no database access"""
+        valid = []
+        for line, raw in source:
+            if '__error__' in raw:
+                self.reject(line, raw, 'row', raw['__error__'])
+                continue
+            row = {key: str(value).strip() for key, value in raw.items() if key and value is not None}
+            problems = []
+
+            username = row.get('username', '')
+            if not username:
+                problems.append(('username', 'Username is required'))
+            elif len(username) > 150 or not USERNAME_RE.match(username):
+                problems.append(('username', 'Username can only contain letters, numbers, and underscores.'))
+
+            email = BaseUserManager.normalize_email(row.get('email', ''))
+            try:
+                validate_email(email)
+            except ValidationError:
+                problems.append(('email', 'Enter a valid email address.'))
+
+            mobile = row.get('mobile', '')
+            if not MOBILE_RE.match(mobile):
+                problems.append(('mobile', 'Enter a valid 10-digit Indian mobile number starting with 6-9.'))
+
+            password, password_hash = row.get('password', ''), row.get('password_hash', '')
+            if password_hash:
+                try:
+                    identify_hasher(password_hash)
+                except ValueError:
+                    problems.append(('password_hash', 'Unknown password hash format'))
+            elif password and not options['skip_password_validation']:
+                try:
+                    validate_password(password, Citizen(username=username, email=email, mobile=mobile))
+                except ValidationError as e:
+                    problems.append(('password', ' '.join(e.messages)))
+
+            if problems:
+                for field, message in problems:
+                    self.reject(line, row, field, message)
+                continue
+
+            valid.append({
+                'line': line,
+                'username': username,
+                'email': email,
+                'mobile': mobile,
+                'password': password,
+                'password_hash': password_hash,
+                'is_verified': row.get('is_verified', '').lower() in TRUE_VALUES,
+            })
+        return valid
+
+    def check_uniqueness(self, rows):
+        """Reject duplicates within the file and values already registered"""
+        first_seen = {field: {} for field in UNIQUE_FIELDS}
+        taken = {
+            field: existing_values(field, {row[field] for row in rows})
+            for field in UNIQUE_FIELDS
+        }
+        unique = []
+        for row in rows:
+            ok = True
+            for field in UNIQUE_FIELDS:
+                value = row[field]
+                if value in taken[field]:
+                    self.reject(row['line'], row, field, f'{field.capitalize()} already registered.')
+                    ok = False
+                elif value in first_seen[field]:
+                    self.reject(
+                        row['line'], row, field,
+                        f'Duplicate of line {first_seen[field][value]} in this file.',
+                    )
+                    ok = False
+            if ok:
+                for field in UNIQUE_FIELDS:
+                    first_seen[field][row[field]] = row['line']
+                unique.append(row)
+        return unique
+
+    def hash_passwords(self, rows, workers):
+        pending = [row for row in rows if row['password'] and not row['password_hash']]
+        for row in rows:
+            if not row['password'] and not row['password_hash']:
+                row['password_hash'] = make_password(None)
+        if not pending:
+            return
+
+        started = time.monotonic()
+        passwords = [row['password'] for row in pending]
+        chunk = 64
+        chunks = [passwords[i:i + chunk] for i in range(0, len(passwords), chunk)]
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                hashed = [h for result in pool.map(_hash_passwords, chunks) for h in result]
+        else:
+            hashed = _hash_passwords(passwords)
+        for row, password_hash in zip(pending, hashed):
+            row['password_hash'] = password_hash
+        self.stdout.write(
+            f'Hashed {len(pending)} passwords in {time.monotonic() - started:.1f}s '
+            f'({workers} worker{"s" if workers != 1 else ""})'
+        )
+
+    def build(self, row):
+        return Citizen(
+            username=row['username'],
+            email=row['email'],
+            mobile=row['mobile'],
+            password=row['password_hash'],
+            is_verified=row['is_verified'],
+        )
+
+    def insert(self, rows, batch_size):
+        imported = 0
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            try:
+                with transaction.atomic():
+                    Citizen.objects.bulk_create([self.build(row) for row in batch])
+                imported += len(batch)
+            except IntegrityError:
+                # Someone registered one of these meanwhile: re-check this batch
+                remaining = self.check_uniqueness(batch)
+                try:
+                    with transaction.atomic():
+                        Citizen.objects.bulk_create([self.build(row) for row in remaining])
+                    imported += len(remaining)
+                except IntegrityError:
+                    imported += self.insert_one_by_one(remaining)
+        return imported
+
+    def insert_one_by_one(self, rows):
+        """Still conflicting after the re-check: insert each row alone, rejecting the ones that fail"""
+        imported = 0
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    self.build(row).save()
+                imported += 1
+            except IntegrityError:
+                self.reject(row['line'], row, 'row', 'Conflicts with a citizen registered during the import.')
+        return imported
@@ -4,19 +4,20 @@ Routing for citizen authentication
 """
 
 from django.urls import path
+from mcms_config.middleware import query_budget
 from . import views
 
 app_name = 'accounts'
 
 urlpatterns = [
     # Registration
-    path('register/', views.citizen_register, name='register'),
+    path('register/', query_budget(10)(views.citizen_register), name='register'),
     # OTP verification removed - users are verified on registration
     
     # Login/Logout
-    path('login/', views.citizen_login, name='login'),
-    path('logout/', views.citizen_logout, name='logout'),
+    path('login/', query_budget(10)(views.citizen_login), name='login'),
+    path('logout/', query_budget(6)(views.citizen_logout), name='logout'),
     
     # CAPTCHA
-    path('refresh-captcha/', views.refresh_captcha, name='refresh_captcha'),
+    path('refresh-captcha/', query_budget(6)(views.refresh_captcha), name='refresh_captcha'),
 ]
@@ -10,6 +10,7 @@ from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
 from django.urls import reverse
+from mcms_config.metrics import EMAIL_SEND_LATENCY
 from .models import Citizen, LoginAttempt
 from .forms import CitizenRegistrationForm, CitizenLoginForm, OTPVerificationForm
 from .captcha_utils import CaptchaGenerator
@@ -148,13 +149,14 @@ def resend_otp(request):
         otp = user.generate_otp()
         
         # Send OTP via email
-        send_mail(
-            subject='MCMS - Email Verification OTP (Resend)',
-            message=f'Your new OTP for email verification is: {otp}\n\nThis OTP is valid for 10 minutes.\n\nMunicipal Complaint Management System',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
+        with EMAIL_SEND_LATENCY.time(kind='otp'):
+            send_mail(
+                subject='MCMS - Email Verification OTP (Resend)',
+                message=f'Your new OTP for email verification is: {otp}\n\nThis OTP is valid for 10 minutes.\n\nMunicipal Complaint Management System',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+                fail_silently=False,
+            )
         
         messages.success(request, 'OTP resent successfully! Check your email.')
     
@@ -13,6 +13,7 @@ class MunicipalOfficerAdmin(admin.ModelAdmin):
     """
     
     list_display = ['employee_id', 'user', 'designation', 'role', 'department', 'is_active']
+    list_select_related = ['user', 'department']
     list_filter = ['role', 'department', 'is_active']
     search_fields = ['employee_id', 'user__username', 'designation']
     ordering = ['employee_id']
@@ -0,0 +1,178 @@
+"""
+Resolution Time Analytics
+Median, p90 and p99 time to review, resolve and close complaints per
+department, ward or officer, computed in SQL from daily log-scale
+histograms: rolled up into ResolutionTimeBucket by
+`manage.py rollup_resolution_times`, and taken straight from the complaints
+for days outside the range the rollup covers
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import CharField, Count, F, FloatField, Func, IntegerField, Max, Min, Value
+from django.db.models.functions import Cast, Floor, Greatest, Log, TruncDate
+from django.utils import timezone
+
+from complaints.models import Complaint
+from .models import ResolutionTimeBucket
+
+DIMENSIONS = {
+    'department': 'department_id',
+    'ward': 'ward_number',
+    'officer': 'officer_id',
+}
+
+# Metric -> timestamp it measures from submitted_at
+METRICS = {
+    'review': 'reviewed_at',
+    'resolve': 'resolved_at',
+    'close': 'closed_at',
+}
+
+PERCENTILES = {'median': 0.5, 'p90': 0.9, 'p99': 0.99}
+
+# Buckets are 1/8 of a doubling wide, so a bucket's midpoint is within
+# 4.5% of every duration counted in it
+BUCKETS_PER_DOUBLING = 8
+
+HISTOGRAM_COLUMNS = ['day', 'dimension', 'key', 'metric', 'bucket', 'count']
+
+
+def bucket_seconds(bucket):
+    """Representative duration of a bucket (its geometric midpoint), in seconds"""
+    return 2 ** ((bucket + 0.5) / BUCKETS_PER_DOUBLING)
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def histogram(first_day, last_day, dimensions=DIMENSIONS):
+    """
+    Histogram rows (HISTOGRAM_COLUMNS) of the live complaints submitted from
+    first_day to last_day, computed by the database in one query
+    """
+    complaints = Complaint.objects.live().filter(
+        submitted_at__gte=_day_start(first_day),
+        submitted_at__lt=_day_start(last_day + timedelta(days=1)),
+    )
+    parts = []
+    for dimension in dimensions:
+        column = DIMENSIONS[dimension]
+        for metric, reached in METRICS.items():
+            seconds = (
+                Func(F(reached), function='JULIANDAY', output_field=FloatField())
+                - Func(F('submitted_at'), function='JULIANDAY', output_field=FloatField())
+            ) * 86400
+            parts.append(
+                complaints.filter(**{f'{reached}__isnull': False, f'{column}__isnull': False})
+                .annotate(
+                    day=TruncDate('submitted_at'),
+                    dimension=Value(dimension),
+                    key=Cast(column, CharField()),
+                    metric=Value(metric),
+                    bucket=Floor(
+                        Log(2, Greatest(seconds, 1)) * BUCKETS_PER_DOUBLING, output_field=IntegerField(),
+                    ),
+                )
+                .order_by()
+                .values(*HISTOGRAM_COLUMNS[:-1])
+                .annotate(count=Count('id'))
+            )
+    return parts[0].union(*parts[1:], all=True)
+
+
+def rollup(first_day, last_day):
+    """Recompute the ResolutionTimeBucket rows of submission days first_day..last_day"""
+    using = router.db_for_write(ResolutionTimeBucket)
+    connection = connections[using]
+    sql, params = histogram(first_day, last_day).query.get_compiler(using).as_sql()
+    columns = ', '.join(connection.ops.quote_name(name) for name in HISTOGRAM_COLUMNS)
+    with transaction.atomic(using):
+        ResolutionTimeBucket.objects.using(using).filter(day__range=(first_day, last_day)).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {ResolutionTimeBucket._meta.db_table} ({columns}) {sql}', params,
+            )
+            return cursor.rowcount
+
+
+def rolled_up_range():
+    """
+    (first, last) submission days of the rollup, or None. The rollup command
+    keeps the days it has covered contiguous, so every day in between is in it.
+    """
+    days = ResolutionTimeBucket.objects.aggregate(first=Min('day'), last=Max('day'))
+    return (days['first'], days['last']) if days['last'] else None
+
+
+def resolution_times(first_day, last_day, dimension):
+    """
+    {key: {metric: {'count': n, 'median': seconds, 'p90': ..., 'p99': ...}}}
+    for the complaints submitted from first_day to last_day, grouped by
+    `dimension`. Days in rolled_up_range() are read from the rollup (as
+    fresh as its last run), days before and after it from the complaints.
+    """
+    covered = rolled_up_range()
+    # The rollup and the complaints are read together, from the database
+    # the router picks for reads (the replica inside @use_read_replica views)
+    using = router.db_for_read(ResolutionTimeBucket if covered else Complaint)
+    if covered:
+        rolled_first, rolled_last = max(first_day, covered[0]), min(last_day, covered[1])
+        live_ranges = [
+            (first_day, covered[0] - timedelta(days=1)),
+            (covered[1] + timedelta(days=1), last_day),
+        ]
+    else:
+        rolled_first, rolled_last = None, None
+        live_ranges = [(first_day, last_day)]
+
+    ctes, parts, params = [], [], []
+    for n, (live_first, live_last) in enumerate(live_ranges):
+        if live_first > live_last:
+            continue
+        live_sql, live_params = histogram(live_first, live_last, [dimension]).query.get_compiler(using).as_sql()
+        ctes.append(f'live{n}(day, dimension, "key", metric, bucket, "count") AS ({live_sql})')
+        parts.append(f'SELECT "key", metric, bucket, "count" FROM live{n}')
+        params += live_params
+    if rolled_first and rolled_first <= rolled_last:
+        # Aggregated apart from the live rows: in resolution_buckets_report_idx
+        # order, so SQLite streams the GROUP BY instead of sorting the rows
+        parts.append(f'''
+            SELECT "key", metric, bucket, SUM("count")
+            FROM {ResolutionTimeBucket._meta.db_table}
+            WHERE dimension = %s AND day BETWEEN %s AND %s
+            GROUP BY "key", metric, bucket
+        ''')
+        params += [dimension, rolled_first.isoformat(), rolled_last.isoformat()]
+
+    # Running totals over the buckets in duration order; a percentile is
+    # the first bucket whose running total reaches that share of the total
+    percentiles = ', '.join(
+        f'MIN(CASE WHEN running >= {share} * total THEN bucket END)' for share in PERCENTILES.values()
+    )
+    ctes += [
+        f'''counts("key", metric, bucket, n) AS ({' UNION ALL '.join(parts)})''',
+        '''cumulative AS (
+            SELECT "key", metric, bucket,
+                SUM(SUM(n)) OVER (PARTITION BY "key", metric ORDER BY bucket) AS running,
+                SUM(SUM(n)) OVER (PARTITION BY "key", metric) AS total
+            FROM counts
+            GROUP BY "key", metric, bucket
+        )''',
+    ]
+    sql = f'''
+        WITH {', '.join(ctes)}
+        SELECT "key", metric, MAX(total), {percentiles}
+        FROM cumulative
+        GROUP BY "key", metric
+    '''
+    results = {}
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        for key, metric, count, *buckets in cursor.fetchall():
+            results.setdefault(key, {})[metric] = dict(
+                count=count, **{name: bucket_seconds(b) for name, b in zip(PERCENTILES, buckets)},
+            )
+    return results
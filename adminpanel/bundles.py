@@ -0,0 +1,114 @@
+"""
+Proof Bundles
+Streams the proof and resolution files of a set of complaints as one ZIP
+archive, written on the fly: memory use is one file chunk, whatever the
+size of the archive
+"""
+
+import csv
+import io
+import os
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from mcms_config import media_layout
+
+# Already compressed: deflating them again costs CPU and saves nothing
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.pdf'}
+CHUNK_SIZE = 64 * 1024
+
+MANIFEST_FIELDS = [
+    'complaint_id', 'department', 'ward_number', 'status', 'submitted_at',
+    'kind', 'path', 'size', 'note',
+]
+
+
+class _Spool:
+    """
+    Write-only, unseekable file for ZipFile. Without seek() ZipFile streams:
+    sizes and CRCs follow each entry in a data descriptor.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _zip_info(arcname, modified):
+    info = zipfile.ZipInfo(arcname, date_time=timezone.localtime(modified).timetuple()[:6])
+    ext = os.path.splitext(arcname)[1].lower()
+    info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def bundle_entries(rows):
+    """
+    (complaint row, kind, media name) for every file attached to `rows`,
+    which are dicts with complaint_id, proof_file and resolution_proof
+    """
+    for row in rows:
+        for kind, field in (('proof', 'proof_file'), ('resolution', 'resolution_proof')):
+            if row[field]:
+                yield row, kind, row[field]
+
+
+def stream_bundle(rows):
+    """
+    Generate the bytes of a ZIP holding every file of `rows` under
+    <complaint_id>/<kind>/<file name>, followed by manifest.csv listing each
+    file and any that could not be read
+    """
+    spool = _Spool()
+    manifest = io.StringIO()
+    writer = csv.DictWriter(manifest, fieldnames=MANIFEST_FIELDS)
+    writer.writeheader()
+
+    with zipfile.ZipFile(spool, 'w', allowZip64=True) as archive:
+        for row, kind, name in bundle_entries(rows):
+            record = {
+                'complaint_id': row['complaint_id'],
+                'department': row['department__code'],
+                'ward_number': row['ward_number'],
+                'status': row['status'],
+                'submitted_at': timezone.localtime(row['submitted_at']).isoformat(),
+                'kind': kind,
+            }
+            # Files may be mid-migration between media layouts
+            resolved = media_layout.resolve(name)
+            if resolved is None:
+                writer.writerow({**record, 'path': '', 'size': '', 'note': f'missing: {name}'})
+                continue
+
+            arcname = f"{row['complaint_id']}/{kind}/{os.path.basename(resolved)}"
+            size = 0
+            with default_storage.open(resolved, 'rb') as source:
+                info = _zip_info(arcname, default_storage.get_modified_time(resolved))
+                with archive.open(info, 'w') as dest:
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                        dest.write(chunk)
+                        size += len(chunk)
+                        yield spool.drain()
+            writer.writerow({**record, 'path': arcname, 'size': size, 'note': ''})
+            yield spool.drain()
+
+        archive.writestr(_zip_info('manifest.csv', timezone.now()), manifest.getvalue())
+    yield spool.drain()
@@ -5,7 +5,11 @@ Admin authentication and complaint management
 
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm
+from django.urls import reverse_lazy
+from django.utils.dateparse import parse_datetime
+from complaints.forms import ResumableUploadMixin
 from complaints.models import Complaint
+from complaints.transitions import allowed_statuses
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -31,7 +35,7 @@ class AdminLoginForm(AuthenticationForm):
     )
 
 
-class UpdateComplaintStatusForm(forms.ModelForm):
+class UpdateComplaintStatusForm(ResumableUploadMixin, forms.ModelForm):
     """
     Form to update complaint status and add remarks
     """
@@ -68,9 +72,47 @@ class UpdateComplaintStatusForm(forms.ModelForm):
 
     resolution_proof = forms.FileField(
         required=False,
-        widget=forms.ClearableFileInput(attrs={'class': 'form-input'})
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-input',
+            'data-resumable-upload': reverse_lazy('complaints:upload_create'),
+            'data-token-field': 'resolution_upload',
+        })
     )
     
+    resolution_upload = forms.CharField(required=False, widget=forms.HiddenInput)
+    
+    # last_updated of the complaint as loaded, checked when saving
+    version = forms.CharField(required=False, widget=forms.HiddenInput)
+    
+    upload_fields = {'resolution_upload': 'resolution_proof'}
+    
     class Meta:
         model = Complaint
         fields = ['status', 'official_remarks', 'officer', 'resolution_notes', 'resolution_proof']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['status'].choices = [
+                choice for choice in Complaint.STATUS_CHOICES
+                if choice[0] in allowed_statuses(self.instance.status)
+            ]
+            self.initial['version'] = self.instance.last_updated.isoformat()
+    
+    def clean_version(self):
+        version = self.cleaned_data['version']
+        seen = parse_datetime(version) if version else None
+        if version and seen is None:
+            raise forms.ValidationError('Reload the complaint and try again.')
+        return seen
+    
+    def changes(self):
+        """The model fields the officer changed, with their new values"""
+        changed = {
+            name: self.cleaned_data[name]
+            for name in self.changed_data if name in self._meta.fields
+        }
+        for token_field, file_field in self.upload_fields.items():
+            if self.cleaned_data.get(token_field) and file_field not in changed:
+                changed[file_field] = self.cleaned_data[file_field]
+        return changed
@@ -0,0 +1,161 @@
+"""
+Admin Panel Live Updates
+Server-Sent Events for the admin dashboard, fed by one in-process broadcaster
+"""
+
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, Max
+
+from complaints.models import Complaint
+
+logger = logging.getLogger('mcms.live')
+
+
+def dashboard_counters():
+    """
+    Counters shown on the admin dashboard, computed in a single aggregate query
+    """
+    by_status = dict(
+        Complaint.objects.live()
+        .order_by()
+        .values_list('status')
+        .annotate(count=Count('id'))
+    )
+
+    counters = {
+        f'status_{code.lower()}': by_status.get(code, 0)
+        for code, _ in Complaint.STATUS_CHOICES
+    }
+    total = sum(by_status.values())
+    resolved = by_status.get('RESOLVED', 0) + by_status.get('CLOSED', 0)
+    counters.update(total=total, pending=total - resolved, resolved=resolved)
+    return counters
+
+
+def diff_counters(old, new):
+    """Return only the counters whose value changed"""
+    if old is None:
+        return dict(new)
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+
+def format_event(event, data):
+    """Encode one SSE frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class DashboardBroadcaster:
+    """
+    Polls the database once per interval on behalf of every connected
+    dashboard and fans the resulting events out to subscriber queues.
+    The poller only runs while at least one dashboard is connected.
+    """
+
+    def __init__(self, interval=2.0, queue_size=64):
+        self.interval = interval
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._task = None
+        self._loop = None
+        self._counters = None
+        self._last_id = None
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        """Register a dashboard and start the poller if needed"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Event loop changed (e.g. server reload); start from scratch
+            self._subscribers = set()
+            self._task = None
+            self._loop = loop
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def snapshot(self):
+        """Full counter state for a newly connected dashboard"""
+        if self._counters is None:
+            return None
+        return format_event('counters', self._counters)
+
+    def publish(self, event, data):
+        payload = format_event(event, data)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and resync it with full state
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot() or payload)
+
+    def _collect(self):
+        close_old_connections()
+        try:
+            counters = dashboard_counters()
+            if self._last_id is None:
+                latest = Complaint.objects.aggregate(latest=Max('id'))['latest']
+                return counters, [], latest or 0
+
+            new_complaints = list(
+                Complaint.objects.live().filter(id__gt=self._last_id)
+                .order_by('id')
+                .values(
+                    'id', 'complaint_id', 'subject', 'status',
+                    'department__name', 'citizen__username', 'proof_file',
+                )[:20]
+            )
+            last_id = new_complaints[-1]['id'] if new_complaints else self._last_id
+            return counters, new_complaints, last_id
+        finally:
+            close_old_connections()
+
+    async def poll(self):
+        """Run one polling round and publish whatever changed"""
+        counters, new_complaints, last_id = await sync_to_async(self._collect)()
+        self._last_id = last_id
+
+        delta = diff_counters(self._counters, counters)
+        self._counters = counters
+        if delta:
+            self.publish('counters', delta)
+        for row in new_complaints:
+            self.publish('complaint', row)
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                await self.poll()
+            except Exception:
+                # Keep the stream alive through transient DB errors
+                logger.exception('Dashboard broadcaster poll failed')
+            await asyncio.sleep(self.interval)
+
+
+_broadcaster = None
+
+
+def get_broadcaster():
+    """Process-wide broadcaster shared by all dashboard streams"""
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = DashboardBroadcaster(
+            interval=getattr(settings, 'ADMIN_LIVE_POLL_INTERVAL', 2.0),
+        )
+    return _broadcaster
@@ -0,0 +1,138 @@
+"""
+Profile worker boot: time from process start to first request served, and
+`-X importtime` totals summarised per project app / third-party package
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter; prints phase timestamps (time.time()) as JSON
+BOOT_SCRIPT = """
+import json, os, sys, time
+marks = {}
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', %(settings)r)
+import django
+django.setup()
+marks['setup'] = time.time()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+marks['wsgi'] = time.time()
+from django.urls import get_resolver
+get_resolver().url_patterns
+marks['urlconf'] = time.time()
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': %(path)r, 'REQUEST_METHOD': 'GET', 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(application(environ, lambda s, h, *a: status.append(s)))
+marks['first_request'] = time.time()
+marks['status'] = status[0]
+sys.stdout.write(json.dumps(marks))
+"""
+
+PHASES = [
+    ('setup', 'interpreter + django.setup()'),
+    ('wsgi', 'WSGI handler + middleware'),
+    ('urlconf', 'URLconf and views'),
+    ('first_request', 'first request served'),
+]
+
+
+def parse_importtime(stderr):
+    """(module, self_us) pairs from -X importtime output"""
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        yield name.strip(), int(self_us)
+
+
+def package_of(module, project_apps):
+    top = module.split('.')[0]
+    if top in project_apps:
+        return f'{top} (project)'
+    if top in sys.stdlib_module_names:
+        return 'stdlib'
+    return top
+
+
+class Command(BaseCommand):
+    help = 'Measure time to first request and import cost per app'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/',
+                            help='URL served as the first request (note that login and '
+                                 'register pages write a session and a CAPTCHA image)')
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Boots to time (median is reported)')
+        parser.add_argument('--top', type=int, default=15,
+                            help='Packages shown in the import breakdown')
+        parser.add_argument('--json', action='store_true', help='Machine-readable output')
+
+    def boot(self, path, importtime=False):
+        script = BOOT_SCRIPT % {
+            'settings': os.environ.get('DJANGO_SETTINGS_MODULE', 'mcms_config.settings'),
+            'path': path,
+        }
+        command = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', script]
+        started = time.time()
+        proc = subprocess.run(
+            command, cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr else 'boot failed')
+        marks = json.loads(proc.stdout.strip().splitlines()[-1])
+        timings = {phase: (marks[phase] - started) * 1000 for phase, _ in PHASES}
+        return timings, marks['status'], proc.stderr
+
+    def handle(self, *args, **options):
+        runs = [self.boot(options['path']) for _ in range(max(options['runs'], 1))]
+        phases = {
+            phase: statistics.median(timings[phase] for timings, _, _ in runs)
+            for phase, _ in PHASES
+        }
+        status = runs[0][1]
+
+        _, _, stderr = self.boot(options['path'], importtime=True)
+        project_apps = {app.split('.')[0] for app in settings.INSTALLED_APPS} | {'mcms_config'}
+        project_apps = {app for app in project_apps if app != 'django'}
+        packages = {}
+        heaviest = {}
+        for module, self_us in parse_importtime(stderr):
+            package = package_of(module, project_apps)
+            packages[package] = packages.get(package, 0) + self_us
+            if self_us > heaviest.get(package, ('', 0))[1]:
+                heaviest[package] = (module, self_us)
+        ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'path': options['path'],
+                'status': status,
+                'phases_ms': {phase: round(value, 1) for phase, value in phases.items()},
+                'imports_ms': {package: round(us / 1000, 1) for package, us in ranked},
+            }, indent=2))
+            return
+
+        self.stdout.write(f"Boot to first request ({options['path']}, {status}), "
+                          f"median of {len(runs)} runs:")
+        previous = 0.0
+        for phase, label in PHASES:
+            self.stdout.write(f'  {label:<32} {phases[phase]:8.1f}ms  (+{phases[phase] - previous:.1f}ms)')
+            previous = phases[phase]
+
+        total = sum(packages.values()) or 1
+        self.stdout.write('\nImport time by package (-X importtime self time):')
+        for package, us in ranked[:options['top']]:
+            module, module_us = heaviest[package]
+            self.stdout.write(
+                f'  {package:<28} {us / 1000:7.1f}ms {us * 100 / total:5.1f}%  '
+                f'heaviest: {module} ({module_us / 1000:.1f}ms)'
+            )
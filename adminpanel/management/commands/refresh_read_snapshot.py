@@ -0,0 +1,43 @@
+"""
+Refresh the read-replica snapshot used when READ_REPLICA['MODE'] is 'snapshot'
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from mcms_config.routers import refresh_snapshot, replica_settings, snapshot_age
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database to the read-replica snapshot file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running and refresh every INTERVAL seconds',
+        )
+
+    def handle(self, *args, **options):
+        if replica_settings().get('MODE') != 'snapshot':
+            raise CommandError("READ_REPLICA['MODE'] is not 'snapshot'; nothing to refresh.")
+
+        interval = options['interval']
+        max_staleness = replica_settings().get('MAX_STALENESS', 60)
+        if interval and interval >= max_staleness:
+            self.stderr.write(self.style.WARNING(
+                f'Interval {interval}s is not below MAX_STALENESS ({max_staleness}s); '
+                'reads will fall back to the primary between refreshes.'
+            ))
+
+        while True:
+            started = time.monotonic()
+            refresh_snapshot()
+            self.stdout.write(
+                f'Snapshot refreshed in {time.monotonic() - started:.2f}s '
+                f'(age {snapshot_age():.1f}s)'
+            )
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,60 @@
+"""
+Roll complaint resolution times up into the daily histograms behind the
+resolution report (adminpanel.analytics)
+
+    python manage.py rollup_resolution_times          # nightly: the last 90 days
+    python manage.py rollup_resolution_times --all
+
+Complaints are reviewed, resolved and closed days after they are submitted,
+so each run recomputes the last --days submission days up to yesterday,
+reaching further back when needed to leave no gap after the days already
+rolled up. The report reads days outside the rolled-up range from the
+complaints.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from adminpanel.analytics import rolled_up_range, rollup
+from complaints.models import Complaint
+from mcms_config import viewcache
+
+# Days recomputed per transaction, so the write lock is held briefly
+CHUNK_DAYS = 31
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily resolution-time histograms of recent (or all) complaints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Submission days to recompute (default 90)')
+        parser.add_argument('--all', action='store_true', help='Recompute every day since the first complaint')
+
+    def handle(self, *args, **options):
+        last_day = timezone.localdate() - timedelta(days=1)
+        first_day = last_day - timedelta(days=options['days'] - 1)
+        if options['all']:
+            first = Complaint.objects.aggregate(first=Min('submitted_at'))['first']
+            if first is None:
+                self.stdout.write('No complaints to roll up.')
+                return
+            first_day = timezone.localtime(first).date()
+        covered = rolled_up_range()
+        if covered:
+            first_day = min(first_day, covered[1] + timedelta(days=1))
+
+        started = time.monotonic()
+        rows = 0
+        day = first_day
+        while day <= last_day:
+            chunk_end = min(day + timedelta(days=CHUNK_DAYS - 1), last_day)
+            rows += rollup(day, chunk_end)
+            day = chunk_end + timedelta(days=1)
+        viewcache.invalidate('reports')
+        self.stdout.write(
+            f'Rolled up {first_day} to {last_day}: {rows} histogram rows in {time.monotonic() - started:.1f}s'
+        )
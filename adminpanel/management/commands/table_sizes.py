@@ -0,0 +1,73 @@
+"""
+Report the on-disk size of tables and indexes, optionally against an earlier report
+
+    python manage.py table_sizes --json > before.json
+    python manage.py migrate
+    python manage.py table_sizes --compare before.json
+
+Sizes come from SQLite's dbstat virtual table (pages actually in use, so
+free pages left by a migration do not count; VACUUM to return them).
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+
+def table_sizes(tables=None):
+    """{name: {'table': ..., 'kind': 'table' or 'index', 'bytes': ...}}"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT s.name, m.tbl_name, m.type, SUM(s.pgsize) "
+            "FROM dbstat s JOIN sqlite_master m ON m.name = s.name "
+            "GROUP BY s.name"
+        )
+        rows = cursor.fetchall()
+    return {
+        name: {'table': table, 'kind': kind, 'bytes': size}
+        for name, table, kind, size in rows
+        if not tables or table in tables
+    }
+
+
+def _mib(size):
+    return f'{size / (1024 * 1024):9.2f} MiB'
+
+
+class Command(BaseCommand):
+    help = 'Show table and index sizes of the SQLite database, or compare them with a saved --json report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tables', nargs='*', help='Limit to these tables (default: all)')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+        parser.add_argument('--compare', metavar='REPORT', help='A --json report to compare against')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('table_sizes reads SQLite dbstat; use your database\'s own tools.')
+        try:
+            sizes = table_sizes(options['tables'])
+        except OperationalError:
+            raise CommandError('This SQLite build has no dbstat virtual table.')
+
+        if options['json']:
+            self.stdout.write(json.dumps(sizes, indent=2, sort_keys=True))
+            return
+
+        before = {}
+        if options['compare']:
+            with open(options['compare']) as f:
+                before = json.load(f)
+
+        for name in sorted(set(sizes) | set(before), key=lambda n: (sizes.get(n) or before[n])['table'] + n):
+            entry = sizes.get(name) or before[name]
+            line = f"{entry['kind']:<6} {name:<45} {_mib(sizes.get(name, {}).get('bytes', 0))}"
+            if before:
+                old = before.get(name, {}).get('bytes', 0)
+                new = sizes.get(name, {}).get('bytes', 0)
+                change = f'{(new - old) / old:+7.1%}' if old else '    new'
+                line += f'  was {_mib(old)}  {change}'
+            self.stdout.write(line)
+        total = sum(entry['bytes'] for entry in sizes.values())
+        self.stdout.write(f'{"total":<52} {_mib(total)}')
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResolutionTimeBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(db_index=True)),
+                ('dimension', models.CharField(max_length=10)),
+                ('key', models.CharField(max_length=50)),
+                ('metric', models.CharField(max_length=10)),
+                ('bucket', models.SmallIntegerField()),
+                ('count', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'resolution_time_buckets',
+                'indexes': [models.Index(fields=['dimension', 'key', 'metric', 'bucket', 'day', 'count'], name='resolution_buckets_report_idx')],
+            },
+        ),
+    ]
@@ -47,3 +47,33 @@ class MunicipalOfficer(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.designation}"
+
+
+class ResolutionTimeBucket(models.Model):
+    """
+    Resolution Time Rollup
+    Per submission day: how many complaints of a department, ward or officer
+    took a duration in each log-scale bucket to be reviewed, resolved or
+    closed (see adminpanel.analytics)
+    """
+    
+    day = models.DateField(db_index=True)
+    dimension = models.CharField(max_length=10)  # department / ward / officer
+    key = models.CharField(max_length=50)  # department code, ward number or officer id
+    metric = models.CharField(max_length=10)  # review / resolve / close
+    bucket = models.SmallIntegerField()
+    count = models.IntegerField()
+    
+    class Meta:
+        db_table = 'resolution_time_buckets'
+        indexes = [
+            # Covering and in GROUP BY order for adminpanel.analytics, so
+            # a report streams one dimension's rows without sorting them
+            models.Index(
+                fields=['dimension', 'key', 'metric', 'bucket', 'day', 'count'],
+                name='resolution_buckets_report_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.dimension}={self.key} {self.metric}[{self.bucket}] x{self.count}"
@@ -0,0 +1,166 @@
+"""
+Evidence Thumbnails
+Small JPEG previews of complaint files for the admin lists, rendered on
+first request by a bounded worker pool and kept in a disk cache keyed by the
+content hash of the original and the thumbnail size
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+import pypdfium2
+
+from mcms_config.metrics import THUMBNAIL_RENDER_LATENCY, THUMBNAILS
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+
+def thumbnail_settings():
+    config = {
+        'ROOT': os.path.join(settings.BASE_DIR, 'thumbnail_cache'),
+        'SIZES': (160, 320),
+        'QUALITY': 80,
+        'WORKERS': 2,
+        'MAX_PENDING': 16,
+        'TIMEOUT': 15,
+        'MAX_AGE': 365 * 24 * 3600,
+    }
+    config.update(getattr(settings, 'THUMBNAILS', {}))
+    return config
+
+
+class ThumbnailBusy(Exception):
+    """The worker pool has MAX_PENDING renders queued, or one timed out"""
+
+
+def content_digest(name):
+    """
+    sha256 of a media file. Remembered in the cache per name, size and
+    mtime, so an original is read once rather than on every request.
+    """
+    stat = os.stat(default_storage.path(name))
+    key = 'thumb-digest:%s:%d:%d' % (
+        hashlib.sha1(name.encode()).hexdigest(), stat.st_size, stat.st_mtime_ns,
+    )
+    digest = cache.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with default_storage.open(name, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        cache.set(key, digest, 30 * 24 * 3600)
+    return digest
+
+
+def cache_path(digest, size):
+    return os.path.join(thumbnail_settings()['ROOT'], digest[:2], f'{digest}-{size}.jpg')
+
+
+def _placeholder(size, label):
+    from PIL import Image, ImageDraw
+
+    image = Image.new('RGB', (size, size), 'white')
+    draw = ImageDraw.Draw(image)
+    margin = size // 6
+    draw.rectangle([margin, size // 10, size - margin, size - size // 10], outline='#9aa5b1', width=2)
+    draw.text((size // 2, size // 2), label, fill='#c0392b', anchor='mm')
+    return image
+
+
+def render(path, size):
+    """A PIL image of `path` fitted into size x size"""
+    from PIL import Image, ImageOps
+
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext in IMAGE_EXTENSIONS:
+            image = Image.open(path)
+            # JPEG decoders can scale down by 1/2..1/8 while decoding
+            image.draft('RGB', (size, size))
+            image = ImageOps.exif_transpose(image)
+        elif ext == '.pdf':
+            document = pypdfium2.PdfDocument(path)
+            try:
+                page = document[0]
+                image = page.render(scale=size / max(page.get_size())).to_pil()
+            finally:
+                document.close()
+        else:
+            return _placeholder(size, ext.lstrip('.').upper() or 'FILE')
+        image.thumbnail((size, size))
+        return image.convert('RGB')
+    except Exception:
+        # Corrupt or hostile files (decompression bombs) get the icon too,
+        # and it is cached like any thumbnail so they are not retried
+        return _placeholder(size, ext.lstrip('.').upper() or 'FILE')
+
+
+def _write(path, size, target):
+    """Render into target atomically: other processes may be writing it too"""
+    with THUMBNAIL_RENDER_LATENCY.time():
+        image = render(path, size)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                image.save(f, 'JPEG', quality=thumbnail_settings()['QUALITY'], optimize=True)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+_executor = None
+_pending = {}  # target path -> Future, so concurrent requests share one render
+_lock = threading.RLock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=thumbnail_settings()['WORKERS'], thread_name_prefix='thumbnail',
+        )
+    return _executor
+
+
+def get_thumbnail(name, size):
+    """
+    (path, digest) of the cached thumbnail of media file `name`, rendering
+    it first if needed. Raises ThumbnailBusy rather than queueing past
+    MAX_PENDING or waiting past TIMEOUT.
+    """
+    config = thumbnail_settings()
+    digest = content_digest(name)
+    target = cache_path(digest, size)
+    if os.path.exists(target):
+        THUMBNAILS.inc(result='hit')
+        return target, digest
+
+    with _lock:
+        future = _pending.get(target)
+        if future is None:
+            if len(_pending) >= config['MAX_PENDING']:
+                THUMBNAILS.inc(result='busy')
+                raise ThumbnailBusy()
+            future = _pool().submit(_write, default_storage.path(name), size, target)
+            _pending[target] = future
+            future.add_done_callback(lambda done: _forget(target))
+    THUMBNAILS.inc(result='miss')
+    try:
+        future.result(timeout=config['TIMEOUT'])
+    except TimeoutError:
+        raise ThumbnailBusy()
+    return target, digest
+
+
+def _forget(target):
+    with _lock:
+        _pending.pop(target, None)
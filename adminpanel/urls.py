@@ -3,27 +3,35 @@ Admin Panel URL Configuration
 """
 
 from django.urls import path
+from mcms_config.middleware import query_budget
 from . import views
 
 app_name = 'adminpanel'
 
 urlpatterns = [
     # Authentication
-    path('login/', views.admin_login_view, name='login'),
-    path('logout/', views.admin_logout, name='logout'),
+    path('login/', query_budget(10)(views.admin_login_view), name='login'),
+    path('logout/', query_budget(6)(views.admin_logout), name='logout'),
     
     # Dashboard
-    path('dashboard/', views.admin_dashboard, name='dashboard'),
+    path('dashboard/', query_budget(14)(views.admin_dashboard), name='dashboard'),
+    path('dashboard/stream/', query_budget(6)(views.dashboard_stream), name='dashboard_stream'),
     
     # Complaints management
-    path('complaints/', views.all_complaints, name='all_complaints'),
-    path('complaints/<str:complaint_id>/', views.complaint_detail_admin, name='complaint_detail'),
-    path('complaints/<str:complaint_id>/resolve/', views.resolve_complaint, name='resolve_complaint'),
-    path('complaints/<str:complaint_id>/delete/', views.delete_complaint, name='delete_complaint'),
+    path('complaints/', query_budget(10)(views.all_complaints), name='all_complaints'),
+    path('queue/', query_budget(6)(views.my_queue), name='my_queue'),
+    path('queue.json', query_budget(6)(views.my_queue_json), name='my_queue_json'),
+    path('complaints/files.zip', query_budget(6)(views.proof_bundle), name='proof_bundle'),
+    path('complaints/<str:complaint_id>/', query_budget(16)(views.complaint_detail_admin), name='complaint_detail'),
+    path('complaints/<str:complaint_id>/thumbnail/<str:kind>/', query_budget(4)(views.complaint_thumbnail), name='thumbnail'),
+    path('complaints/<str:complaint_id>/resolve/', query_budget(14)(views.resolve_complaint), name='resolve_complaint'),
+    path('complaints/<str:complaint_id>/delete/', query_budget(12)(views.delete_complaint), name='delete_complaint'),
     
     # Department-wise complaints
-    path('department/<str:dept_code>/', views.department_complaints, name='department_complaints'),
+    path('department/<str:dept_code>/', query_budget(10)(views.department_complaints), name='department_complaints'),
     
     # Reports
-    path('reports/', views.reports, name='reports'),
+    path('reports/', query_budget(10)(views.reports), name='reports'),
+    path('reports/resolution/', query_budget(8)(views.resolution_report), name='resolution_report'),
+    path('reports/resolution.csv', query_budget(8)(views.resolution_report_csv), name='resolution_report_csv'),
 ]
@@ -3,16 +3,42 @@ Admin Panel Views
 Municipal officer dashboard and complaint management
 """
 
+import asyncio
+import csv
+from copy import copy
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import authenticate, get_user_model, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.db.models import Q, Count
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.core.mail import send_mail
-from complaints.models import Complaint, ComplaintStatusHistory
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified,
+    JsonResponse, StreamingHttpResponse,
+)
+from complaints.models import OPEN_STATUSES, Complaint
+from complaints.transitions import TransitionError, update_complaint
+from complaints.uploads import open_upload, resolve_upload
 from departments.models import Department
+from departments.refdata import get_snapshot
+from mcms_config import media_layout
+from mcms_config.metrics import EMAIL_SEND_LATENCY
+from mcms_config.routers import use_read_replica
+from mcms_config.viewcache import cached_data
+from . import analytics
+from .bundles import stream_bundle
 from .forms import AdminLoginForm, UpdateComplaintStatusForm
+from .live import get_broadcaster
+from .thumbnails import ThumbnailBusy, content_digest, get_thumbnail, thumbnail_settings
 
 
 def is_admin_user(user):
@@ -47,24 +73,18 @@ def admin_login_view(request):
     return render(request, 'adminpanel/login.html', context)
 
 
-@login_required
-@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
-def admin_dashboard(request):
+@cached_data('admin_dashboard')
+def _dashboard_stats():
     """
-    Admin dashboard with statistics
+    Aggregates shown on the admin dashboard (cached, see mcms_config.viewcache)
     """
     # Overall statistics
-    total_complaints = Complaint.objects.filter(is_archived=False).count()
-    pending_complaints = Complaint.objects.filter(
-        is_archived=False
-    ).exclude(status__in=['RESOLVED', 'CLOSED']).count()
-    resolved_complaints = Complaint.objects.filter(
-        status__in=['RESOLVED', 'CLOSED'],
-        is_archived=False
-    ).count()
+    total_complaints = Complaint.objects.live().count()
+    pending_complaints = Complaint.objects.open().count()
+    resolved_complaints = total_complaints - pending_complaints
     
     # Status-wise breakdown
-    status_stats = Complaint.objects.filter(is_archived=False).values('status').annotate(
+    status_stats = Complaint.objects.live().values('status').annotate(
         count=Count('id')
     )
     
@@ -82,153 +102,374 @@ def admin_dashboard(request):
     )
     
     # Recent complaints
-    recent_complaints = Complaint.objects.filter(
-        is_archived=False
-    ).select_related('citizen', 'department', 'officer')[:10]
+    recent_complaints = Complaint.objects.live().select_related('citizen', 'department', 'officer')[:10]
     
-    context = {
+    return {
         'total_complaints': total_complaints,
         'pending_complaints': pending_complaints,
         'resolved_complaints': resolved_complaints,
-        'status_stats': status_stats,
-        'dept_stats': dept_stats,
-        'recent_complaints': recent_complaints,
+        'status_stats': list(status_stats),
+        'dept_stats': list(dept_stats),
+        'recent_complaints': list(recent_complaints),
     }
-    return render(request, 'adminpanel/dashboard.html', context)
 
 
 @login_required
 @user_passes_test(is_admin_user, login_url='/admin-panel/login/')
-def all_complaints(request):
+@use_read_replica
+def admin_dashboard(request):
     """
-    View all complaints with filters
+    Admin dashboard with statistics
     """
-    complaints = Complaint.objects.filter(
-        is_archived=False
-    ).select_related('citizen', 'department', 'officer')
+    context = _dashboard_stats()
+    return render(request, 'adminpanel/dashboard.html', context)
+
+
+async def dashboard_stream(request):
+    """
+    Server-Sent Events stream of dashboard counter deltas and new complaints
+    """
+    is_admin = await sync_to_async(is_admin_user)(request.user)
+    if not is_admin:
+        return HttpResponseForbidden()
+
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be pinned forever; 204 tells EventSource not to retry
+        return HttpResponse(status=204)
+
+    broadcaster = get_broadcaster()
+    keepalive = getattr(settings, 'ADMIN_LIVE_KEEPALIVE', 15)
+
+    async def event_stream():
+        queue = broadcaster.subscribe()
+        try:
+            yield 'retry: 5000\n\n'
+            snapshot = broadcaster.snapshot()
+            if snapshot:
+                yield snapshot
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _filter_complaints(request):
+    """
+    Apply the all_complaints filters in request.GET. Returns the filtered
+    (unordered) queryset and the filter values for the template.
+    """
+    complaints = Complaint.objects.live()
     
-    # Filters
-    status_filter = request.GET.get('status', '')
-    dept_filter = request.GET.get('department', '')
-    search = request.GET.get('search', '')
+    filters = {
+        key: request.GET.get(key, '').strip()
+        for key in ('status', 'department', 'ward', 'search', 'submitted_from', 'submitted_to')
+    }
     
-    if status_filter:
-        complaints = complaints.filter(status=status_filter)
+    if filters['status'] in dict(Complaint.STATUS_CHOICES):
+        complaints = complaints.filter(status=filters['status'])
+    else:
+        filters['status'] = ''
     
-    if dept_filter:
-        complaints = complaints.filter(department__code=dept_filter)
+    if filters['department']:
+        complaints = complaints.filter(department__code=filters['department'])
     
-    if search:
+    if filters['ward']:
+        complaints = complaints.filter(ward_number=filters['ward'])
+    
+    if filters['search']:
         complaints = complaints.filter(
-            Q(complaint_id__icontains=search) |
-            Q(subject__icontains=search) |
-            Q(citizen__username__icontains=search)
+            Q(complaint_id__icontains=filters['search']) |
+            Q(subject__icontains=filters['search']) |
+            Q(citizen__username__icontains=filters['search'])
         )
     
+    # Dates from <input type="date">; malformed values are ignored
+    for key, lookup in (('submitted_from', 'gte'), ('submitted_to', 'lte')):
+        day = parse_date(filters[key]) if filters[key] else None
+        if day:
+            complaints = complaints.filter(**{f'submitted_at__date__{lookup}': day})
+        else:
+            filters[key] = ''
+    
+    return complaints, filters
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+def all_complaints(request):
+    """
+    View all complaints with filters
+    """
+    complaints, filters = _filter_complaints(request)
+    
     # Order by submission date (newest first)
-    complaints = complaints.order_by('-submitted_at')
+    complaints = complaints.select_related('citizen', 'department', 'officer').order_by('-submitted_at')
     
     # Get all departments for filter
-    departments = Department.objects.filter(is_active=True)
+    departments = get_snapshot().active_departments
     
     context = {
         'complaints': complaints,
         'departments': departments,
         'status_choices': Complaint.STATUS_CHOICES,
-        'current_status': status_filter,
-        'current_dept': dept_filter,
-        'search_query': search,
+        'current_status': filters['status'],
+        'current_dept': filters['department'],
+        'current_ward': filters['ward'],
+        'submitted_from': filters['submitted_from'],
+        'submitted_to': filters['submitted_to'],
+        'search_query': filters['search'],
     }
     return render(request, 'adminpanel/all_complaints.html', context)
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _queue_cursor(complaint):
+    """Keyset cursor after `complaint`: its submitted_at (epoch microseconds) and id"""
+    return '%d_%d' % ((complaint.submitted_at - _EPOCH) // timedelta(microseconds=1), complaint.pk)
+
+
+def _officer_queue(request):
+    """
+    One page of the open complaints assigned to request.user, most urgent
+    (longest waiting) first, and the open counts per status.
+
+    Pages are keyset-paginated on (submitted_at, id) via ?after=<cursor>, so
+    each is a seek into complaints_open_officer_idx however deep the queue;
+    a malformed cursor starts from the top.
+    """
+    size = settings.MY_QUEUE_PAGE_SIZE
+    queue = Complaint.objects.open().filter(officer=request.user)
+    
+    page = queue.select_related('citizen', 'department').order_by('submitted_at', 'id')
+    try:
+        micros, last_id = (int(part) for part in request.GET.get('after', '').split('_'))
+        after = _EPOCH + timedelta(microseconds=micros)
+    except (ValueError, OverflowError):
+        after = None
+    if after:
+        # A range on submitted_at the index can seek to, minus the ties already shown
+        page = page.filter(submitted_at__gte=after).exclude(submitted_at=after, id__lte=last_id)
+    page = list(page[:size + 1])
+    next_cursor = _queue_cursor(page[size - 1]) if len(page) > size else None
+    
+    by_status = dict(queue.order_by().values_list('status').annotate(count=Count('id')))
+    counts = {code: by_status.get(code, 0) for code in OPEN_STATUSES}
+    return page[:size], counts, next_cursor
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+def my_queue(request):
+    """
+    The signed-in officer's open assigned complaints
+    """
+    complaints, counts, next_cursor = _officer_queue(request)
+    context = {
+        'complaints': complaints,
+        'counts': [(code, label, counts[code]) for code, label in Complaint.STATUS_CHOICES if code in counts],
+        'total': sum(counts.values()),
+        'next_cursor': next_cursor,
+        'first_page': not request.GET.get('after'),
+    }
+    return render(request, 'adminpanel/my_queue.html', context)
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+def my_queue_json(request):
+    """
+    my_queue as JSON; follow `next` (a cursor for ?after=) until it is null
+    """
+    complaints, counts, next_cursor = _officer_queue(request)
+    return JsonResponse({
+        'counts': counts,
+        'total': sum(counts.values()),
+        'complaints': [
+            {
+                'complaint_id': c.complaint_id,
+                'subject': c.subject,
+                'department': c.department.code,
+                'ward_number': c.ward_number,
+                'status': c.status,
+                'submitted_at': c.submitted_at.isoformat(),
+                'days_pending': c.get_days_pending(),
+                'overdue': c.is_overdue(),
+                'url': reverse('adminpanel:complaint_detail', args=[c.complaint_id]),
+            }
+            for c in complaints
+        ],
+        'next': next_cursor,
+    })
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+def proof_bundle(request):
+    """
+    Download the proof and resolution files of the complaints matching the
+    all_complaints filters as one ZIP, streamed as it is built
+    """
+    complaints, filters = _filter_complaints(request)
+    files = Q(proof_file__gt='') | Q(resolution_proof__gt='')
+    rows = list(
+        complaints.filter(files).order_by('submitted_at').values(
+            'complaint_id', 'department__code', 'ward_number', 'status', 'submitted_at',
+            'proof_file', 'resolution_proof',
+        )[:settings.PROOF_BUNDLE_MAX_COMPLAINTS + 1]
+    )
+    back = f"{reverse('adminpanel:all_complaints')}?{request.GET.urlencode()}"
+    if not rows:
+        messages.info(request, 'No complaints with attached files match these filters.')
+        return redirect(back)
+    if len(rows) > settings.PROOF_BUNDLE_MAX_COMPLAINTS:
+        messages.error(
+            request,
+            f'More than {settings.PROOF_BUNDLE_MAX_COMPLAINTS} complaints match; narrow the filters to download their files.'
+        )
+        return redirect(back)
+    
+    label = '-'.join(filter(None, [filters['department'], filters['ward'] and f"ward{filters['ward']}"])) or 'all'
+    response = StreamingHttpResponse(stream_bundle(rows), content_type='application/zip')
+    response['Content-Disposition'] = (
+        f'attachment; filename="mcms-files-{label}-{timezone.localdate():%Y%m%d}.zip"'
+    )
+    response['Cache-Control'] = 'no-store'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+def complaint_thumbnail(request, complaint_id, kind):
+    """
+    JPEG preview of a complaint's proof or resolution file. List pages add
+    ?v=<last update> to the URL, so browsers keep those for MAX_AGE.
+    """
+    field = {'proof': 'proof_file', 'resolution': 'resolution_proof'}.get(kind)
+    config = thumbnail_settings()
+    size = request.GET.get('size', str(config['SIZES'][0]))
+    if field is None or not size.isdigit() or int(size) not in config['SIZES']:
+        raise Http404('Unknown thumbnail')
+    
+    name = Complaint.objects.filter(complaint_id=complaint_id).values_list(field, flat=True).first()
+    resolved = media_layout.resolve(name) if name else None
+    if resolved is None:
+        raise Http404('No file attached')
+    
+    etag = f'"{content_digest(resolved)}-{size}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            path, _ = get_thumbnail(resolved, int(size))
+        except ThumbnailBusy:
+            response = HttpResponse(status=503)
+            response['Retry-After'] = '2'
+            response['Cache-Control'] = 'no-store'
+            return response
+        response = FileResponse(open(path, 'rb'), content_type='image/jpeg')
+    response['ETag'] = etag
+    if 'v' in request.GET:
+        response['Cache-Control'] = f"private, max-age={config['MAX_AGE']}, immutable"
+    else:
+        response['Cache-Control'] = 'private, max-age=300'
+    return response
+
+
 @login_required
 @user_passes_test(is_admin_user, login_url='/admin-panel/login/')
 def complaint_detail_admin(request, complaint_id):
     """
     View and update complaint details (Admin)
     """
-    complaint = get_object_or_404(Complaint, complaint_id=complaint_id)
+    complaint = get_object_or_404(
+        Complaint.objects.select_related('citizen', 'department', 'officer'),
+        complaint_id=complaint_id
+    )
+    status = 200
     
     if request.method == 'POST':
-        form = UpdateComplaintStatusForm(request.POST, request.FILES, instance=complaint)
+        # Validation writes the posted values onto the form's instance; the
+        # update below needs the row as loaded
+        form = UpdateComplaintStatusForm(
+            request.POST, request.FILES, instance=copy(complaint), user=request.user
+        )
         
         if form.is_valid():
             old_status = complaint.status
-            new_complaint = form.save(commit=False)
-            new_status = new_complaint.status
-            
-            # Update timestamp based on status
-            if new_status == 'UNDER_REVIEW' and not complaint.reviewed_at:
-                new_complaint.reviewed_at = timezone.now()
-            elif new_status == 'IN_PROGRESS' and not complaint.in_progress_at:
-                new_complaint.in_progress_at = timezone.now()
-            elif new_status == 'RESOLVED' and not complaint.resolved_at:
-                new_complaint.resolved_at = timezone.now()
-            elif new_status == 'CLOSED' and not complaint.closed_at:
-                new_complaint.closed_at = timezone.now()
-            
-            new_complaint.save()
-
-            # If resolution proof uploaded, ensure file saved on instance
-            if form.cleaned_data.get('resolution_proof'):
-                # saved via ModelForm save(); nothing extra required
-                pass
-            
-            # Create status history entry
-            if old_status != new_status:
-                ComplaintStatusHistory.objects.create(
-                    complaint=complaint,
-                    from_status=old_status,
-                    to_status=new_status,
-                    changed_by=request.user,
-                    remarks=form.cleaned_data.get('official_remarks', '')
+            try:
+                update_complaint(
+                    complaint, form.changes(), user=request.user,
+                    seen=form.cleaned_data['version'],
+                    remarks=form.cleaned_data.get('official_remarks', ''),
                 )
+            except TransitionError as e:
+                messages.error(request, str(e))
+                current = getattr(e, 'current', None) or complaint
+                # Keep the officer's input, against the current version
+                data = request.POST.copy()
+                data['version'] = current.last_updated.isoformat()
+                form = UpdateComplaintStatusForm(data, instance=copy(current), user=request.user)
+                complaint, status = current, 409
+            else:
+                form.discard_uploads()
+                new_status = complaint.status
+                
+                # If moved to RESOLVED, send notification to citizen with resolution notes
+                if new_status == 'RESOLVED' and old_status != 'RESOLVED':
+                    try:
+                        subject = f"Your complaint {complaint.complaint_id} is Resolved"
+                        message_lines = [
+                            f"Hello {complaint.citizen.username},",
+                            "\n",
+                            f"Your complaint ({complaint.complaint_id}) has been marked as RESOLVED.",
+                        ]
+                        res_notes = form.cleaned_data.get('resolution_notes')
+                        if res_notes:
+                            message_lines += ["\nResolution details:", res_notes]
 
-            # If moved to RESOLVED, send notification to citizen with resolution notes
-            if new_status == 'RESOLVED':
-                try:
-                    subject = f"Your complaint {complaint.complaint_id} is Resolved"
-                    message_lines = [
-                        f"Hello {complaint.citizen.username},",
-                        "\n",
-                        f"Your complaint ({complaint.complaint_id}) has been marked as RESOLVED.",
-                    ]
-                    res_notes = form.cleaned_data.get('resolution_notes')
-                    if res_notes:
-                        message_lines += ["\nResolution details:", res_notes]
-
-                    # Official remarks visible to citizen
-                    official = form.cleaned_data.get('official_remarks')
-                    if official:
-                        message_lines += ["\nOfficial remarks:", official]
-
-                    message = "\n".join(message_lines)
-                    send_mail(
-                        subject,
-                        message,
-                        None,
-                        [complaint.citizen.email],
-                        fail_silently=True,
-                    )
-                except Exception:
-                    # do not block admin action if email fails
-                    pass
+                        # Official remarks visible to citizen
+                        official = form.cleaned_data.get('official_remarks')
+                        if official:
+                            message_lines += ["\nOfficial remarks:", official]
+
+                        message = "\n".join(message_lines)
+                        with EMAIL_SEND_LATENCY.time(kind='status_update'):
+                            send_mail(
+                                subject,
+                                message,
+                                None,
+                                [complaint.citizen.email],
+                                fail_silently=True,
+                            )
+                    except Exception:
+                        # do not block admin action if email fails
+                        pass
             
-            messages.success(request, 'Complaint updated successfully!')
-            return redirect('adminpanel:complaint_detail', complaint_id=complaint_id)
+                messages.success(request, 'Complaint updated successfully!')
+                return redirect('adminpanel:complaint_detail', complaint_id=complaint_id)
     else:
         form = UpdateComplaintStatusForm(instance=complaint)
     
     # Get status history
-    status_history = complaint.status_history.all()
+    status_history = complaint.status_history.select_related('changed_by')
     
     context = {
         'complaint': complaint,
         'form': form,
         'status_history': status_history,
     }
-    return render(request, 'adminpanel/complaint_detail.html', context)
+    return render(request, 'adminpanel/complaint_detail.html', context, status=status)
 
 
 @login_required
@@ -240,36 +481,40 @@ def resolve_complaint(request, complaint_id):
         notes = request.POST.get('resolution_notes', '')
         official = request.POST.get('official_remarks', '')
         proof = request.FILES.get('resolution_proof')
+        upload = None
+        if not proof and request.POST.get('resolution_upload'):
+            try:
+                upload = resolve_upload(request.POST['resolution_upload'], request.user)
+            except ValidationError as e:
+                messages.error(request, e.messages[0])
+                return redirect('adminpanel:complaint_detail', complaint_id=complaint_id)
+            proof = open_upload(upload)
 
-        old_status = complaint.status
-        complaint.status = 'RESOLVED'
-        if not complaint.resolved_at:
-            complaint.resolved_at = timezone.now()
+        changes = {'status': 'RESOLVED'}
         if notes:
-            complaint.resolution_notes = notes
+            changes['resolution_notes'] = notes
         if official:
-            complaint.official_remarks = official
+            changes['official_remarks'] = official
         if proof:
-            complaint.resolution_proof = proof
-        complaint.save()
-
-        ComplaintStatusHistory.objects.create(
-            complaint=complaint,
-            from_status=old_status,
-            to_status='RESOLVED',
-            changed_by=request.user,
-            remarks=official or notes,
-        )
+            changes['resolution_proof'] = proof
+        try:
+            update_complaint(complaint, changes, user=request.user, remarks=official or notes)
+        except TransitionError as e:
+            messages.error(request, str(e))
+            return redirect('adminpanel:complaint_detail', complaint_id=complaint_id)
+        if upload:
+            upload.discard()
 
         # notify citizen
         try:
-            send_mail(
-                f"Your complaint {complaint.complaint_id} is Resolved",
-                f"Hello {complaint.citizen.username},\n\nYour complaint has been marked as RESOLVED.\n\nResolution notes:\n{complaint.resolution_notes or '—'}\n\nOfficial remarks:\n{complaint.official_remarks or '—'}",
-                None,
-                [complaint.citizen.email],
-                fail_silently=True,
-            )
+            with EMAIL_SEND_LATENCY.time(kind='resolved'):
+                send_mail(
+                    f"Your complaint {complaint.complaint_id} is Resolved",
+                    f"Hello {complaint.citizen.username},\n\nYour complaint has been marked as RESOLVED.\n\nResolution notes:\n{complaint.resolution_notes or '—'}\n\nOfficial remarks:\n{complaint.official_remarks or '—'}",
+                    None,
+                    [complaint.citizen.email],
+                    fail_silently=True,
+                )
         except Exception:
             pass
 
@@ -283,36 +528,35 @@ def delete_complaint(request, complaint_id):
     """Soft-delete (archive) a complaint."""
     complaint = get_object_or_404(Complaint, complaint_id=complaint_id)
     if request.method == 'POST':
-        complaint.is_archived = True
-        complaint.save()
-        ComplaintStatusHistory.objects.create(
-            complaint=complaint,
-            from_status=complaint.status,
-            to_status='ARCHIVED',
-            changed_by=request.user,
-            remarks='Complaint archived by admin'
-        )
+        try:
+            update_complaint(
+                complaint, {'is_archived': True}, user=request.user,
+                remarks='Complaint archived by admin', event='ARCHIVED',
+            )
+        except TransitionError as e:
+            messages.error(request, str(e))
+            return redirect('adminpanel:all_complaints')
         messages.success(request, 'Complaint archived (deleted) successfully.')
     return redirect('adminpanel:all_complaints')
 
 
 @login_required
 @user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+@use_read_replica
 def department_complaints(request, dept_code):
     """
     View complaints by department
     """
     department = get_object_or_404(Department, code=dept_code)
     
-    complaints = Complaint.objects.filter(
-        department=department,
-        is_archived=False
+    complaints = Complaint.objects.live().filter(
+        department=department
     ).select_related('citizen', 'officer').order_by('-submitted_at')
     
     # Statistics for this department
     total = complaints.count()
-    pending = complaints.exclude(status__in=['RESOLVED', 'CLOSED']).count()
-    resolved = complaints.filter(status__in=['RESOLVED', 'CLOSED']).count()
+    pending = Complaint.objects.open().filter(department=department).count()
+    resolved = total - pending
     
     context = {
         'department': department,
@@ -324,11 +568,10 @@ def department_complaints(request, dept_code):
     return render(request, 'adminpanel/department_complaints.html', context)
 
 
-@login_required
-@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
-def reports(request):
+@cached_data('reports')
+def _report_stats():
     """
-    Reports and analytics page
+    Department-wise report aggregates (cached, see mcms_config.viewcache)
     """
     # Date range filter (optional enhancement)
     from datetime import datetime, timedelta
@@ -367,13 +610,115 @@ def reports(request):
         ))
     )
     
-    context = {
+    return {
         'recent_complaints_count': recent_complaints,
-        'dept_stats': dept_stats,
+        'dept_stats': list(dept_stats),
     }
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+@use_read_replica
+def reports(request):
+    """
+    Reports and analytics page
+    """
+    context = _report_stats()
     return render(request, 'adminpanel/reports.html', context)
 
 
+@cached_data('reports')
+def _resolution_stats(first_day, last_day, dimension):
+    """
+    Resolution-time percentiles per department, ward or officer, in hours,
+    with display labels (cached, see mcms_config.viewcache)
+    """
+    times = analytics.resolution_times(first_day, last_day, dimension)
+    if dimension == 'department':
+        labels = dict(Department.objects.filter(code__in=times).values_list('code', 'name'))
+    elif dimension == 'officer':
+        labels = {
+            str(pk): username
+            for pk, username in get_user_model().objects.filter(pk__in=times).values_list('pk', 'username')
+        }
+    else:
+        labels = {key: f'Ward {key}' for key in times}
+    
+    rows = []
+    for key, metrics in times.items():
+        row = {'key': key, 'label': labels.get(key, key), 'metrics': []}
+        for metric in analytics.METRICS:  # in METRICS order
+            stats = metrics.get(metric, {})
+            row['metrics'].append(dict(
+                count=stats.get('count', 0),
+                **{name: round(stats[name] / 3600, 1) if name in stats else None for name in analytics.PERCENTILES},
+            ))
+        rows.append(row)
+    return sorted(rows, key=lambda row: row['label'])
+
+
+def _resolution_filters(request):
+    """The resolution report's dimension and submission date range (default: last 90 days)"""
+    dimension = request.GET.get('dimension', '')
+    if dimension not in analytics.DIMENSIONS:
+        dimension = 'department'
+    def day(key):
+        try:
+            return parse_date(request.GET.get(key, '').strip())
+        except ValueError:  # well-formed but impossible, e.g. 2026-02-30
+            return None
+    
+    last_day = day('submitted_to') or timezone.localdate()
+    first_day = day('submitted_from') or last_day - timedelta(days=89)
+    return dimension, min(first_day, last_day), last_day
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+@use_read_replica
+def resolution_report(request):
+    """
+    Median, p90 and p99 hours to review, resolve and close complaints
+    """
+    dimension, first_day, last_day = _resolution_filters(request)
+    context = {
+        'rows': _resolution_stats(first_day, last_day, dimension),
+        'dimension': dimension,
+        'dimensions': list(analytics.DIMENSIONS),
+        'metrics': list(analytics.METRICS),
+        'submitted_from': first_day.isoformat(),
+        'submitted_to': last_day.isoformat(),
+        'rolled_up_range': analytics.rolled_up_range(),
+    }
+    return render(request, 'adminpanel/resolution_report.html', context)
+
+
+@login_required
+@user_passes_test(is_admin_user, login_url='/admin-panel/login/')
+@use_read_replica
+def resolution_report_csv(request):
+    """
+    resolution_report as CSV
+    """
+    dimension, first_day, last_day = _resolution_filters(request)
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = (
+        f'attachment; filename="mcms-resolution-{dimension}-{first_day:%Y%m%d}-{last_day:%Y%m%d}.csv"'
+    )
+    writer = csv.writer(response)
+    writer.writerow([dimension, 'label'] + [
+        f'{metric}_{column}' for metric in analytics.METRICS
+        for column in ['count'] + [f'{name}_hours' for name in analytics.PERCENTILES]
+    ])
+    for row in _resolution_stats(first_day, last_day, dimension):
+        writer.writerow([row['key'], row['label']] + [
+            '' if value is None else value
+            for stats in row['metrics']
+            for value in [stats['count']] + [stats[name] for name in analytics.PERCENTILES]
+        ])
+    return response
+
+
 @login_required
 @user_passes_test(is_admin_user, login_url='/admin-panel/login/')
 def admin_logout(request):
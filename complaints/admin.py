@@ -22,6 +22,7 @@ class ComplaintAdmin(admin.ModelAdmin):
         'complaint_id', 'citizen', 'submitted_at', 'last_updated',
         'reviewed_at', 'in_progress_at', 'resolved_at', 'closed_at'
     ]
+    list_select_related = ['citizen', 'department']
     ordering = ['-submitted_at']
     
     fieldsets = (
@@ -57,6 +58,7 @@ class ComplaintStatusHistoryAdmin(admin.ModelAdmin):
     """
     
     list_display = ['complaint', 'from_status', 'to_status', 'changed_by', 'changed_at']
+    list_select_related = ['complaint', 'changed_by']
     list_filter = ['to_status', 'changed_at']
     search_fields = ['complaint__complaint_id']
     readonly_fields = ['complaint', 'from_status', 'to_status', 'changed_by', 'remarks', 'changed_at']
@@ -78,6 +80,7 @@ class ComplaintCommentAdmin(admin.ModelAdmin):
     """
     
     list_display = ['complaint', 'author', 'is_internal', 'created_at']
+    list_select_related = ['complaint', 'author']
     list_filter = ['is_internal', 'created_at']
     search_fields = ['complaint__complaint_id', 'comment_text']
     readonly_fields = ['created_at']
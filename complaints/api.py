@@ -0,0 +1,224 @@
+"""
+Complaints API
+JSON batch intake for call centres and field kiosks
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from accounts.models import Citizen
+from mcms_config.metrics import STATUS_TRANSITIONS
+from .forms import ComplaintIntakeForm
+from .models import Complaint, ComplaintStatusHistory, IntakeBatch, allocate_complaint_ids
+from .signals import complaints_changed
+
+FORM_FIELDS = ('department', 'ward_number', 'area', 'landmark', 'subject', 'description')
+
+
+def _basic_auth_user(request):
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if scheme.lower() != 'basic':
+        return None
+    try:
+        username, _, password = base64.b64decode(credentials).decode().partition(':')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return authenticate(request, username=username, password=password)
+
+
+def api_auth(view_func):
+    """
+    Authenticate API calls: HTTP Basic credentials for machine clients, or
+    the browser session, which must then pass the usual CSRF check
+    """
+    @csrf_exempt
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if 'HTTP_AUTHORIZATION' in request.META:
+            user = _basic_auth_user(request)
+            if user is None or not user.is_active:
+                response = JsonResponse({'error': 'Invalid credentials.'}, status=401)
+                response['WWW-Authenticate'] = 'Basic realm="MCMS"'
+                return response
+            request.user = user
+        elif request.user.is_authenticated:
+            rejected = CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {})
+            if rejected is not None:
+                return JsonResponse({'error': 'CSRF verification failed.'}, status=403)
+        else:
+            response = JsonResponse({'error': 'Authentication required.'}, status=401)
+            response['WWW-Authenticate'] = 'Basic realm="MCMS"'
+            return response
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def _replay(batch):
+    response = JsonResponse(batch.response)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _resolve_citizens(items):
+    """Map the 'citizen' values of a batch (username or mobile) to users in one query"""
+    refs = {str(item['citizen']) for item in items if isinstance(item, dict) and item.get('citizen')}
+    if not refs:
+        return {}
+    citizens = {}
+    for citizen in Citizen.objects.filter(Q(username__in=refs) | Q(mobile__in=refs)):
+        citizens[citizen.username] = citizen
+        citizens[citizen.mobile] = citizen
+    return citizens
+
+
+def _validate(user, items):
+    """
+    Run every item through the ComplaintForm rules. Returns per-item results and
+    (index, complaint) pairs ready to insert.
+    """
+    citizens = _resolve_citizens(items)
+    results, valid = [], []
+    for index, item in enumerate(items):
+        result = {'index': index}
+        if not isinstance(item, dict):
+            results.append({**result, 'status': 'invalid', 'errors': {'__all__': ['Expected an object.']}})
+            continue
+        if 'reference' in item:
+            result['reference'] = item['reference']
+
+        errors = {}
+        owner = user
+        if item.get('citizen'):
+            if not user.is_staff:
+                errors['citizen'] = ['Only staff may submit complaints for other citizens.']
+            else:
+                owner = citizens.get(str(item['citizen']))
+                if owner is None:
+                    errors['citizen'] = ['No citizen with this username or mobile.']
+
+        form = ComplaintIntakeForm(data={field: item.get(field, '') for field in FORM_FIELDS})
+        if not form.is_valid():
+            errors.update({field: list(messages) for field, messages in form.errors.items()})
+        if errors:
+            results.append({**result, 'status': 'invalid', 'errors': errors})
+            continue
+
+        complaint = form.save(commit=False)
+        complaint.citizen = owner
+        complaint.status = 'SUBMITTED'
+        results.append(result)
+        valid.append((index, complaint))
+    return results, valid
+
+
+def _insert(user, valid, results):
+    """Allocate IDs and insert complaints plus their initial history rows"""
+    complaints = [complaint for _, complaint in valid]
+    for complaint, complaint_id in zip(complaints, allocate_complaint_ids(len(complaints))):
+        complaint.complaint_id = complaint_id
+    Complaint.objects.bulk_create(complaints)
+
+    if not connection.features.can_return_rows_from_bulk_insert:
+        pks = dict(
+            Complaint.objects.filter(complaint_id__in=[c.complaint_id for c in complaints])
+            .values_list('complaint_id', 'pk')
+        )
+        for complaint in complaints:
+            complaint.pk = pks[complaint.complaint_id]
+
+    ComplaintStatusHistory.objects.bulk_create([
+        ComplaintStatusHistory(
+            complaint=complaint,
+            from_status='',
+            to_status='SUBMITTED',
+            changed_by=user,
+            remarks='Complaint submitted via batch intake',
+        )
+        for complaint in complaints
+    ])
+    for index, complaint in valid:
+        results[index].update(status='created', complaint_id=complaint.complaint_id)
+
+
+@require_POST
+@api_auth
+def batch_intake(request):
+    """
+    Create up to COMPLAINT_INTAKE_MAX_BATCH complaints in one transaction
+
+    Body: {"complaints": [{department, ward_number, area, landmark, subject,
+    description, [citizen], [reference]}, ...]}. Send an Idempotency-Key
+    header to make retries safe: a repeated key returns the original result.
+    """
+    key = request.headers.get('Idempotency-Key', '').strip()
+    if len(key) > 100:
+        return JsonResponse({'error': 'Idempotency-Key is too long (max 100).'}, status=400)
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Body must be JSON.'}, status=400)
+    items = payload.get('complaints') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return JsonResponse({'error': 'Expected a non-empty "complaints" list.'}, status=400)
+    max_batch = getattr(settings, 'COMPLAINT_INTAKE_MAX_BATCH', 500)
+    if len(items) > max_batch:
+        return JsonResponse({'error': f'At most {max_batch} complaints per batch.'}, status=400)
+
+    request_hash = hashlib.sha256(request.body).hexdigest()
+    if key:
+        batch = IntakeBatch.objects.filter(submitted_by=request.user, idempotency_key=key).first()
+        if batch is not None:
+            if batch.request_hash != request_hash:
+                return JsonResponse(
+                    {'error': 'Idempotency-Key was already used for a different batch.'}, status=422
+                )
+            return _replay(batch)
+
+    results, valid = _validate(request.user, items)
+    created = len(valid)
+    body = {
+        'created': created,
+        'invalid': len(items) - created,
+        'results': results,
+    }
+
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                if valid:
+                    _insert(request.user, valid, results)
+                if key:
+                    IntakeBatch.objects.create(
+                        submitted_by=request.user, idempotency_key=key,
+                        request_hash=request_hash, response=body,
+                    )
+            break
+        except IntegrityError:
+            if key:
+                # A concurrent retry of this batch may have committed first
+                batch = IntakeBatch.objects.filter(submitted_by=request.user, idempotency_key=key).first()
+                if batch is not None:
+                    return _replay(batch)
+            if attempt == 2:
+                raise
+            # Otherwise a complaint ID was taken meanwhile: allocate fresh ones
+            for _, complaint in valid:
+                complaint.pk = None
+
+    if valid:
+        complaints_changed()
+        STATUS_TRANSITIONS.inc(created, from_status='NEW', to_status='SUBMITTED')
+    return JsonResponse(body, status=201 if created else 200)
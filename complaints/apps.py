@@ -9,3 +9,6 @@ class ComplaintsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'complaints'
     verbose_name = 'Complaint Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -4,18 +4,57 @@ Complaint submission and management forms
 """
 
 from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
 from .models import Complaint
-from departments.models import Department
+from departments.forms import DepartmentChoiceField
 import os
 
 
-class ComplaintForm(forms.ModelForm):
+class ResumableUploadMixin:
+    """
+    Accept a finished resumable upload (complaints.uploads), referenced by
+    token in a hidden field, in place of a file posted with the form.
+    Pass user= so tokens are only honoured for their owner, and call
+    discard_uploads() once the instance is saved.
+    """
+    
+    # hidden token field -> file field it fills
+    upload_fields = {}
+    
+    def __init__(self, *args, user=None, **kwargs):
+        self.user = user
+        self.uploads = []
+        super().__init__(*args, **kwargs)
+    
+    def clean(self):
+        from .uploads import open_upload, resolve_upload
+        cleaned_data = super().clean()
+        for token_field, file_field in self.upload_fields.items():
+            token = cleaned_data.get(token_field)
+            if not token or self.files.get(self.add_prefix(file_field)):
+                continue
+            try:
+                upload = resolve_upload(token, self.user)
+            except ValidationError as e:
+                self.add_error(file_field, e)
+                continue
+            cleaned_data[file_field] = open_upload(upload)
+            self.uploads.append(upload)
+        return cleaned_data
+    
+    def discard_uploads(self):
+        for upload in self.uploads:
+            upload.discard()
+        self.uploads = []
+
+
+class ComplaintForm(ResumableUploadMixin, forms.ModelForm):
     """
     Complaint submission form with file upload validation
     """
     
-    department = forms.ModelChoiceField(
-        queryset=Department.objects.filter(is_active=True),
+    department = DepartmentChoiceField(
         required=True,
         widget=forms.Select(attrs={
             'class': 'form-input',
@@ -75,10 +114,17 @@ class ComplaintForm(forms.ModelForm):
         widget=forms.FileInput(attrs={
             'class': 'form-input',
             'accept': '.jpg,.jpeg,.png,.pdf',
-            'id': 'id_proof_file'
+            'id': 'id_proof_file',
+            'data-resumable-upload': reverse_lazy('complaints:upload_create'),
+            'data-token-field': 'proof_upload',
         })
     )
     
+    # Token of a finished resumable upload, set by static/js/main.js
+    proof_upload = forms.CharField(required=False, widget=forms.HiddenInput)
+    
+    upload_fields = {'proof_upload': 'proof_file'}
+    
     class Meta:
         model = Complaint
         fields = [
@@ -86,9 +132,6 @@ class ComplaintForm(forms.ModelForm):
             'landmark', 'subject', 'description', 'proof_file'
         ]
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-    
     def clean_proof_file(self):
         """
         Validate uploaded file type and size
@@ -132,6 +175,19 @@ class ComplaintForm(forms.ModelForm):
         return description
 
 
+class ComplaintIntakeForm(ComplaintForm):
+    """
+    ComplaintForm for batch intake. The department was already checked
+    against the reference snapshot, so model validation skips the
+    per-item existence query on it.
+    """
+    
+    def _get_validation_exclusions(self):
+        exclusions = super()._get_validation_exclusions()
+        exclusions.add('department')
+        return exclusions
+
+
 class ComplaintFilterForm(forms.Form):
     """
     Filter form for admin panel
@@ -143,8 +199,7 @@ class ComplaintFilterForm(forms.Form):
         widget=forms.Select(attrs={'class': 'form-input'})
     )
     
-    department = forms.ModelChoiceField(
-        queryset=Department.objects.filter(is_active=True),
+    department = DepartmentChoiceField(
         required=False,
         widget=forms.Select(attrs={'class': 'form-input'}),
         empty_label="All Departments"
@@ -0,0 +1,423 @@
+"""
+Generate synthetic citizens, officers, complaints, status history, comments
+and login attempts for scale testing
+
+    python manage.py generate_synthetic_data --citizens 100000 --complaints 1000000 --seed 7
+
+The same --seed and --end date always produce the same rows.
+"""
+
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.models import Citizen, LoginAttempt
+from adminpanel.models import MunicipalOfficer
+from complaints.models import STATUS_CODES, Complaint, ComplaintComment, ComplaintStatusHistory
+from complaints.signals import complaints_changed
+from departments.models import Department
+
+STATUS_FLOW = ['SUBMITTED', 'UNDER_REVIEW', 'IN_PROGRESS', 'RESOLVED', 'CLOSED']
+
+# Mean hours spent before reaching each status
+MEAN_STEP_HOURS = {
+    'UNDER_REVIEW': 18,
+    'IN_PROGRESS': 48,
+    'RESOLVED': 120,
+    'CLOSED': 72,
+}
+
+DEFAULT_STATUS_WEIGHTS = 'SUBMITTED=15,UNDER_REVIEW=15,IN_PROGRESS=20,RESOLVED=30,CLOSED=20'
+
+# Complaints filed per hour of day (relative)
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 14, 13, 12, 12, 12, 12, 11, 10, 9, 7, 5, 3, 2, 1]
+
+SUBJECTS = {
+    'WATER_SUPPLY': ['No water supply', 'Pipe leakage', 'Contaminated water', 'Low water pressure'],
+    'ROADS_TRANSPORT': ['Pothole on road', 'Broken footpath', 'Traffic signal not working', 'Road cave-in'],
+    'SANITATION': ['Garbage not collected', 'Overflowing drain', 'Open dumping', 'Blocked sewer'],
+    'ELECTRICITY': ['Street light not working', 'Exposed wiring', 'Frequent power cuts', 'Transformer sparking'],
+    'PUBLIC_HEALTH': ['Mosquito breeding', 'Stray animal menace', 'Unhygienic food stall', 'Dead animal on road'],
+}
+
+AREAS = [
+    'Market Square', 'Old Town', 'Station Road', 'Civil Lines', 'Gandhi Nagar', 'Nehru Colony',
+    'Industrial Area', 'Bus Depot', 'Lake View', 'University Campus', 'Hospital Road', 'Ring Road',
+]
+
+OFFICER_ROLES = ['OFFICER'] * 8 + ['MANAGER'] * 2
+
+CITIZEN_COLUMNS = [
+    'id', 'password', 'is_superuser', 'username', 'email', 'mobile',
+    'is_active', 'is_staff', 'is_verified', 'date_joined',
+]
+OFFICER_COLUMNS = [
+    'user_id', 'employee_id', 'role', 'designation', 'department_id', 'is_active', 'created_at',
+]
+COMPLAINT_COLUMNS = [
+    'id', 'complaint_id', 'citizen_id', 'department_id', 'ward_number', 'area', 'landmark',
+    'subject', 'description', 'proof_file', 'status', 'official_remarks', 'officer_id',
+    'resolution_notes', 'resolution_proof', 'submitted_at', 'last_updated',
+    'reviewed_at', 'in_progress_at', 'resolved_at', 'closed_at', 'is_archived',
+]
+HISTORY_COLUMNS = ['complaint_id', 'from_status', 'to_status', 'changed_by_id', 'remarks', 'changed_at']
+COMMENT_COLUMNS = ['complaint_id', 'author_id', 'comment_text', 'is_internal', 'created_at']
+LOGIN_COLUMNS = ['username', 'ip_address', 'attempted_at', 'success']
+
+
+def parse_weights(spec, allowed):
+    """Parse 'KEY=weight,KEY=weight' into a dict"""
+    weights = {}
+    for part in spec.split(','):
+        key, _, value = part.partition('=')
+        key = key.strip().upper()
+        if key not in allowed:
+            raise CommandError(f"Unknown key {key!r}; expected one of {', '.join(allowed)}")
+        try:
+            weights[key] = float(value)
+        except ValueError:
+            raise CommandError(f'Invalid weight for {key}: {value!r}')
+    return weights
+
+
+def cumulative(weights):
+    total, result = 0.0, []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+def insert_rows(model, columns, rows):
+    """
+    executemany() straight into the model's table. Skips per-object ORM work
+    (model instances, field preparation, signals, auto_now) so values must
+    already be in database form.
+    """
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(column) for column in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate reproducible synthetic data for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--citizens', type=int, default=1000)
+        parser.add_argument('--officers', type=int, default=20)
+        parser.add_argument('--complaints', type=int, default=10000)
+        parser.add_argument('--login-attempts', type=int, default=5000)
+        parser.add_argument('--comments-per-complaint', type=float, default=0.5,
+                            help='Mean number of comments per complaint')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread submissions over this many days before --end')
+        parser.add_argument('--end', default=None,
+                            help='Last day of generated activity (YYYY-MM-DD, default today)')
+        parser.add_argument('--wards', type=int, default=50)
+        parser.add_argument('--ward-skew', type=float, default=1.1,
+                            help='Zipf exponent: higher values concentrate complaints in few wards')
+        parser.add_argument('--department-weights', default='',
+                            help='e.g. WATER_SUPPLY=3,ROADS_TRANSPORT=2 (default uniform)')
+        parser.add_argument('--status-weights', default=DEFAULT_STATUS_WEIGHTS)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='syn', help='Username prefix of generated users')
+        parser.add_argument('--password', default='Synthetic@123')
+        parser.add_argument('--batch-size', type=int, default=50000,
+                            help='Complaints (or users, login attempts) per transaction')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.db_datetime = connection.ops.adapt_datetimefield_value
+
+        if options['citizens'] < 1:
+            raise CommandError('--citizens must be at least 1: every complaint needs a citizen.')
+        if Citizen.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise CommandError(
+                f"Users with prefix '{self.prefix}_' already exist; use another --prefix."
+            )
+
+        end_date = (
+            datetime.strptime(options['end'], '%Y-%m-%d').date()
+            if options['end'] else timezone.localdate()
+        )
+        self.end = timezone.make_aware(datetime.combine(end_date, dt_time(23, 59, 59)))
+        self.start = self.end - timedelta(days=options['days'])
+
+        self.ensure_departments()
+        dept_weights = {code: 1.0 for code, _ in Department.DEPARTMENT_CHOICES}
+        if options['department_weights']:
+            dept_weights.update(parse_weights(options['department_weights'], list(dept_weights)))
+        self.dept_codes = list(dept_weights)
+        self.dept_cum = cumulative(dept_weights.values())
+
+        status_weights = parse_weights(options['status_weights'], STATUS_FLOW)
+        self.statuses = list(status_weights)
+        self.status_cum = cumulative(status_weights.values())
+
+        self.wards = range(1, options['wards'] + 1)
+        self.ward_cum = cumulative(1 / (k ** options['ward_skew']) for k in self.wards)
+        self.hour_cum = cumulative(HOUR_WEIGHTS)
+
+        # One hash shared by every generated account keeps generation I/O bound
+        self.password_hash = make_password(options['password'])
+
+        started = time.monotonic()
+        self.next_mobile = self.mobile_numbers()
+        self.citizen_ids = self.create_citizens(options['citizens'])
+        self.officers = self.create_officers(options['officers'])
+        self.create_complaints(options['complaints'])
+        self.create_login_attempts(options['login_attempts'])
+
+        complaints_changed()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.monotonic() - started:.1f}s'
+        ))
+
+    # ---- helpers ---------------------------------------------------------
+
+    def report(self, label, count, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(f'  {label}: {count} rows in {elapsed:.1f}s ({count / elapsed:,.0f} rows/s)')
+
+    def chunks(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(start + self.batch_size, total)
+
+    def random_moment(self, start, end):
+        """Random timestamp between start and end following HOUR_WEIGHTS"""
+        day = start.date() + timedelta(days=self.rng.randrange(max((end - start).days, 1)))
+        hour = self.rng.choices(range(24), cum_weights=self.hour_cum)[0]
+        moment = datetime.combine(day, dt_time(hour, self.rng.randrange(60), self.rng.randrange(60)))
+        return timezone.make_aware(moment)
+
+    def mobile_numbers(self):
+        """Unique 10-digit mobile numbers, skipping those already in the database"""
+        existing = set(Citizen.objects.values_list('mobile', flat=True))
+        index = 0
+
+        def next_mobile():
+            nonlocal index
+            while True:
+                mobile = f'{6 + (index // 10 ** 9) % 4}{index % 10 ** 9:09d}'
+                index += 1
+                if mobile not in existing:
+                    return mobile
+        return next_mobile
+
+    def ensure_departments(self):
+        for code, name in Department.DEPARTMENT_CHOICES:
+            Department.objects.get_or_create(code=code, defaults={'name': name})
+
+    def complaint_ids(self):
+        """
+        Unique MCMS-YYYY-XXXXXXXX ids. Numbers walk a seeded affine permutation
+        of 0..10^8, so they look random but never collide with each other.
+        """
+        existing = set(Complaint.objects.values_list('complaint_id', flat=True))
+        multiplier = self.rng.randrange(1, 10 ** 8) | 1
+        while multiplier % 5 == 0:
+            multiplier += 2
+        offset = self.rng.randrange(10 ** 8)
+        i = 0
+
+        def next_id(year):
+            nonlocal i
+            while True:
+                complaint_id = f'MCMS-{year}-{(multiplier * i + offset) % 10 ** 8:08d}'
+                i += 1
+                if complaint_id not in existing:
+                    return complaint_id
+        return next_id
+
+    def lifecycle(self, target, submitted):
+        """Timestamps for each status reached, stopping at --end"""
+        reached = [('SUBMITTED', submitted)]
+        moment = submitted
+        for status in STATUS_FLOW[1:STATUS_FLOW.index(target) + 1]:
+            moment = moment + timedelta(hours=self.rng.expovariate(1 / MEAN_STEP_HOURS[status]))
+            if moment > self.end:
+                break
+            reached.append((status, moment))
+        return reached
+
+    # ---- generators ------------------------------------------------------
+
+    def create_citizens(self, total):
+        started = time.monotonic()
+        ids = []
+        for start, stop in self.chunks(total):
+            with transaction.atomic():
+                first = next_pk(Citizen)
+                rows = [
+                    (
+                        first + i - start,
+                        self.password_hash,
+                        False,
+                        f'{self.prefix}_{i:07d}',
+                        f'{self.prefix}_{i:07d}@citizens.example.org',
+                        self.next_mobile(),
+                        True, False, True,
+                        self.db_datetime(
+                            self.random_moment(self.start - timedelta(days=365), self.end)
+                        ),
+                    )
+                    for i in range(start, stop)
+                ]
+                insert_rows(Citizen, CITIZEN_COLUMNS, rows)
+            ids.extend(row[0] for row in rows)
+        self.report('citizens', total, started)
+        return ids
+
+    def create_officers(self, total):
+        started = time.monotonic()
+        officers = {code: [] for code in self.dept_codes}
+        joined = self.db_datetime(self.start)
+        with transaction.atomic():
+            first = next_pk(Citizen)
+            users, profiles = [], []
+            for i in range(total):
+                user_id = first + i
+                code = self.dept_codes[i % len(self.dept_codes)]
+                officers[code].append(user_id)
+                users.append((
+                    user_id,
+                    self.password_hash,
+                    False,
+                    f'{self.prefix}_officer{i:05d}',
+                    f'{self.prefix}_officer{i:05d}@mcms.example.org',
+                    self.next_mobile(),
+                    True, True, True,
+                    joined,
+                ))
+                profiles.append((
+                    user_id,
+                    f'{self.prefix.upper()}-EMP-{i:05d}',
+                    self.rng.choice(OFFICER_ROLES),
+                    'Ward Officer',
+                    code,
+                    True,
+                    joined,
+                ))
+            insert_rows(Citizen, CITIZEN_COLUMNS, users)
+            insert_rows(MunicipalOfficer, OFFICER_COLUMNS, profiles)
+        self.report('officers', total, started)
+        return officers
+
+    def create_complaints(self, total):
+        started = time.monotonic()
+        next_id = self.complaint_ids()
+        comment_p = self.options['comments_per_complaint'] / (1 + self.options['comments_per_complaint'])
+        rng = self.rng
+        ts = self.db_datetime
+        history_count = comment_count = 0
+
+        for start, stop in self.chunks(total):
+            with transaction.atomic():
+                pk = next_pk(Complaint)
+                complaints, history, comments = [], [], []
+                for _ in range(start, stop):
+                    code = rng.choices(self.dept_codes, cum_weights=self.dept_cum)[0]
+                    target = rng.choices(self.statuses, cum_weights=self.status_cum)[0]
+                    submitted = self.random_moment(self.start, self.end)
+                    steps = self.lifecycle(target, submitted)
+                    status = steps[-1][0]
+                    reached = {step_status: ts(moment) for step_status, moment in steps}
+
+                    officer_ids = self.officers.get(code)
+                    officer_id = (
+                        rng.choice(officer_ids) if officer_ids and status != 'SUBMITTED' else None
+                    )
+                    citizen_id = rng.choice(self.citizen_ids)
+                    ward = rng.choices(self.wards, cum_weights=self.ward_cum)[0]
+                    subject = rng.choice(SUBJECTS[code])
+
+                    complaints.append((
+                        pk,
+                        next_id(submitted.year),
+                        citizen_id,
+                        code,
+                        f'Ward {ward}',
+                        rng.choice(AREAS),
+                        '',
+                        subject,
+                        f'{subject} reported near {rng.choice(AREAS)}. Needs attention.',
+                        '',
+                        STATUS_CODES[status],
+                        '',
+                        officer_id,
+                        'Work completed.' if status in ('RESOLVED', 'CLOSED') else '',
+                        '',
+                        reached['SUBMITTED'],
+                        reached[status],
+                        reached.get('UNDER_REVIEW'),
+                        reached.get('IN_PROGRESS'),
+                        reached.get('RESOLVED'),
+                        reached.get('CLOSED'),
+                        False,
+                    ))
+
+                    previous = ''
+                    for step_status, _ in steps:
+                        history.append((
+                            pk,
+                            STATUS_CODES[previous],
+                            STATUS_CODES[step_status],
+                            officer_id if previous else citizen_id,
+                            '' if previous else 'Complaint submitted by citizen',
+                            reached[step_status],
+                        ))
+                        previous = step_status
+                    while officer_id and rng.random() < comment_p:
+                        comments.append((
+                            pk, officer_id, 'Site inspection scheduled.',
+                            rng.random() < 0.7, reached[status],
+                        ))
+                    pk += 1
+
+                insert_rows(Complaint, COMPLAINT_COLUMNS, complaints)
+                insert_rows(ComplaintStatusHistory, HISTORY_COLUMNS, history)
+                insert_rows(ComplaintComment, COMMENT_COLUMNS, comments)
+            history_count += len(history)
+            comment_count += len(comments)
+            self.stdout.write(f'  ... {stop}/{total} complaints')
+
+        self.report('complaints', total, started)
+        self.stdout.write(f'  status history: {history_count} rows, comments: {comment_count} rows')
+
+    def create_login_attempts(self, total):
+        started = time.monotonic()
+        citizens = max(self.options['citizens'], 1)
+        rng = self.rng
+        for start, stop in self.chunks(total):
+            rows = [
+                (
+                    f'{self.prefix}_{rng.randrange(citizens):07d}',
+                    f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+                    self.db_datetime(self.random_moment(self.start, self.end)),
+                    rng.random() < 0.85,
+                )
+                for _ in range(start, stop)
+            ]
+            with transaction.atomic():
+                insert_rows(LoginAttempt, LOGIN_COLUMNS, rows)
+        self.report('login attempts', total, started)
@@ -0,0 +1,137 @@
+"""
+Move existing uploads into the hashed media layout (mcms_config.media_layout)
+
+    nohup python manage.py migrate_media_layout --sleep 0.5 &
+
+Walks complaints by primary key in batches. Each file is first hard-linked
+(or copied across filesystems) to its new name, then the FileField paths of
+the batch are updated in one transaction, and only then is the old name
+removed. Both names therefore work at every point, and an interrupted run
+can simply be started again. Rows whose file changed meanwhile are left
+alone. Flat CAPTCHA images are moved last.
+"""
+
+import os
+import shutil
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from complaints.models import Complaint
+from mcms_config.media_layout import fanned_name
+
+FILE_FIELDS = ('proof_file', 'resolution_proof')
+
+
+def media_path(name):
+    return os.path.join(settings.MEDIA_ROOT, *name.split('/'))
+
+
+def link(old_name, new_name):
+    """Give the file at old_name a second name; False if there is no file"""
+    old, new = media_path(old_name), media_path(new_name)
+    if os.path.exists(new):
+        return True
+    if not os.path.exists(old):
+        return False
+    os.makedirs(os.path.dirname(new), exist_ok=True)
+    try:
+        os.link(old, new)
+    except OSError:
+        shutil.copy2(old, new)
+    return True
+
+
+def unlink(name, stop_at):
+    """Remove the file at `name` and any directories that leaves empty"""
+    path = media_path(name)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return
+    directory, stop_at = os.path.dirname(path), os.path.normpath(stop_at)
+    while os.path.normpath(directory) != stop_at:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+class Command(BaseCommand):
+    help = 'Move complaint files and CAPTCHA images into hashed directories, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Complaints per transaction')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches to leave I/O for live traffic')
+        parser.add_argument('--dry-run', action='store_true', help='Count what would move')
+        parser.add_argument('--skip-captcha', action='store_true')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        moved, missing = self.migrate_complaints(options)
+        captchas = 0 if options['skip_captcha'] else self.migrate_captcha(options['dry_run'])
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {moved} complaint files and {captchas} CAPTCHA images '
+            f'in {time.monotonic() - started:.1f}s ({missing} referenced files missing)'
+        ))
+
+    def migrate_complaints(self, options):
+        has_file = Q(proof_file__gt='') | Q(resolution_proof__gt='')
+        last_pk, moved, missing = 0, 0, 0
+        while True:
+            batch = list(
+                Complaint.objects.filter(has_file, pk__gt=last_pk)
+                .order_by('pk').values_list('pk', *FILE_FIELDS)[:options['batch_size']]
+            )
+            if not batch:
+                return moved, missing
+            last_pk = batch[-1][0]
+
+            # (pk, field, old name, new name) for files present under both names
+            renames = []
+            for pk, *names in batch:
+                for field, name in zip(FILE_FIELDS, names):
+                    new_name = fanned_name(name) if name else None
+                    if new_name is None:
+                        continue
+                    if options['dry_run'] or link(name, new_name):
+                        renames.append((pk, field, name, new_name))
+                    else:
+                        missing += 1
+            if options['dry_run']:
+                moved += len(renames)
+                continue
+
+            done = []
+            with transaction.atomic():
+                for pk, field, name, new_name in renames:
+                    # Conditional: skip rows whose file was replaced meanwhile
+                    if Complaint.objects.filter(pk=pk, **{field: name}).update(**{field: new_name}):
+                        done.append(name)
+            for name in done:
+                unlink(name, os.path.join(settings.MEDIA_ROOT, 'complaints'))
+            moved += len(done)
+            self.stdout.write(f'  up to complaint #{last_pk}: {moved} files moved')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+    def migrate_captcha(self, dry_run):
+        directory = os.path.join(settings.MEDIA_ROOT, 'captcha')
+        if not os.path.isdir(directory):
+            return 0
+        moved = 0
+        for entry in os.scandir(directory):
+            if not entry.is_file():
+                continue
+            name = f'captcha/{entry.name}'
+            if not dry_run:
+                link(name, fanned_name(name))
+                unlink(name, directory)
+            moved += 1
+        return moved
@@ -0,0 +1,43 @@
+"""
+Delete resumable uploads that expired before being attached to a complaint,
+and orphaned partial files left in the upload directory
+
+    python manage.py purge_uploads
+"""
+
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from complaints.models import ChunkedUpload
+from complaints.uploads import upload_settings
+
+
+class Command(BaseCommand):
+    help = 'Remove expired resumable uploads and their temporary files'
+
+    def handle(self, *args, **options):
+        config = upload_settings()
+        cutoff = timezone.now() - timedelta(seconds=config['MAX_AGE'])
+        expired = 0
+        for upload in ChunkedUpload.objects.filter(created_at__lt=cutoff).iterator():
+            upload.discard()
+            expired += 1
+
+        # Files whose record is gone, e.g. cascaded away with the owner's account
+        orphaned = 0
+        directory = config['TEMP_DIR']
+        if os.path.isdir(directory):
+            known = set(ChunkedUpload.objects.values_list('token', flat=True))
+            for entry in os.scandir(directory):
+                token = entry.name.removesuffix('.part')
+                if token not in known and entry.stat().st_mtime < time.time() - config['MAX_AGE']:
+                    os.remove(entry.path)
+                    orphaned += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {expired} expired uploads and {orphaned} orphaned files'
+        ))
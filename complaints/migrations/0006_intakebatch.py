@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('complaints', '0005_alter_complaint_resolution_proof'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntakeBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=100)),
+                ('request_hash', models.CharField(max_length=64)),
+                ('response', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('submitted_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intake_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Intake Batch',
+                'verbose_name_plural': 'Intake Batches',
+                'db_table': 'complaint_intake_batches',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='intakebatch',
+            constraint=models.UniqueConstraint(fields=('submitted_by', 'idempotency_key'), name='unique_intake_idempotency_key'),
+        ),
+    ]
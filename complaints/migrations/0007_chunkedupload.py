@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 18:06
+
+import complaints.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('complaints', '0006_intakebatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=complaints.models.generate_upload_token, editable=False, max_length=64, unique=True)),
+                ('filename', models.CharField(max_length=255)),
+                ('length', models.PositiveIntegerField()),
+                ('offset', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Chunked Upload',
+                'verbose_name_plural': 'Chunked Uploads',
+                'db_table': 'complaint_chunked_uploads',
+            },
+        ),
+    ]
@@ -0,0 +1,183 @@
+"""
+Store complaint and history statuses as SMALLINT codes (complaints.models.StatusField)
+
+The codes are first written to new nullable columns in batches of
+BATCH_SIZE rows, each in its own short transaction, so the application keeps
+writing between batches. A catch-up pass then picks up rows written
+meanwhile, and the new columns replace the old ones.
+"""
+
+from django.db import migrations, models, transaction
+from django.db.models import Case, Max, Value, When
+
+import complaints.models
+
+BATCH_SIZE = 5000
+
+# Frozen copy of complaints.models.STATUS_CODES at the time of this migration
+STATUS_CODES = {
+    '': 0,
+    'SUBMITTED': 1,
+    'UNDER_REVIEW': 2,
+    'IN_PROGRESS': 3,
+    'RESOLVED': 4,
+    'CLOSED': 5,
+    'ARCHIVED': 9,
+}
+
+# model -> [(name column, code column)]
+COLUMNS = {
+    'complaint': [('status', 'status_code')],
+    'complaintstatushistory': [('from_status', 'from_status_code'), ('to_status', 'to_status_code')],
+}
+
+STATUS_CHOICES = [
+    ('SUBMITTED', 'Submitted'),
+    ('UNDER_REVIEW', 'Under Review'),
+    ('IN_PROGRESS', 'In Progress'),
+    ('RESOLVED', 'Resolved'),
+    ('CLOSED', 'Closed'),
+]
+
+
+def _batched_update(model, db, updates, pending):
+    """Apply `updates` to the rows matching `pending`, BATCH_SIZE ids at a time"""
+    last = model.objects.using(db).aggregate(last=Max('pk'))['last'] or 0
+    for start in range(0, last, BATCH_SIZE):
+        with transaction.atomic(using=db):
+            model.objects.using(db).filter(
+                pending, pk__gt=start, pk__lte=start + BATCH_SIZE,
+            ).update(**updates)
+
+
+def names_to_codes(apps, schema_editor):
+    db = schema_editor.connection.alias
+    for model_name, columns in COLUMNS.items():
+        model = apps.get_model('complaints', model_name)
+        updates = {
+            code_column: Case(
+                *[When(**{name_column: name}, then=Value(code)) for name, code in STATUS_CODES.items()],
+                default=None, output_field=models.SmallIntegerField(),
+            )
+            for name_column, code_column in columns
+        }
+        pending = models.Q()
+        for _, code_column in columns:
+            pending |= models.Q(**{f'{code_column}__isnull': True})
+        # Backfill, then catch up with rows the running site wrote meanwhile
+        for _ in range(2):
+            _batched_update(model, db, updates, pending)
+
+        unknown = model.objects.using(db).filter(pending).values_list(*[name for name, _ in columns]).distinct()[:10]
+        if unknown:
+            raise ValueError(f'{model_name} rows with unknown statuses: {list(unknown)}')
+
+
+def codes_to_names(apps, schema_editor):
+    db = schema_editor.connection.alias
+    for model_name, columns in COLUMNS.items():
+        model = apps.get_model('complaints', model_name)
+        updates = {
+            name_column: Case(
+                *[When(**{code_column: code}, then=Value(name)) for name, code in STATUS_CODES.items()],
+                output_field=models.CharField(),
+            )
+            for name_column, code_column in columns
+        }
+        _batched_update(model, db, updates, models.Q())
+
+
+class Migration(migrations.Migration):
+
+    # Each backfill batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('complaints', '0007_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='status_code',
+            field=models.SmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='complaintstatushistory',
+            name='from_status_code',
+            field=models.SmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='complaintstatushistory',
+            name='to_status_code',
+            field=models.SmallIntegerField(null=True),
+        ),
+        migrations.RunPython(names_to_codes, codes_to_names),
+        migrations.RemoveIndex(
+            model_name='complaint',
+            name='complaints_status_abfa09_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='complaint',
+            name='complaints_departm_408e26_idx',
+        ),
+        # State only: gives to_status a default so that migrating backwards
+        # can re-add the column before codes_to_names fills it
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='complaintstatushistory',
+                name='to_status',
+                field=models.CharField(default='', max_length=20),
+            ),
+        ]),
+        migrations.RemoveField(
+            model_name='complaint',
+            name='status',
+        ),
+        migrations.RemoveField(
+            model_name='complaintstatushistory',
+            name='from_status',
+        ),
+        migrations.RemoveField(
+            model_name='complaintstatushistory',
+            name='to_status',
+        ),
+        migrations.RenameField(
+            model_name='complaint',
+            old_name='status_code',
+            new_name='status',
+        ),
+        migrations.RenameField(
+            model_name='complaintstatushistory',
+            old_name='from_status_code',
+            new_name='from_status',
+        ),
+        migrations.RenameField(
+            model_name='complaintstatushistory',
+            old_name='to_status_code',
+            new_name='to_status',
+        ),
+        migrations.AlterField(
+            model_name='complaint',
+            name='status',
+            field=complaints.models.StatusField(choices=STATUS_CHOICES, db_index=True, default='SUBMITTED'),
+        ),
+        migrations.AlterField(
+            model_name='complaintstatushistory',
+            name='from_status',
+            field=complaints.models.StatusField(blank=True, default=''),
+        ),
+        migrations.AlterField(
+            model_name='complaintstatushistory',
+            name='to_status',
+            field=complaints.models.StatusField(),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['status', 'submitted_at'], name='complaints_status_abfa09_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['department', 'status'], name='complaints_departm_408e26_idx'),
+        ),
+    ]
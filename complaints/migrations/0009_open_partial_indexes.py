@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaints', '0008_compact_status_codes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='complaint',
+            name='complaints_departm_408e26_idx',
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(condition=models.Q(('is_archived', False), ('status__lt', 'RESOLVED')), fields=['department', 'submitted_at'], name='complaints_open_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(condition=models.Q(('is_archived', False), ('status__lt', 'RESOLVED')), fields=['officer', 'submitted_at'], name='complaints_open_officer_idx'),
+        ),
+    ]
@@ -3,11 +3,16 @@ Complaints Models
 Core complaint management with audit trail
 """
 
+from datetime import timedelta
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from departments.models import Department
+from mcms_config.media_layout import fanout
+import os
 import random
+import secrets
 import string
 
 
@@ -21,15 +26,96 @@ def generate_complaint_id():
     return f"MCMS-{year}-{random_part}"
 
 
+def allocate_complaint_ids(count):
+    """
+    Generate `count` unused complaint IDs with one lookup per round
+    instead of one per complaint
+    """
+    allocated = set()
+    while len(allocated) < count:
+        candidates = {generate_complaint_id() for _ in range(count - len(allocated))} - allocated
+        taken = set(
+            Complaint.objects.filter(complaint_id__in=candidates).values_list('complaint_id', flat=True)
+        )
+        allocated |= candidates - taken
+    return list(allocated)
+
+
+# Statuses are stored as SMALLINT codes: 2 bytes instead of up to 20
+# characters in every row and every (status, ...) index entry. Never
+# renumber; add new codes instead. The open statuses must keep the codes
+# below RESOLVED: OPEN (and the partial indexes built on it) is
+# `status < 4`, a range SQLite can match against a bound parameter.
+STATUS_CODES = {
+    '': 0,  # history: no previous status
+    'SUBMITTED': 1,
+    'UNDER_REVIEW': 2,
+    'IN_PROGRESS': 3,
+    'RESOLVED': 4,
+    'CLOSED': 5,
+    'ARCHIVED': 9,  # history: complaint archived
+}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+
+class StatusField(models.SmallIntegerField):
+    """
+    A status stored as its STATUS_CODES integer, but read, written, filtered
+    and displayed by name ('UNDER_REVIEW'), so choices, get_status_display()
+    and status__in=[...] work as they did with a CharField
+    """
+    
+    @property
+    def validators(self):
+        # No integer range validators: Python values are names
+        return list(self._validators)
+    
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else STATUS_NAMES.get(value, value)
+    
+    def to_python(self, value):
+        if value is None or value in STATUS_CODES:
+            return value
+        if isinstance(value, int) and value in STATUS_NAMES:
+            return STATUS_NAMES[value]
+        raise ValidationError(f'Unknown status {value!r}.', code='invalid')
+    
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return STATUS_CODES[value]
+        except (KeyError, TypeError):
+            raise ValueError(f'Unknown status {value!r}')
+
+
+# Complaints the lists and counters show, and those still awaiting work.
+# Queries must repeat these predicates exactly for SQLite to use the partial
+# indexes in Complaint.Meta; use Complaint.objects.live() / .open().
+LIVE = models.Q(is_archived=False)
+OPEN = models.Q(is_archived=False, status__lt='RESOLVED')
+OPEN_STATUSES = [name for name, code in STATUS_CODES.items() if 0 < code < STATUS_CODES['RESOLVED']]
+
+
+class ComplaintQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(LIVE)
+
+    def open(self):
+        return self.filter(OPEN)
+
+
 def complaint_proof_upload_path(instance, filename):
     """
-    Generate upload path for complaint proof files
+    Generate upload path for complaint proof files, under hashed
+    directories (mcms_config.media_layout)
     """
-    return f'complaints/{instance.complaint_id}/{filename}'
+    return f'complaints/{fanout(instance.complaint_id)}/{instance.complaint_id}/{filename}'
 
 
 def resolution_proof_upload_path(instance, filename):
-    return f'complaints/{instance.complaint_id}/resolution/{filename}'
+    return f'complaints/{fanout(instance.complaint_id)}/{instance.complaint_id}/resolution/{filename}'
 
 
 class Complaint(models.Model):
@@ -86,8 +172,7 @@ class Complaint(models.Model):
     )
     
     # Status and workflow
-    status = models.CharField(
-        max_length=20,
+    status = StatusField(
         choices=STATUS_CHOICES,
         default='SUBMITTED',
         db_index=True
@@ -127,6 +212,8 @@ class Complaint(models.Model):
     # Soft delete flag (no actual deletion)
     is_archived = models.BooleanField(default=False)
     
+    objects = ComplaintQuerySet.as_manager()
+    
     class Meta:
         db_table = 'complaints'
         verbose_name = 'Complaint'
@@ -135,7 +222,13 @@ class Complaint(models.Model):
         indexes = [
             models.Index(fields=['complaint_id']),
             models.Index(fields=['status', 'submitted_at']),
-            models.Index(fields=['department', 'status']),
+            # Partial indexes over the open rows only, a fraction of a table
+            # that keeps every complaint ever filed (tests.QueryPlanTests).
+            # They replace a full (department, status) index, which SQLite
+            # preferred for open-by-department queries whenever the
+            # database had not been ANALYZEd.
+            models.Index(fields=['department', 'submitted_at'], condition=OPEN, name='complaints_open_dept_idx'),
+            models.Index(fields=['officer', 'submitted_at'], condition=OPEN, name='complaints_open_officer_idx'),
         ]
     
     def __str__(self):
@@ -197,8 +290,8 @@ class ComplaintStatusHistory(models.Model):
         related_name='status_history'
     )
     
-    from_status = models.CharField(max_length=20, blank=True)
-    to_status = models.CharField(max_length=20)
+    from_status = StatusField(blank=True, default='')
+    to_status = StatusField()
     
     changed_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -251,3 +344,92 @@ class ComplaintComment(models.Model):
     
     def __str__(self):
         return f"Comment on {self.complaint.complaint_id}"
+
+
+class IntakeBatch(models.Model):
+    """
+    Idempotency record for batch complaint intake
+    A retried batch with the same key returns the stored response
+    """
+    
+    submitted_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='intake_batches'
+    )
+    idempotency_key = models.CharField(max_length=100)
+    request_hash = models.CharField(max_length=64)
+    response = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'complaint_intake_batches'
+        verbose_name = 'Intake Batch'
+        verbose_name_plural = 'Intake Batches'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['submitted_by', 'idempotency_key'],
+                name='unique_intake_idempotency_key'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.submitted_by} - {self.idempotency_key}"
+
+
+def generate_upload_token():
+    return secrets.token_urlsafe(24)
+
+
+class ChunkedUpload(models.Model):
+    """
+    Resumable upload in progress (complaints.uploads)
+    Chunks are appended to a temporary file; once complete, the token is
+    submitted with a complaint form in place of the file itself
+    """
+    
+    token = models.CharField(
+        max_length=64,
+        unique=True,
+        default=generate_upload_token,
+        editable=False
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='chunked_uploads'
+    )
+    filename = models.CharField(max_length=255)
+    length = models.PositiveIntegerField()
+    offset = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        db_table = 'complaint_chunked_uploads'
+        verbose_name = 'Chunked Upload'
+        verbose_name_plural = 'Chunked Uploads'
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.length})"
+    
+    @property
+    def path(self):
+        from .uploads import upload_settings
+        return os.path.join(upload_settings()['TEMP_DIR'], f'{self.token}.part')
+    
+    @property
+    def is_complete(self):
+        return self.offset == self.length
+    
+    @property
+    def expires_at(self):
+        from .uploads import upload_settings
+        return self.created_at + timedelta(seconds=upload_settings()['MAX_AGE'])
+    
+    def discard(self):
+        """Delete the temporary file (if still there) and this record"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.delete()
@@ -0,0 +1,29 @@
+"""
+Complaints Signals
+Invalidate cached dashboard and report data when complaints change, and
+count status transitions
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from mcms_config import viewcache
+from mcms_config.metrics import STATUS_TRANSITIONS
+from .models import Complaint, ComplaintStatusHistory
+
+
+def complaints_changed():
+    """Invalidate views aggregating complaints; call after bulk writes too"""
+    viewcache.invalidate('admin_dashboard')
+    viewcache.invalidate('reports')
+
+
+@receiver([post_save, post_delete], sender=Complaint)
+@receiver([post_save, post_delete], sender=ComplaintStatusHistory)
+def complaint_saved(sender, **kwargs):
+    complaints_changed()
+
+
+@receiver(post_save, sender=ComplaintStatusHistory)
+def status_changed(sender, instance, created, **kwargs):
+    if created:
+        STATUS_TRANSITIONS.inc(from_status=instance.from_status or 'NEW', to_status=instance.to_status)
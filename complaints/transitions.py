@@ -0,0 +1,146 @@
+"""
+Complaint Status Transitions
+Applies officer edits with one conditional UPDATE per change, so concurrent
+edits are detected instead of silently overwriting each other, and status
+changes follow the complaint workflow
+"""
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from mcms_config.metrics import UPDATE_CONFLICTS
+from .models import Complaint, ComplaintStatusHistory
+from .signals import complaints_changed
+
+# Status -> statuses it may move to. Complaints may be resolved straight
+# from the list ("Quick Resolve"), rejected (closed) before work starts and
+# reopened after resolution; closed complaints are final.
+ALLOWED_TRANSITIONS = {
+    'SUBMITTED': {'UNDER_REVIEW', 'IN_PROGRESS', 'RESOLVED', 'CLOSED'},
+    'UNDER_REVIEW': {'IN_PROGRESS', 'RESOLVED', 'CLOSED'},
+    'IN_PROGRESS': {'UNDER_REVIEW', 'RESOLVED'},
+    'RESOLVED': {'IN_PROGRESS', 'CLOSED'},
+    'CLOSED': set(),
+}
+
+# Set the first time a complaint reaches the status
+STATUS_TIMESTAMPS = {
+    'UNDER_REVIEW': 'reviewed_at',
+    'IN_PROGRESS': 'in_progress_at',
+    'RESOLVED': 'resolved_at',
+    'CLOSED': 'closed_at',
+}
+
+
+class TransitionError(Exception):
+    pass
+
+
+class IllegalTransition(TransitionError):
+    def __init__(self, from_status, to_status):
+        self.from_status, self.to_status = from_status, to_status
+        super().__init__(f'A complaint cannot move from {from_status} to {to_status}.')
+
+
+class TransitionConflict(TransitionError):
+    """The complaint changed after the editor loaded it; `current` is the fresh row"""
+
+    def __init__(self, current):
+        self.current = current
+        who = current.status if current else 'deleted'
+        super().__init__(
+            'This complaint was updated by someone else while you were editing it '
+            f'(now {who}). Your changes were not saved; review them and submit again.'
+        )
+
+
+def allowed_statuses(status):
+    """`status` and the statuses a complaint in it may move to, in workflow order"""
+    targets = ALLOWED_TRANSITIONS.get(status, set()) | {status}
+    return [code for code, _ in Complaint.STATUS_CHOICES if code in targets]
+
+
+def check_transition(from_status, to_status):
+    if to_status != from_status and to_status not in ALLOWED_TRANSITIONS.get(from_status, ()):
+        raise IllegalTransition(from_status, to_status)
+
+
+def _column_value(complaint, name, value, stored):
+    """The database value for field `name`; new files are saved to storage first"""
+    if value is False or (value is None and isinstance(getattr(complaint, name), FieldFile)):
+        return ''  # cleared file
+    if isinstance(value, File) and not isinstance(value, FieldFile):
+        field = complaint._meta.get_field(name)
+        stored_name = default_storage.save(field.generate_filename(complaint, value.name), value)
+        stored.append(stored_name)
+        return stored_name
+    if isinstance(value, FieldFile):
+        return value.name
+    return value
+
+
+def update_complaint(complaint, changes, *, user, seen=None, remarks='', event=None):
+    """
+    Write `changes` (field name -> value, optionally including 'status') to
+    `complaint`, which must hold the values the editor started from, with
+
+        UPDATE complaints SET <changed columns>
+        WHERE id = ... AND status = <complaint.status> AND last_updated = <seen>
+
+    and, in the same transaction, a ComplaintStatusHistory row for a status
+    change (or for `event`, e.g. 'ARCHIVED'). `seen` is the last_updated
+    the editor loaded, defaulting to complaint.last_updated.
+
+    Returns the names of the fields written, possibly none. Raises
+    IllegalTransition, or TransitionConflict when the row has moved on.
+    """
+    expected_status = complaint.status
+    seen = seen or complaint.last_updated
+    new_status = changes.get('status', expected_status)
+    check_transition(expected_status, new_status)
+
+    now = timezone.now()
+    changed = {
+        name: value for name, value in changes.items()
+        if getattr(complaint, name) != value or (isinstance(value, File) and not isinstance(value, FieldFile))
+    }
+    timestamp = STATUS_TIMESTAMPS.get(new_status)
+    if new_status != expected_status and timestamp and not getattr(complaint, timestamp):
+        changed[timestamp] = now
+    if not changed and event is None:
+        return []
+
+    stored = []
+    columns = {name: _column_value(complaint, name, value, stored) for name, value in changed.items()}
+    columns['last_updated'] = now
+    try:
+        with transaction.atomic():
+            updated = Complaint.objects.filter(
+                pk=complaint.pk, status=expected_status, last_updated=seen,
+            ).update(**columns)
+            if not updated:
+                raise TransitionConflict(Complaint.objects.filter(pk=complaint.pk).first())
+            if new_status != expected_status or event:
+                ComplaintStatusHistory.objects.create(
+                    complaint=complaint,
+                    from_status=expected_status,
+                    to_status=event or new_status,
+                    changed_by=user,
+                    remarks=remarks,
+                )
+    except TransitionConflict:
+        UPDATE_CONFLICTS.inc()
+        for name in stored:
+            default_storage.delete(name)
+        raise
+
+    for name, value in columns.items():
+        setattr(complaint, name, value)
+    # The history row's post_save covers status changes; update() sends no
+    # Complaint signal for the other edits
+    if new_status == expected_status and not event:
+        transaction.on_commit(complaints_changed)
+    return sorted(changed)
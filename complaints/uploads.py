@@ -0,0 +1,199 @@
+"""
+Resumable Uploads
+Chunked uploads after the core of the tus protocol: create with
+Upload-Length, query the offset with HEAD, append with PATCH. Forms then
+reference the finished file by token instead of posting it again.
+"""
+
+import base64
+import binascii
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods, require_POST
+
+from mcms_config.uploadhandlers import SNIFF_BYTES, content_error, size_error, sniff, type_error
+from .api import api_auth
+from .models import ChunkedUpload
+
+
+def upload_settings():
+    config = {
+        'TEMP_DIR': os.path.join(tempfile.gettempdir(), 'mcms-uploads'),
+        'MAX_CHUNK_SIZE': 1024 * 1024,
+        'MAX_AGE': 24 * 3600,
+    }
+    config.update(getattr(settings, 'RESUMABLE_UPLOADS', {}))
+    return config
+
+
+def validate_upload(filename, length):
+    """The ComplaintForm file rules, checked before any byte is sent"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in settings.ALLOWED_UPLOAD_EXTENSIONS:
+        raise ValidationError(type_error())
+    if length > settings.MAX_UPLOAD_SIZE:
+        raise ValidationError(size_error())
+    if length <= 0:
+        raise ValidationError('The file is empty.')
+
+
+class AssembledFile(File):
+    """
+    A finished upload. temporary_file_path() lets FileSystemStorage move it
+    into MEDIA_ROOT instead of copying, as with Django's own temporary uploads.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def resolve_upload(token, user):
+    """The complete, unexpired upload `token` of `user`, or ValidationError"""
+    upload = ChunkedUpload.objects.filter(token=token, owner_id=getattr(user, 'pk', None)).first()
+    if upload is None or upload.expires_at < timezone.now() or not os.path.exists(upload.path):
+        raise ValidationError('The uploaded file has expired. Please attach it again.')
+    if not upload.is_complete:
+        raise ValidationError('The file upload has not finished yet.')
+    return upload
+
+
+def open_upload(upload):
+    return AssembledFile(open(upload.path, 'rb'), name=upload.filename)
+
+
+def _parse_metadata(header):
+    """tus Upload-Metadata: comma-separated 'key base64value' pairs"""
+    metadata = {}
+    for pair in filter(None, (item.strip() for item in header.split(','))):
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode() if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError(key)
+    return metadata
+
+
+def _state(response, upload):
+    response['Upload-Offset'] = str(upload.offset)
+    response['Upload-Length'] = str(upload.length)
+    response['Upload-Expires'] = upload.expires_at.isoformat()
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def _error(message, status, upload=None):
+    response = JsonResponse({'error': message}, status=status)
+    return _state(response, upload) if upload is not None else response
+
+
+@require_POST
+@api_auth
+def create_upload(request):
+    """
+    Start an upload. Headers: Upload-Length (bytes) and Upload-Metadata with
+    a base64 'filename'. Returns its Location, token and the largest chunk
+    the server accepts; the client picks any chunk size up to that.
+    """
+    try:
+        length = int(request.headers.get('Upload-Length', ''))
+        metadata = _parse_metadata(request.headers.get('Upload-Metadata', ''))
+    except ValueError:
+        return _error('Send Upload-Length and a base64 Upload-Metadata filename.', 400)
+    filename = os.path.basename(metadata.get('filename', '').replace('\\', '/'))[:255]
+    if not filename:
+        return _error('Upload-Metadata must include a filename.', 400)
+    try:
+        validate_upload(filename, length)
+    except ValidationError as e:
+        return _error(e.messages[0], 413 if length > settings.MAX_UPLOAD_SIZE else 400)
+
+    os.makedirs(upload_settings()['TEMP_DIR'], exist_ok=True)
+    upload = ChunkedUpload.objects.create(owner=request.user, filename=filename, length=length)
+    open(upload.path, 'wb').close()
+
+    location = reverse('complaints:upload_detail', args=[upload.token])
+    response = _state(JsonResponse({
+        'token': upload.token,
+        'location': location,
+        'offset': 0,
+        'max_chunk_size': upload_settings()['MAX_CHUNK_SIZE'],
+    }, status=201), upload)
+    response['Location'] = location
+    return response
+
+
+@require_http_methods(['HEAD', 'GET', 'PATCH', 'DELETE'])
+@api_auth
+def upload_detail(request, token):
+    """
+    HEAD/GET: current offset. PATCH: append the body at Upload-Offset, which
+    must equal the current offset. DELETE: abandon the upload.
+    """
+    upload = ChunkedUpload.objects.filter(token=token, owner=request.user).first()
+    if upload is None:
+        return _error('Unknown upload.', 404)
+    if upload.expires_at < timezone.now() or not os.path.exists(upload.path):
+        upload.discard()
+        return _error('Upload expired.', 410)
+
+    if request.method == 'DELETE':
+        upload.discard()
+        return HttpResponse(status=204)
+    if request.method != 'PATCH':
+        return _state(JsonResponse({
+            'token': upload.token,
+            'filename': upload.filename,
+            'offset': upload.offset,
+            'length': upload.length,
+            'complete': upload.is_complete,
+        }), upload)
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+        size = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return _error('Upload-Offset must be an integer.', 400, upload)
+    if offset != upload.offset:
+        return _error('Upload-Offset does not match; resume from the returned offset.', 409, upload)
+    # Reject before reading the body
+    if size > upload_settings()['MAX_CHUNK_SIZE']:
+        return _error(f"Chunks may be at most {upload_settings()['MAX_CHUNK_SIZE']} bytes.", 413, upload)
+    if offset + size > upload.length:
+        return _error('Chunk runs past Upload-Length.', 413, upload)
+
+    chunk = request.body
+    if not chunk or len(chunk) != size:
+        return _error('Empty or truncated chunk.', 400, upload)
+
+    # Check the magic bytes as soon as enough of the file has arrived
+    if offset < SNIFF_BYTES:
+        with open(upload.path, 'rb') as f:
+            head = f.read(offset) + chunk
+        ext = os.path.splitext(upload.filename)[1].lower()
+        if sniff(ext, head[:SNIFF_BYTES], complete=offset + size == upload.length) is False:
+            upload.discard()
+            return _error(content_error(ext), 415)
+
+    # The conditional UPDATE holds the write lock until the chunk is on disk,
+    # so a retried request racing the original gets a 409 instead of
+    # writing the same range twice
+    with transaction.atomic():
+        claimed = ChunkedUpload.objects.filter(pk=upload.pk, offset=offset).update(offset=F('offset') + size)
+        if not claimed:
+            upload.refresh_from_db()
+            return _error('Upload-Offset does not match; resume from the returned offset.', 409, upload)
+        with open(upload.path, 'r+b') as f:
+            f.seek(offset)
+            f.write(chunk)
+            f.truncate()
+    upload.offset = offset + size
+    return _state(HttpResponse(status=204), upload)
@@ -3,20 +3,28 @@ Complaints URL Configuration
 """
 
 from django.urls import path
-from . import views
+from mcms_config.middleware import query_budget
+from . import api, uploads, views
 
 app_name = 'complaints'
 
 urlpatterns = [
     # Dashboard
-    path('dashboard/', views.citizen_dashboard, name='dashboard'),
+    path('dashboard/', query_budget(10)(views.citizen_dashboard), name='dashboard'),
     
     # Submit complaint
-    path('submit/', views.submit_complaint, name='submit'),
+    path('submit/', query_budget(14)(views.submit_complaint), name='submit'),
     
     # View complaint detail
-    path('detail/<str:complaint_id>/', views.complaint_detail, name='detail'),
+    path('detail/<str:complaint_id>/', query_budget(10)(views.complaint_detail), name='detail'),
     
     # Track complaint
-    path('track/', views.track_complaint, name='track'),
+    path('track/', query_budget(8)(views.track_complaint), name='track'),
+    
+    # Batch intake API (call centres, kiosks)
+    path('api/batch/', query_budget(40)(api.batch_intake), name='api_batch'),
+    
+    # Resumable chunked uploads for proof and resolution files
+    path('uploads/', query_budget(6)(uploads.create_upload), name='upload_create'),
+    path('uploads/<str:token>/', query_budget(6)(uploads.upload_detail), name='upload_detail'),
 ]
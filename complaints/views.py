@@ -43,13 +43,14 @@ def submit_complaint(request):
     Submit new complaint
     """
     if request.method == 'POST':
-        form = ComplaintForm(request.POST, request.FILES)
+        form = ComplaintForm(request.POST, request.FILES, user=request.user)
         
         if form.is_valid():
             complaint = form.save(commit=False)
             complaint.citizen = request.user
             complaint.status = 'SUBMITTED'
             complaint.save()
+            form.discard_uploads()
             
             # Create initial status history
             ComplaintStatusHistory.objects.create(
@@ -25,6 +25,7 @@ class ComplaintCategoryAdmin(admin.ModelAdmin):
     """
     
     list_display = ['name', 'department', 'priority', 'is_active']
+    list_select_related = ['department']
     list_filter = ['department', 'priority', 'is_active']
     search_fields = ['name', 'department__name']
     ordering = ['department', 'name']
@@ -9,3 +9,6 @@ class DepartmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'departments'
     verbose_name = 'Municipal Departments'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,57 @@
+"""
+Departments Forms
+Form fields backed by the reference-data snapshot
+"""
+
+from django import forms
+from django.core.exceptions import ValidationError
+from .models import Department
+from .refdata import get_snapshot
+
+
+class SnapshotDepartmentChoiceIterator:
+    """Lazily yields active department choices from the snapshot"""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for department in get_snapshot().active_departments:
+            yield (department.code, self.field.label_from_instance(department))
+
+    def __len__(self):
+        return len(get_snapshot().active_departments) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(get_snapshot().active_departments)
+
+
+class DepartmentChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField over active departments that renders and validates
+    from the in-process snapshot instead of querying the database
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(queryset=Department.objects.filter(is_active=True), **kwargs)
+
+    def _get_choices(self):
+        return SnapshotDepartmentChoiceIterator(self)
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, Department):
+            value = value.pk
+        department = get_snapshot().department(str(value))
+        if department is None or not department.is_active:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return department
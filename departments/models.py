@@ -86,4 +86,10 @@ class ComplaintCategory(models.Model):
         unique_together = ['department', 'name']
     
     def __str__(self):
-        return f"{self.department.name} - {self.name}"
+        from .refdata import get_snapshot
+        
+        # Avoid a department query per row; the snapshot holds every department
+        department = get_snapshot().department(self.department_id)
+        if department is None:
+            department = self.department
+        return f"{department.name} - {self.name}"
@@ -0,0 +1,89 @@
+"""
+Departments Reference Data
+Process-local, versioned snapshot of departments and complaint categories
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'refdata:version'
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+class ReferenceSnapshot:
+    """
+    Immutable view of the department and category tables at one version.
+    Instances are shared between requests and must not be modified.
+    """
+
+    def __init__(self, version, departments, categories):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.departments = departments
+        self.active_departments = [d for d in departments if d.is_active]
+        self.by_code = {d.code: d for d in departments}
+
+        self.categories_by_department = {}
+        for category in categories:
+            # Attach the shared department so category.department never queries
+            category.department = self.by_code[category.department_id]
+            self.categories_by_department.setdefault(category.department_id, []).append(category)
+
+    def department(self, code):
+        """Department by code, or None"""
+        return self.by_code.get(code)
+
+    def active_categories(self, code):
+        """Active categories of one department"""
+        return [c for c in self.categories_by_department.get(code, []) if c.is_active]
+
+
+def current_version():
+    """Version stamp shared through the cache; bumped on every change"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def _load(version):
+    from .models import Department, ComplaintCategory
+
+    departments = list(Department.objects.all())
+    categories = list(ComplaintCategory.objects.all())
+    return ReferenceSnapshot(version, departments, categories)
+
+
+def get_snapshot():
+    """
+    Current snapshot, reloaded when the version stamp changes or after
+    REFDATA_MAX_AGE seconds (covers workers that do not share the cache)
+    """
+    global _snapshot
+    version = current_version()
+    max_age = getattr(settings, 'REFDATA_MAX_AGE', 300)
+
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version \
+            and time.monotonic() - snapshot.loaded_at < max_age:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version \
+                or time.monotonic() - snapshot.loaded_at >= max_age:
+            snapshot = _snapshot = _load(version)
+    return snapshot
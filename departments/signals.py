@@ -0,0 +1,24 @@
+"""
+Departments Signals
+Refresh reference data and cached views when departments change
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from mcms_config import viewcache
+from .models import Department, ComplaintCategory
+from .refdata import bump_version
+
+
+@receiver([post_save, post_delete], sender=Department)
+def department_changed(sender, instance, **kwargs):
+    bump_version()
+    viewcache.invalidate('department_detail', instance.code)
+    viewcache.invalidate('admin_dashboard')
+    viewcache.invalidate('reports')
+
+
+@receiver([post_save, post_delete], sender=ComplaintCategory)
+def category_changed(sender, instance, **kwargs):
+    bump_version()
+    viewcache.invalidate('department_detail', instance.department_id)
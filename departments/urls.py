@@ -3,11 +3,12 @@ Departments URL Configuration
 """
 
 from django.urls import path
+from mcms_config.middleware import query_budget
 from . import views
 
 app_name = 'departments'
 
 urlpatterns = [
-    path('', views.department_list, name='list'),
-    path('<str:dept_code>/', views.department_detail, name='detail'),
+    path('', query_budget(4)(views.department_list), name='list'),
+    path('<str:dept_code>/', query_budget(4)(views.department_detail), name='detail'),
 ]
@@ -4,14 +4,24 @@ Display department information
 """
 
 from django.shortcuts import render, get_object_or_404
-from .models import Department, ComplaintCategory
+from mcms_config.viewcache import cached_data
+from .models import Department
+from .refdata import get_snapshot
+
+
+@cached_data('department_detail', scope_arg='dept_code')
+def _department_with_categories(dept_code):
+    """Department and its active categories (cached per department)"""
+    department = get_object_or_404(Department, code=dept_code, is_active=True)
+    categories = list(department.categories.filter(is_active=True))
+    return department, categories
 
 
 def department_list(request):
     """
     List all active departments
     """
-    departments = Department.objects.filter(is_active=True)
+    departments = get_snapshot().active_departments
     
     context = {
         'departments': departments
@@ -23,8 +33,7 @@ def department_detail(request, dept_code):
     """
     Department detail page with categories
     """
-    department = get_object_or_404(Department, code=dept_code, is_active=True)
-    categories = department.categories.filter(is_active=True)
+    department, categories = _department_with_categories(dept_code)
     
     context = {
         'department': department,
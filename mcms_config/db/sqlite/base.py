@@ -0,0 +1,113 @@
+"""
+Tuned SQLite backend for MCMS
+Per-connection pragmas for concurrent workers, IMMEDIATE write transactions
+and jittered retry of SQLITE_BUSY
+
+DATABASES OPTIONS understood in addition to the stock sqlite3 ones:
+    pragmas           dict merged over DEFAULT_PRAGMAS
+    transaction_mode  DEFERRED / IMMEDIATE / EXCLUSIVE for atomic blocks
+    busy_retries      attempts after the busy timeout expires
+    busy_retry_delay  base backoff in seconds (doubled per attempt, jittered)
+
+busy_timeout comes from, in order of precedence: pragmas['busy_timeout']
+(ms), the stock `timeout` option (seconds), then DEFAULT_PRAGMAS.
+"""
+
+import random
+import sqlite3
+import time
+
+from django.db.backends.sqlite3 import base as sqlite3_base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',  # readers never block the writer
+    'synchronous': 'NORMAL',  # durable at checkpoints; safe with WAL
+    'busy_timeout': 5000,  # ms SQLite itself waits for a lock
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -32000,  # negative = KiB, i.e. ~32MB page cache
+    'temp_store': 'MEMORY',
+}
+
+CUSTOM_OPTIONS = ('pragmas', 'transaction_mode', 'busy_retries', 'busy_retry_delay')
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def is_busy_error(exc):
+    """True for SQLITE_BUSY / SQLITE_LOCKED errors"""
+    code = getattr(exc, 'sqlite_errorcode', None)
+    if code is not None:
+        return code in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(exc)
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+def retry_busy(func, retries, base_delay, *args):
+    """Call func, retrying SQLITE_BUSY with exponential, jittered backoff"""
+    attempt = 0
+    while True:
+        try:
+            return func(*args)
+        except sqlite3.OperationalError as exc:
+            if attempt >= retries or not is_busy_error(exc):
+                raise
+            delay = base_delay * (2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            attempt += 1
+
+
+class RetryingCursorWrapper(sqlite3_base.SQLiteCursorWrapper):
+    """Cursor that retries statements rejected with SQLITE_BUSY"""
+
+    busy_retries = 0
+    busy_retry_delay = 0.05
+
+    def execute(self, query, params=None):
+        return retry_busy(super().execute, self.busy_retries, self.busy_retry_delay, query, params)
+
+    def executemany(self, query, param_list):
+        return retry_busy(super().executemany, self.busy_retries, self.busy_retry_delay, query, param_list)
+
+
+class DatabaseWrapper(sqlite3_base.DatabaseWrapper):
+    """SQLite DatabaseWrapper tuned for several concurrent worker processes"""
+
+    def _options(self):
+        return self.settings_dict['OPTIONS']
+
+    def get_pragmas(self):
+        pragmas = dict(DEFAULT_PRAGMAS)
+        # Pragmas run after connecting, so busy_timeout would otherwise
+        # replace the wait sqlite3.connect(timeout=...) set up
+        timeout = self._options().get('timeout')
+        if timeout is not None:
+            pragmas['busy_timeout'] = int(timeout * 1000)
+        pragmas.update(self._options().get('pragmas', {}))
+        return pragmas
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for key in CUSTOM_OPTIONS:
+            params.pop(key, None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.get_pragmas().items():
+            if value is not None:
+                conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.busy_retries = self._options().get('busy_retries', 5)
+        cursor.busy_retry_delay = self._options().get('busy_retry_delay', 0.05)
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so a transaction
+        # never has to upgrade a read lock (which fails without waiting)
+        mode = self._options().get('transaction_mode', 'IMMEDIATE').upper()
+        if mode not in TRANSACTION_MODES:
+            mode = 'DEFERRED'
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,94 @@
+"""
+Calibrated Password Hashers
+PBKDF2 and scrypt with cost parameters taken from settings.PASSWORD_HASHING,
+which `manage.py calibrate_hashers` tunes for this machine
+"""
+
+import base64
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher
+
+DEFAULTS = {
+    'ALGORITHM': 'pbkdf2_sha256',
+    'PBKDF2_ITERATIONS': PBKDF2PasswordHasher.iterations,
+    'SCRYPT_WORK_FACTOR': ScryptPasswordHasher.work_factor,
+    'SCRYPT_BLOCK_SIZE': ScryptPasswordHasher.block_size,
+    'SCRYPT_PARALLELISM': ScryptPasswordHasher.parallelism,
+}
+
+HASHERS = {
+    'pbkdf2_sha256': 'mcms_config.hashers.CalibratedPBKDF2PasswordHasher',
+    'scrypt': 'mcms_config.hashers.CalibratedScryptPasswordHasher',
+}
+
+
+def hashing_settings():
+    return {**DEFAULTS, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+def password_hashers(algorithm):
+    """
+    PASSWORD_HASHERS with `algorithm` preferred and every other format still
+    verifiable. settings.py builds PASSWORD_HASHERS with this, so the module
+    must not read settings at import time.
+    """
+    preferred = HASHERS[algorithm]
+    return [preferred] + [path for path in HASHERS.values() if path != preferred] + [
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    ]
+
+
+def scrypt_memory(n, r, p):
+    """Bytes OpenSSL allocates for scrypt(n, r, p), plus slack for its own check"""
+    return 128 * r * (n + p + 2) + 1024 * 1024
+
+
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Same format as Django's PBKDF2 hasher, so existing hashes verify; hashes
+    with another iteration count are re-encoded at the next login
+    """
+
+    @property
+    def iterations(self):
+        return hashing_settings()['PBKDF2_ITERATIONS']
+
+
+class CalibratedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    Django's scrypt hasher with configurable cost. OpenSSL refuses more than
+    32 MiB by default, so maxmem is sized for each hash rather than fixed.
+    """
+
+    @property
+    def work_factor(self):
+        return hashing_settings()['SCRYPT_WORK_FACTOR']
+
+    @property
+    def block_size(self):
+        return hashing_settings()['SCRYPT_BLOCK_SIZE']
+
+    @property
+    def parallelism(self):
+        return hashing_settings()['SCRYPT_PARALLELISM']
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        self._check_encode_args(password, salt)
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(),
+            salt=salt.encode(),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=scrypt_memory(n, r, p),
+            dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
@@ -0,0 +1,62 @@
+"""
+Media Directory Layout
+Spreads uploads over two levels of hashed directories so that no directory
+grows past a few hundred entries, and maps names between the old flat
+layout and the new one while `migrate_media_layout` runs
+
+    complaints/<complaint_id>/<file>      -> complaints/3f/a2/<complaint_id>/<file>
+    captcha/captcha_<session>.png         -> captcha/9c/0e/captcha_<session>.png
+"""
+
+import hashlib
+
+from django.core.files.storage import default_storage
+
+FANNED_ROOTS = ('complaints', 'captcha')
+LEVELS = 2
+WIDTH = 2  # hex digits per level: 256 directories each, 65536 leaves
+
+
+def fanout(key):
+    """'3f/a2'-style directory prefix for `key` (a complaint ID or file name)"""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return '/'.join(digest[i * WIDTH:(i + 1) * WIDTH] for i in range(LEVELS))
+
+
+def is_fanned(name):
+    parts = name.split('/')
+    return (
+        len(parts) > LEVELS + 1
+        and parts[0] in FANNED_ROOTS
+        and fanout(parts[LEVELS + 1]) == '/'.join(parts[1:LEVELS + 1])
+    )
+
+
+def fanned_name(name):
+    """The new-layout name for a legacy media name, or None"""
+    parts = name.split('/')
+    if len(parts) < 2 or parts[0] not in FANNED_ROOTS or is_fanned(name):
+        return None
+    return '/'.join([parts[0], fanout(parts[1]), *parts[1:]])
+
+
+def legacy_name(name):
+    """The flat-layout name for a fanned-out media name, or None"""
+    if not is_fanned(name):
+        return None
+    parts = name.split('/')
+    return '/'.join([parts[0], *parts[LEVELS + 1:]])
+
+
+def resolve(name, storage=default_storage):
+    """
+    Compatibility resolver: `name` if it exists, otherwise its counterpart
+    in the other layout if that exists, otherwise None. Covers links,
+    e-mails and sessions that still carry a pre-migration path.
+    """
+    if storage.exists(name):
+        return name
+    for candidate in (fanned_name(name), legacy_name(name)):
+        if candidate and storage.exists(candidate):
+            return candidate
+    return None
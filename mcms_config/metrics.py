@@ -0,0 +1,320 @@
+"""
+MCMS Metrics
+Counters and latency histograms exposed in Prometheus text format, with
+optional shared-directory aggregation across worker processes
+"""
+
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends import django as django_backend
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def metrics_settings():
+    config = {
+        'ENABLED': True,
+        'MULTIPROCESS_DIR': None,
+        'FLUSH_INTERVAL': 5,
+        'ALLOWED_IPS': ['127.0.0.1', '::1'],
+    }
+    config.update(getattr(settings, 'METRICS', {}))
+    return config
+
+
+class Registry:
+    """
+    Metric values of this process. In multi-process mode each process
+    periodically writes its values to <dir>/<pid>-<start>.json and the
+    /metrics view sums every file in the directory.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.values = {}
+        self.lock = threading.Lock()
+        self.file_id = f'{os.getpid()}-{time.time_ns()}'
+        self.last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def increment(self, key, amount):
+        with self.lock:
+            value = self.values.get(key)
+            if value is None:
+                value = self.values[key] = [0.0]
+            value[0] += amount
+
+    def observe(self, key, bucket, amount, size):
+        # Histogram layout: one slot per bucket plus +Inf, then sum and count
+        with self.lock:
+            slots = self.values.get(key)
+            if slots is None:
+                slots = self.values[key] = [0.0] * size
+            slots[bucket] += 1
+            slots[-2] += amount
+            slots[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {key: list(value) for key, value in self.values.items()}
+
+    def reset(self, name=None):
+        """Drop every value, or only those of one metric"""
+        with self.lock:
+            if name is None:
+                self.values.clear()
+            else:
+                for key in [key for key in self.values if key[0] == name]:
+                    del self.values[key]
+
+    # ---- multi-process files ------------------------------------------------
+
+    def _path(self, directory):
+        if os.getpid() != int(self.file_id.split('-')[0]):
+            # Forked worker: never write over the parent's file
+            self.file_id = f'{os.getpid()}-{time.time_ns()}'
+            self.reset()
+        return os.path.join(directory, f'{self.file_id}.json')
+
+    def flush(self, force=False):
+        directory = metrics_settings()['MULTIPROCESS_DIR']
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_flush < metrics_settings()['FLUSH_INTERVAL']:
+            return
+        self.last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        path = self._path(directory)
+        payload = [[name, labels, value] for (name, labels), value in self.snapshot().items()]
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+
+    def collect(self):
+        """Values summed over every process (or just this one)"""
+        directory = metrics_settings()['MULTIPROCESS_DIR']
+        if not directory:
+            return self.snapshot()
+        self.flush(force=True)
+        totals = {}
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            try:
+                with open(path) as f:
+                    rows = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in rows:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                current = totals.setdefault(key, [0.0] * len(value))
+                for i, amount in enumerate(value):
+                    current[i] += amount
+        return totals
+
+
+REGISTRY = Registry()
+atexit.register(lambda: REGISTRY.flush(force=True))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+    def key(self, labels):
+        return (self.name, tuple((name, str(labels.get(name, ''))) for name in self.labelnames))
+
+    def inc(self, amount=1, **labels):
+        REGISTRY.increment(self.key(labels), amount)
+
+
+class Histogram(Counter):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        REGISTRY.observe(
+            self.key(labels), bisect.bisect_left(self.buckets, value), value,
+            len(self.buckets) + 3,
+        )
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+REQUEST_LATENCY = Histogram(
+    'mcms_http_request_duration_seconds', 'Request latency by route',
+    ['route', 'method'],
+)
+REQUESTS = Counter(
+    'mcms_http_requests_total', 'Requests by route and status code',
+    ['route', 'method', 'status'],
+)
+DB_QUERY_LATENCY = Histogram(
+    'mcms_db_query_duration_seconds', 'SQL statement execution time',
+    ['alias'], buckets=DB_BUCKETS,
+)
+TEMPLATE_RENDER_LATENCY = Histogram(
+    'mcms_template_render_duration_seconds', 'Template render time',
+    ['template'],
+)
+EMAIL_SEND_LATENCY = Histogram(
+    'mcms_email_send_duration_seconds', 'Time spent sending email',
+    ['kind'],
+)
+CAPTCHA_RENDER_LATENCY = Histogram(
+    'mcms_captcha_render_duration_seconds', 'CAPTCHA image generation time',
+    buckets=DB_BUCKETS,
+)
+THUMBNAIL_RENDER_LATENCY = Histogram(
+    'mcms_thumbnail_render_duration_seconds', 'Evidence thumbnail generation time',
+)
+THUMBNAILS = Counter(
+    'mcms_thumbnails_total', 'Thumbnail requests by cache result', ['result'],
+)
+UPLOADS = Counter('mcms_uploads_total', 'Uploaded files by form field', ['field'])
+UPLOAD_BYTES = Counter('mcms_upload_bytes_total', 'Uploaded bytes by form field', ['field'])
+UPLOAD_REJECTIONS = Counter(
+    'mcms_upload_rejections_total', 'Uploads stopped while streaming', ['reason'],
+)
+LOGINS = Counter('mcms_logins_total', 'Login attempts by result', ['result'])
+STATUS_TRANSITIONS = Counter(
+    'mcms_complaint_status_transitions_total', 'Complaint status changes',
+    ['from_status', 'to_status'],
+)
+UPDATE_CONFLICTS = Counter(
+    'mcms_complaint_update_conflicts_total', 'Complaint edits refused because the row had changed',
+)
+VIEW_CACHE = Counter(
+    'mcms_view_cache_total', 'View data cache lookups by result (hit, stale, miss, wait)',
+    ['namespace', 'result'],
+)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs, extra=()):
+    pairs = [*pairs, *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if value != int(value) else f'{int(value)}'
+
+
+def render():
+    """All metrics in Prometheus text exposition format 0.0.4"""
+    values = REGISTRY.collect()
+    by_metric = {}
+    for (name, labels), value in sorted(values.items()):
+        by_metric.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, metric in REGISTRY.metrics.items():
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for labels, value in by_metric.get(name, []):
+            if metric.kind == 'counter':
+                lines.append(f'{name}{_labels(labels)} {_number(value[0])}')
+                continue
+            cumulative = 0
+            for bound, count in zip([*metric.buckets, '+Inf'], value):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                lines.append(f'{name}_bucket{_labels(labels, [("le", le)])} {_number(cumulative)}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(value[-2])}')
+            lines.append(f'{name}_count{_labels(labels)} {_number(value[-1])}')
+    return '\n'.join(lines) + '\n'
+
+
+# ---- instrumentation hooks ----------------------------------------------------
+
+def _time_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERY_LATENCY.observe(
+            time.perf_counter() - started, alias=context['connection'].alias
+        )
+
+
+def instrument_connection(connection):
+    # At the bottom of the stack: scoped wrappers (connection.execute_wrapper(),
+    # e.g. the query inspector) pop the last entry on exit, and a connection
+    # may be opened while one is active
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+def instrument_open_connections():
+    for connection in connections.all(initialized_only=True):
+        instrument_connection(connection)
+
+
+@receiver(connection_created)
+def _on_connection_created(sender, connection, **kwargs):
+    if metrics_settings()['ENABLED']:
+        instrument_connection(connection)
+
+
+@receiver(user_logged_in)
+def _on_login(sender, **kwargs):
+    LOGINS.inc(result='success')
+
+
+@receiver(user_login_failed)
+def _on_login_failed(sender, **kwargs):
+    LOGINS.inc(result='failure')
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        with TEMPLATE_RENDER_LATENCY.time(template=self.origin.template_name or '<string>'):
+            return super().render(context, request)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Django template backend that records render time per template"""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except django_backend.TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
@@ -0,0 +1,230 @@
+"""
+MCMS Middleware
+Per-request query counting, SQL timing, N+1 detection, request metrics and
+early answers for rejected uploads
+"""
+
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.db import connections
+from django.http import HttpResponseRedirect, JsonResponse
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger('mcms.queries')
+
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised (in dev/test) when a view runs more queries than its budget"""
+
+
+def query_budget(max_queries):
+    """
+    Declare a view's query budget next to its URL pattern:
+
+        path('dashboard/', query_budget(12)(views.admin_dashboard), name='dashboard')
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def fingerprint(sql):
+    """Normalise SQL so the same statement with different values compares equal"""
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _LITERAL_RE.sub('?', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that tallies queries for one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+
+def _inspector_settings():
+    config = {
+        'ENABLED': True,
+        'SAMPLE_RATE': 1.0,
+        'DEFAULT_BUDGET': 30,
+        'REPEAT_THRESHOLD': 5,
+        'RAISE': False,
+    }
+    config.update(getattr(settings, 'QUERY_INSPECTOR', {}))
+    return config
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return request.path
+    return match.view_name or match._func_path
+
+
+def _check(request, recorder, config):
+    match = getattr(request, 'resolver_match', None)
+    budget = getattr(match.func, 'query_budget', None) if match else None
+    if budget is None:
+        budget = config['DEFAULT_BUDGET']
+
+    view = _view_name(request)
+    repeated = recorder.repeated(config['REPEAT_THRESHOLD'])
+    over_budget = recorder.count > budget
+
+    if over_budget or repeated:
+        logger.warning(
+            '%s %s: %d queries (budget %d) in %.1fms%s',
+            request.method, view, recorder.count, budget, recorder.duration * 1000,
+            ''.join(f'\n  x{n} {sql[:200]}' for sql, n in repeated[:5]),
+        )
+    if over_budget and config['RAISE']:
+        raise QueryBudgetExceeded(
+            f'{view} ran {recorder.count} queries, budget is {budget}'
+        )
+
+
+@sync_and_async_middleware
+def query_inspector_middleware(get_response):
+    """
+    Record query count, SQL time and repeated statements per request and
+    report views that exceed their budget. Enabled on every request in
+    dev/test and on a sample of requests in production. Only synchronous
+    requests are inspected; under ASGI requests pass straight through.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return await get_response(request)
+        markcoroutinefunction(middleware)
+        return middleware
+
+    def middleware(request):
+        config = _inspector_settings()
+        if not config['ENABLED'] or random.random() >= config['SAMPLE_RATE']:
+            return get_response(request)
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = get_response(request)
+        request.query_stats = recorder
+        _check(request, recorder, config)
+        return response
+
+    return middleware
+
+
+def _record_request(request, response, elapsed):
+    from . import metrics
+
+    match = getattr(request, 'resolver_match', None)
+    # Unresolved paths share one label to keep cardinality bounded
+    route = match.view_name if match else 'unmatched'
+    metrics.REQUEST_LATENCY.observe(elapsed, route=route, method=request.method)
+    metrics.REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+
+    # Only count files a view actually parsed; never force parsing here
+    files = getattr(request, '_files', None)
+    if files:
+        for field, upload in files.items():
+            metrics.UPLOADS.inc(field=field)
+            metrics.UPLOAD_BYTES.inc(upload.size, field=field)
+    metrics.REGISTRY.flush()
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Per-route latency and status counts for mcms_config.metrics. SQL time
+    is recorded by a wrapper installed on every database connection.
+    """
+    from . import metrics
+
+    if not metrics.metrics_settings()['ENABLED']:
+        if iscoroutinefunction(get_response):
+            async def passthrough(request):
+                return await get_response(request)
+            markcoroutinefunction(passthrough)
+            return passthrough
+        return get_response
+
+    metrics.instrument_open_connections()
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = time.perf_counter()
+            response = await get_response(request)
+            _record_request(request, response, time.perf_counter() - started)
+            return response
+        markcoroutinefunction(middleware)
+        return middleware
+
+    def middleware(request):
+        started = time.perf_counter()
+        response = get_response(request)
+        _record_request(request, response, time.perf_counter() - started)
+        return response
+
+    return middleware
+
+
+def _upload_rejection(request):
+    if request.method != 'POST' or request.content_type != 'multipart/form-data':
+        return None
+    request.POST  # run the upload handlers now, before CSRF checks and views
+    rejection = getattr(request, 'upload_rejection', None)
+    if rejection is None:
+        return None
+    status, message = rejection
+    if request.accepts('text/html'):
+        # The rest of the form was not read: send the browser back to it
+        messages.error(request, message)
+        return HttpResponseRedirect(request.get_full_path())
+    return JsonResponse({'error': message}, status=status)
+
+
+@sync_and_async_middleware
+def upload_rejection_middleware(get_response):
+    """
+    Answer for uploads that mcms_config.uploadhandlers stopped mid-stream:
+    413/415 JSON for API clients, a redirect back with the reason for forms.
+    Must come after MessageMiddleware.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            response = await sync_to_async(_upload_rejection)(request)
+            return response or await get_response(request)
+        markcoroutinefunction(middleware)
+        return middleware
+
+    def middleware(request):
+        return _upload_rejection(request) or get_response(request)
+
+    return middleware
@@ -0,0 +1,96 @@
+"""
+Database routing for MCMS
+Sends reads of opted-in analytical views to a read-only SQLite alias
+"""
+
+import contextvars
+import os
+import sqlite3
+import time
+from functools import wraps
+
+from django.conf import settings
+
+_use_replica = contextvars.ContextVar('mcms_use_read_replica', default=False)
+
+
+def replica_settings():
+    return getattr(settings, 'READ_REPLICA', {})
+
+
+def snapshot_age():
+    """Seconds since the snapshot copy was refreshed (inf if missing)"""
+    path = replica_settings().get('SNAPSHOT_PATH')
+    try:
+        return time.time() - os.path.getmtime(path)
+    except (OSError, TypeError):
+        return float('inf')
+
+
+def replica_available():
+    """
+    Whether the replica may serve reads right now. A 'ro' replica reads the
+    live WAL database and is never stale; a 'snapshot' replica is only used
+    while younger than MAX_STALENESS seconds.
+    """
+    config = replica_settings()
+    mode = config.get('MODE', 'off')
+    if mode == 'ro':
+        return True
+    if mode == 'snapshot':
+        return snapshot_age() <= config.get('MAX_STALENESS', 60)
+    return False
+
+
+def refresh_snapshot():
+    """Copy the primary database into the snapshot file with the backup API"""
+    config = replica_settings()
+    target = str(config['SNAPSHOT_PATH'])
+    tmp = f'{target}.tmp'
+    source = sqlite3.connect(str(settings.DATABASES['default']['NAME']))
+    try:
+        dest = sqlite3.connect(tmp)
+        try:
+            source.backup(dest)
+        finally:
+            dest.close()
+    finally:
+        source.close()
+    os.replace(tmp, target)
+
+
+def use_read_replica(view_func):
+    """
+    View decorator: ORM reads made while the view runs (including template
+    rendering) go to the read replica when one is available
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """
+    Route reads to READ_REPLICA['ALIAS'] inside @use_read_replica views;
+    everything else, and every write, uses the default database
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and replica_available():
+            return replica_settings().get('ALIAS', 'readonly')
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Objects read from the replica must still be saved to the primary
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
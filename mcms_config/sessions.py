@@ -0,0 +1,99 @@
+"""
+Cached-DB Session Backend with Write Coalescing
+Reads sessions through the cache and skips the django_session UPDATE that
+SESSION_SAVE_EVERY_REQUEST would otherwise issue on every page view
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+KEY_PREFIX = 'mcms.sessions.cached_db'
+
+
+class SessionStore(CachedDBStore):
+    """
+    A save is written to the database only when
+
+    - the session is new or its key was cycled,
+    - the session data differs from what was loaded, or
+    - sliding expiry would move expire_date by SESSION_WRITE_THRESHOLD
+      seconds or more.
+
+    The stored expiry can therefore lag the cookie by up to the threshold.
+    A process-local SESSION_CACHE_ALIAS (LocMemCache) would let one worker
+    serve session data another one replaced, so with such a cache sessions
+    are read from and written to the database only, still coalesced, and
+    check_session_cache() warns about it.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        if isinstance(self._cache, LocMemCache):
+            self._cache = DummyCache('', {})
+        self._stored = None
+
+    def _digest(self, data):
+        return hashlib.sha1(self.serializer().dumps(data)).hexdigest()
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # Invalid cache keys on some backends; fall back to the database
+            entry = None
+
+        if entry is None:
+            s = self._get_session_from_db()
+            if not s:
+                self._stored = None
+                return {}
+            entry = {'data': self.decode(s.session_data), 'expire_date': s.expire_date}
+            self._cache.set(self.cache_key, entry, self.get_expiry_age(expiry=s.expire_date))
+
+        self._stored = (self._digest(entry['data']), entry['expire_date'])
+        return entry['data']
+
+    def _needs_write(self):
+        if self._stored is None or self.session_key is None:
+            return True
+        digest, expire_date = self._stored
+        if self._digest(self._session) != digest:
+            return True
+        threshold = getattr(settings, 'SESSION_WRITE_THRESHOLD', 300)
+        return self.get_expiry_date() - expire_date >= timedelta(seconds=threshold)
+
+    def save(self, must_create=False):
+        if not must_create and not self._needs_write():
+            return
+        # Skip CachedDBStore.save(): it caches the bare data dict
+        super(CachedDBStore, self).save(must_create)
+        expire_date = self.get_expiry_date()
+        self._cache.set(
+            self.cache_key,
+            {'data': self._session, 'expire_date': expire_date},
+            self.get_expiry_age(),
+        )
+        self._stored = (self._digest(self._session), expire_date)
+
+
+def check_session_cache(app_configs, **kwargs):
+    """System check: this engine reads sessions through the cache only when it is shared"""
+    if settings.SESSION_ENGINE != __name__:
+        return []
+    if not isinstance(caches[settings.SESSION_CACHE_ALIAS], (LocMemCache, DummyCache)):
+        return []
+    return [checks.Warning(
+        f"SESSION_CACHE_ALIAS '{settings.SESSION_CACHE_ALIAS}' is not shared between processes, so "
+        "sessions are not cached: every request reads its session from the database.",
+        hint='Point the cache at a shared backend such as Memcached or Redis (MCMS_CACHE_BACKEND).',
+        id='mcms.W001',
+    )]
@@ -3,7 +3,9 @@ Django settings for Municipal Complaint Management System (MCMS)
 Production-grade settings for Government e-Governance project
 """
 
+import json
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project
@@ -17,6 +19,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', '*']
 
+# True while running the test suite
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 
 # Application definition
 INSTALLED_APPS = [
@@ -35,12 +40,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mcms_config.middleware.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
+    'mcms_config.middleware.query_inspector_middleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'mcms_config.middleware.upload_rejection_middleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -48,7 +56,8 @@ ROOT_URLCONF = 'mcms_config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates plus per-template render timing (mcms_config.metrics)
+        'BACKEND': 'mcms_config.metrics.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -67,13 +76,74 @@ WSGI_APPLICATION = 'mcms_config.wsgi.application'
 
 
 # Database - SQLite3 for government compliance
+# mcms_config.db.sqlite applies WAL/busy_timeout/mmap pragmas per connection,
+# starts write transactions with BEGIN IMMEDIATE and retries SQLITE_BUSY
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'mcms_database.sqlite3',
+        'ENGINE': 'mcms_config.db.sqlite',
+        'NAME': os.environ.get('MCMS_DATABASE_PATH', BASE_DIR / 'mcms_database.sqlite3'),
+        'CONN_MAX_AGE': 600,  # reuse connections across requests
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'busy_retries': 5,
+            'busy_retry_delay': 0.05,
+        },
     }
 }
 
+# Read replica for heavy analytical views (mcms_config.routers.use_read_replica)
+#   'ro'       - read-only URI on the live WAL database; never stale
+#   'snapshot' - periodic copy refreshed by `manage.py refresh_read_snapshot`;
+#                ignored once older than MAX_STALENESS seconds
+#   'off'      - all reads go to the default database
+READ_REPLICA = {
+    'ALIAS': 'readonly',
+    'MODE': 'off' if TESTING else os.environ.get('MCMS_READ_REPLICA_MODE', 'ro'),
+    'MAX_STALENESS': int(os.environ.get('MCMS_READ_REPLICA_MAX_STALENESS', 60)),
+    'SNAPSHOT_PATH': BASE_DIR / 'mcms_database.snapshot.sqlite3',
+}
+
+DATABASES['readonly'] = {
+    **DATABASES['default'],
+    'NAME': (
+        f"file:{READ_REPLICA['SNAPSHOT_PATH']}?mode=ro"
+        if READ_REPLICA['MODE'] == 'snapshot'
+        else f"file:{DATABASES['default']['NAME']}?mode=ro"
+    ),
+    # A refreshed snapshot is a new file; do not hold the old one open
+    'CONN_MAX_AGE': 0 if READ_REPLICA['MODE'] == 'snapshot' else 600,
+    'OPTIONS': {
+        **DATABASES['default']['OPTIONS'],
+        # journal_mode and write locks are unavailable on a read-only connection
+        'pragmas': {'journal_mode': None},
+        'transaction_mode': 'DEFERRED',
+    },
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['mcms_config.routers.ReadReplicaRouter']
+
+
+# Cache - local memory by default; point at Memcached/Redis in production so
+# invalidation and single-flight locks are shared across worker processes
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('MCMS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('MCMS_CACHE_LOCATION', 'mcms-default'),
+    }
+}
+
+# View data cache (mcms_config.viewcache)
+VIEW_CACHE_TIMEOUT = 60  # seconds an entry is fresh
+VIEW_CACHE_STALE_GRACE = 30  # seconds an expired entry may be served during refresh
+VIEW_CACHE_LOCK_TIMEOUT = 10  # seconds a single-flight refresh lock is held
+
+# Department/category snapshot (departments.refdata); reloaded on version bump
+# or after this many seconds when workers do not share the cache
+REFDATA_MAX_AGE = 300
+
 
 # Password validation - Government grade security
 AUTH_PASSWORD_VALIDATORS = [
@@ -95,6 +165,27 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing (mcms_config.hashers). `manage.py calibrate_hashers --write`
+# times PBKDF2 and scrypt on this machine and stores the chosen algorithm and
+# costs in PASSWORD_HASHER_CALIBRATION. Hashes made with other parameters keep
+# verifying and are re-encoded with the preferred ones at the next login.
+PASSWORD_HASHER_CALIBRATION = Path(
+    os.environ.get('MCMS_HASHER_CALIBRATION', BASE_DIR / 'password_hashers.json')
+)
+PASSWORD_HASHING = {
+    'ALGORITHM': 'pbkdf2_sha256',  # or 'scrypt'
+    'PBKDF2_ITERATIONS': 600000,
+    'SCRYPT_WORK_FACTOR': 2 ** 14,
+    'SCRYPT_BLOCK_SIZE': 8,
+    'SCRYPT_PARALLELISM': 1,
+}
+if PASSWORD_HASHER_CALIBRATION.exists() and not TESTING:
+    _calibration = json.loads(PASSWORD_HASHER_CALIBRATION.read_text())
+    PASSWORD_HASHING.update({k: v for k, v in _calibration.items() if k in PASSWORD_HASHING})
+from mcms_config.hashers import password_hashers  # noqa: E402 (reads no settings at import)
+PASSWORD_HASHERS = password_hashers(PASSWORD_HASHING['ALGORITHM'])
+
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Asia/Kolkata'  # Indian Standard Time
@@ -107,6 +198,21 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Production collectstatic writes content-hashed names plus .gz/.br siblings
+# (mcms_config.storage); mcms_config.views.serve_static negotiates them
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'mcms_config.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+STATIC_IMMUTABLE_MAX_AGE = 31536000  # 1 year for fingerprinted assets
+
 # Media files (User uploaded content)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -120,6 +226,12 @@ AUTH_USER_MODEL = 'accounts.Citizen'
 # Session Settings - Enhanced security
 SESSION_COOKIE_AGE = 3600  # 1 hour
 SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are read through the cache and only written back when their data
+# changes or sliding expiry moves by SESSION_WRITE_THRESHOLD seconds. The
+# cache is only used when shared (MCMS_CACHE_BACKEND); with the local-memory
+# default sessions are read from the database and check mcms.W001 says so.
+SESSION_ENGINE = 'mcms_config.sessions'
+SESSION_WRITE_THRESHOLD = 300
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SECURE = False  # Set True in production with HTTPS
 
@@ -165,6 +277,44 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 # Allowed file extensions for complaint proof
 ALLOWED_UPLOAD_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.pdf']
 MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # 5MB
+# Multipart bodies are checked while streaming (mcms_config.uploadhandlers):
+# extension and magic bytes from the first chunk, MAX_UPLOAD_SIZE per file
+# and this per request (forms carry at most two files), aborting on failure
+MAX_UPLOAD_REQUEST_SIZE = 2 * MAX_UPLOAD_SIZE + 512 * 1024
+FILE_UPLOAD_HANDLERS = [
+    'mcms_config.uploadhandlers.ValidatingUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Resumable chunked uploads (complaints.uploads). Partial files are assembled
+# in TEMP_DIR, outside MEDIA_ROOT; with several workers it must be a directory
+# they share. `manage.py purge_uploads` (cron) removes abandoned ones.
+RESUMABLE_UPLOADS = {
+    'TEMP_DIR': os.environ.get('MCMS_UPLOAD_TEMP_DIR') or BASE_DIR / 'upload_tmp',
+    'MAX_CHUNK_SIZE': 1024 * 1024,  # clients choose any chunk size up to this
+    'MAX_AGE': 24 * 3600,  # seconds an upload may take to finish and be used
+}
+
+# Evidence thumbnails for the admin lists (adminpanel.thumbnails), rendered
+# on first view by WORKERS threads per process and cached on disk under ROOT.
+# First PDF pages are rendered when pypdfium2 is installed.
+THUMBNAILS = {
+    'ROOT': os.environ.get('MCMS_THUMBNAIL_DIR') or BASE_DIR / 'thumbnail_cache',
+    'SIZES': (160, 320),
+    'WORKERS': 2,
+    'MAX_PENDING': 16,  # renders queued per process before answering 503
+}
+
+# Batch complaint intake API (complaints.api.batch_intake)
+COMPLAINT_INTAKE_MAX_BATCH = 500
+
+# Complaints per ZIP download of proof files (adminpanel.views.proof_bundle);
+# archives are streamed, so this bounds download time rather than memory
+PROOF_BUNDLE_MAX_COMPLAINTS = 2000
+
+# Complaints per page of an officer's queue (adminpanel.views.my_queue)
+MY_QUEUE_PAGE_SIZE = 50
 
 # Login URLs
 LOGIN_URL = '/accounts/login/'
@@ -183,6 +333,30 @@ COMPLAINT_STATUS_CHOICES = [
     ('CLOSED', 'Closed'),
 ]
 
+# Query inspector (mcms_config.middleware) - per-view query budgets are
+# declared in urls.py with query_budget(); tests fail when one is exceeded
+QUERY_INSPECTOR = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0 if DEBUG or TESTING else 0.01,
+    'DEFAULT_BUDGET': 30,
+    'REPEAT_THRESHOLD': 5,  # identical statements per request flagged as N+1
+    'RAISE': TESTING,
+}
+
+# Prometheus metrics (mcms_config.metrics), scraped from /metrics by staff
+# users or the listed addresses/networks. With several worker processes set
+# MCMS_METRICS_DIR to a directory shared by all of them (and empty it on deploy).
+METRICS = {
+    'ENABLED': True,
+    'MULTIPROCESS_DIR': os.environ.get('MCMS_METRICS_DIR') or None,
+    'FLUSH_INTERVAL': 5,  # seconds between per-process snapshot writes
+    'ALLOWED_IPS': ['127.0.0.1', '::1', '10.0.0.0/8'],
+}
+
+# Admin dashboard live updates (Server-Sent Events, ASGI only)
+ADMIN_LIVE_POLL_INTERVAL = 2  # seconds between broadcaster polls
+ADMIN_LIVE_KEEPALIVE = 15  # seconds between keepalive comments
+
 # Department Choices
 DEPARTMENT_CHOICES = [
     ('WATER_SUPPLY', 'Water Supply'),
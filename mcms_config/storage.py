@@ -0,0 +1,56 @@
+"""
+Static file storage for MCMS
+Content-hashed filenames with pre-compressed .gz/.br siblings
+"""
+
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip siblings are written without it
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    collectstatic post-processor that writes fingerprinted files and, for
+    text assets, gzip and brotli variants next to each hashed file
+    """
+
+    compressible_extensions = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.map', '.html')
+    min_compress_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.endswith(self.compressible_extensions):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        """Write .gz (and .br when available) siblings that are smaller than the original"""
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < self.min_compress_size:
+            return
+
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data, quality=11)))
+
+        for suffix, compressed in variants:
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
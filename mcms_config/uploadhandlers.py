@@ -0,0 +1,114 @@
+"""
+Streaming Upload Validation
+Checks the type and size of each uploaded file while the request body is
+still arriving, and stops reading it as soon as a file is rejected
+"""
+
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+# Leading bytes of each allowed type. PDF readers accept the header anywhere
+# in the first KiB, so it is searched for there rather than at offset 0.
+MAGIC_BYTES = {
+    '.jpg': b'\xff\xd8\xff',
+    '.jpeg': b'\xff\xd8\xff',
+    '.png': b'\x89PNG\r\n\x1a\n',
+    '.pdf': b'%PDF-',
+}
+PDF_HEADER_WINDOW = 1024
+SNIFF_BYTES = PDF_HEADER_WINDOW
+
+
+def sniff(ext, head, complete=False):
+    """
+    Whether `head`, the first bytes of a file, matches its extension: True
+    or False, or None while more bytes are needed. `complete` means head is
+    the whole file. Allowed extensions without a known signature pass.
+    """
+    magic = MAGIC_BYTES.get(ext)
+    if magic is None:
+        return True
+    if ext == '.pdf':
+        if magic in head[:PDF_HEADER_WINDOW]:
+            return True
+        return False if complete or len(head) >= PDF_HEADER_WINDOW else None
+    if len(head) < len(magic):
+        return False if complete else None
+    return head.startswith(magic)
+
+
+def type_error():
+    return f'Invalid file type. Allowed types: {", ".join(settings.ALLOWED_UPLOAD_EXTENSIONS)}'
+
+
+def size_error():
+    return f'File size cannot exceed {settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB.'
+
+
+def content_error(ext):
+    return f'The file contents do not match its {ext} extension.'
+
+
+class ValidatingUploadHandler(FileUploadHandler):
+    """
+    First entry of FILE_UPLOAD_HANDLERS. Passes every chunk on unchanged to
+    the memory/temporary-file handlers after it, but rejects
+
+    - a request body larger than MAX_UPLOAD_REQUEST_SIZE, before reading it,
+    - a file whose extension is not in ALLOWED_UPLOAD_EXTENSIONS,
+    - a file whose first bytes do not match its extension, and
+    - a file that grows past MAX_UPLOAD_SIZE,
+
+    by recording request.upload_rejection and abandoning the rest of the
+    body. upload_rejection_middleware turns that into the response.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        limit = getattr(settings, 'MAX_UPLOAD_REQUEST_SIZE', None)
+        if limit and content_length and content_length > limit:
+            self._record(413, 'request_size', size_error())
+            # Returning (POST, FILES) skips parsing: the body is never read
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.ext = os.path.splitext(file_name)[1].lower()
+        self.head = b''
+        self.received = 0
+        self.sniffed = False
+        if self.ext not in settings.ALLOWED_UPLOAD_EXTENSIONS:
+            self.reject(415, 'type', type_error())
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.MAX_UPLOAD_SIZE:
+            self.reject(413, 'size', size_error())
+        if not self.sniffed:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            matches = sniff(self.ext, self.head)
+            if matches is False:
+                self.reject(415, 'content', content_error(self.ext))
+            self.sniffed = bool(matches)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not self.sniffed and not sniff(self.ext, self.head, complete=True):
+            self.reject(415, 'content', content_error(self.ext))
+        return None
+
+    def _record(self, status, reason, message):
+        from .metrics import UPLOAD_REJECTIONS
+
+        UPLOAD_REJECTIONS.inc(reason=reason)
+        if self.request is not None:
+            self.request.upload_rejection = (status, message)
+
+    def reject(self, status, reason, message):
+        self._record(status, reason, message)
+        # connection_reset: do not drain the remaining body
+        raise StopUpload(connection_reset=True)
@@ -4,10 +4,11 @@ Government-grade routing architecture
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
+from .views import metrics, serve_media, serve_static
 
 urlpatterns = [
     # Django Admin (for superuser only)
@@ -27,12 +28,24 @@ urlpatterns = [
     
     # Department Module
     path('departments/', include('departments.urls')),
+    
+    # Prometheus scrape endpoint (staff or internal addresses)
+    path('metrics', metrics, name='metrics'),
+]
+
+# Redirects pre-fan-out media paths (mcms_config.media_layout); serves the
+# files themselves only with DEBUG
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
 ]
 
-# Serve media files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+else:
+    # Collected, fingerprinted and pre-compressed assets (see mcms_config.storage)
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_static),
+    ]
 
 # Custom error handlers
 handler404 = 'mcms_config.views.error_404'
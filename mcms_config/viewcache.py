@@ -0,0 +1,150 @@
+"""
+View Data Cache
+Caches the expensive context data of read-mostly views, keyed per view and
+per parameter set, with signal-driven invalidation and single-flight refresh
+"""
+
+import hashlib
+import inspect
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+from mcms_config.metrics import REGISTRY, VIEW_CACHE
+
+OUTCOMES = ('hit', 'stale', 'miss', 'wait')
+
+
+def _cache():
+    return caches[getattr(settings, 'VIEW_CACHE_ALIAS', 'default')]
+
+
+def _record(namespace, outcome):
+    VIEW_CACHE.inc(namespace=namespace, result=outcome)
+
+
+def stats():
+    """
+    Per-namespace hit/stale/miss/wait counts of this process, read from
+    mcms_view_cache_total (summed over every worker at /metrics)
+    """
+    counts = {}
+    for (name, labels), value in REGISTRY.snapshot().items():
+        if name == VIEW_CACHE.name:
+            labels = dict(labels)
+            namespace = counts.setdefault(labels['namespace'], dict.fromkeys(OUTCOMES, 0))
+            namespace[labels['result']] = int(value[0])
+    return counts
+
+
+def reset_stats():
+    REGISTRY.reset(VIEW_CACHE.name)
+
+
+def _generation_key(namespace, scope=None):
+    if scope is None:
+        return f'viewcache:gen:{namespace}'
+    return f'viewcache:gen:{namespace}:{scope}'
+
+
+def _generation(cache, namespace, scope=None):
+    key = _generation_key(namespace, scope)
+    generation = cache.get(key)
+    if generation is None:
+        # Seed with the clock so an evicted generation never resurrects old entries
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def invalidate(namespace, scope=None):
+    """
+    Drop every cached entry of a view, or only those for one scope value
+    (e.g. a single department code)
+    """
+    cache = _cache()
+    key = _generation_key(namespace, scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def _entry_key(namespace, scope, params):
+    cache = _cache()
+    generation = _generation(cache, namespace)
+    if scope is not None:
+        generation = f'{generation}.{_generation(cache, namespace, scope)}'
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f'viewcache:{namespace}:{generation}:{digest}'
+
+
+def get_or_compute(namespace, params, compute, timeout=None, scope=None):
+    """
+    Return cached data for (namespace, params), computing it at most once
+    across workers. Expired entries are served stale to everyone except the
+    single worker that holds the refresh lock.
+    """
+    cache = _cache()
+    if timeout is None:
+        timeout = getattr(settings, 'VIEW_CACHE_TIMEOUT', 60)
+    grace = getattr(settings, 'VIEW_CACHE_STALE_GRACE', 30)
+    lock_timeout = getattr(settings, 'VIEW_CACHE_LOCK_TIMEOUT', 10)
+
+    key = _entry_key(namespace, scope, params)
+    lock_key = f'{key}:lock'
+
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None and entry[1] > now:
+        _record(namespace, 'hit')
+        return entry[0]
+
+    owns_lock = cache.add(lock_key, 1, lock_timeout)
+    if not owns_lock:
+        if entry is not None:
+            _record(namespace, 'stale')
+            return entry[0]
+
+        # Another worker is computing: wait briefly for its result
+        deadline = now + lock_timeout
+        while time.time() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None:
+                _record(namespace, 'wait')
+                return entry[0]
+
+    _record(namespace, 'miss')
+    try:
+        value = compute()
+        cache.set(key, (value, time.time() + timeout), timeout + grace)
+    finally:
+        if owns_lock:
+            cache.delete(lock_key)
+    return value
+
+
+def cached_data(namespace, timeout=None, scope_arg=None):
+    """
+    Decorator for functions that build view context data. Arguments form
+    the parameter set; `scope_arg` names the argument used for scoped
+    invalidation.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            scope = bound.arguments.get(scope_arg) if scope_arg else None
+            params = sorted(bound.arguments.items())
+            return get_or_compute(
+                namespace, params, lambda: func(*args, **kwargs),
+                timeout=timeout, scope=scope,
+            )
+        wrapper.uncached = func
+        return wrapper
+    return decorator
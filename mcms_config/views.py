@@ -1,8 +1,33 @@
 """
-Custom error handlers for MCMS
+Custom error handlers, static and media file serving and metrics for MCMS
 """
 
+import ipaddress
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified,
+    HttpResponsePermanentRedirect,
+)
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import serve, was_modified_since
+
+from . import media_layout
+from . import metrics as mcms_metrics
+
+# Matches the 12-character content hash ManifestStaticFilesStorage inserts
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/]+$')
+
+PRECOMPRESSED_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
 
 
 def error_404(request, exception):
@@ -13,3 +38,101 @@ def error_404(request, exception):
 def error_500(request):
     """Custom 500 error page"""
     return render(request, 'errors/500.html', status=500)
+
+
+def accepted_encodings(header):
+    """Content codings the client accepts (q > 0)"""
+    encodings = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:] or 0) == 0:
+                    continue
+            except ValueError:  # malformed q-value: treat as not acceptable
+                continue
+        if coding:
+            encodings.add(coding.lower())
+    return encodings
+
+
+def serve_static(request, path):
+    """
+    Serve collected static files, preferring a pre-compressed sibling that
+    matches Accept-Encoding. Fingerprinted names are cached as immutable.
+    """
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid static path')
+    if not os.path.isfile(fullpath):
+        raise Http404('Static file not found')
+
+    serve_path, content_encoding = fullpath, None
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    for coding, suffix in PRECOMPRESSED_VARIANTS:
+        if coding in accepted and os.path.isfile(fullpath + suffix):
+            serve_path, content_encoding = fullpath + suffix, coding
+            break
+
+    statobj = os.stat(serve_path)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), statobj.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(fullpath)
+        response = FileResponse(
+            open(serve_path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        response.headers.pop('Content-Disposition', None)
+        response['Last-Modified'] = http_date(statobj.st_mtime)
+        if content_encoding:
+            response['Content-Encoding'] = content_encoding
+
+    if HASHED_NAME_RE.search(path):
+        response['Cache-Control'] = f'public, max-age={settings.STATIC_IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=300'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def serve_media(request, path):
+    """
+    Redirect a media path from before the hashed directory layout to the
+    file's new place. In production nginx serves /media/ itself and hands
+    misses to this view (try_files $uri @django); only with DEBUG does it
+    serve the files' bytes too.
+    """
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        resolved = media_layout.resolve(name)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid media path')
+    if resolved is None:
+        raise Http404('Media file not found')
+    if resolved != name:
+        return HttpResponsePermanentRedirect(settings.MEDIA_URL + quote(resolved))
+    if not settings.DEBUG:
+        raise Http404('Media file not found')
+    return serve(request, name, document_root=settings.MEDIA_ROOT)
+
+
+def _internal_address(address):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        ip in ipaddress.ip_network(network, strict=False)
+        for network in mcms_metrics.metrics_settings()['ALLOWED_IPS']
+    )
+
+
+def metrics(request):
+    """Prometheus scrape endpoint, for staff users or internal addresses"""
+    user = getattr(request, 'user', None)
+    if not (user is not None and user.is_staff) and not _internal_address(request.META.get('REMOTE_ADDR', '')):
+        return HttpResponseForbidden('Forbidden')
+    return HttpResponse(mcms_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
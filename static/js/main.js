@@ -12,6 +12,8 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeDepartmentCategories();
     initializeConfirmDialogs();
     initializeFileUpload();
+    initializeResumableUploads();
+    initializeLiveDashboard();
 });
 
 // ===== Form Validation =====
@@ -165,6 +167,216 @@ function validateFileUpload(input) {
     return true;
 }
 
+// ===== Resumable Uploads =====
+// File inputs with data-resumable-upload send the file in chunks that
+// survive dropped connections; the form then submits only the token.
+const UPLOAD_CHUNK_SIZE = 256 * 1024;
+const UPLOAD_RETRIES = 8;
+
+function initializeResumableUploads() {
+    document.querySelectorAll('input[type="file"][data-resumable-upload]').forEach(input => {
+        const form = input.form;
+        const tokenInput = form && form.querySelector(`[name="${input.dataset.tokenField}"]`);
+        if (!tokenInput || !window.fetch || !window.Blob.prototype.slice) return;
+        
+        let pending = null;
+        form.addEventListener('submit', function(e) {
+            if (pending) {
+                e.preventDefault();
+                showAlert('Please wait until the file upload has finished.', 'info');
+            }
+        });
+        
+        input.addEventListener('change', function() {
+            const file = this.files && this.files[0];
+            tokenInput.value = '';
+            if (!file) return;
+            
+            const info = document.getElementById('file-info');
+            const report = text => { if (info) info.textContent = text; };
+            const csrf = form.querySelector('[name="csrfmiddlewaretoken"]');
+            
+            pending = resumableUpload(input.dataset.resumableUpload, file, csrf ? csrf.value : '', percent => {
+                report(`Uploading ${file.name}: ${percent}%`);
+            }).then(token => {
+                tokenInput.value = token;
+                // The file is on the server: do not post it again with the form
+                input.value = '';
+                report(`Uploaded: ${file.name}`);
+            }).catch(error => {
+                // Leave the file in the input so the form posts it the old way
+                console.error('Resumable upload failed:', error);
+                report(`Selected: ${file.name}`);
+            }).finally(() => {
+                pending = null;
+            });
+        });
+    });
+}
+
+function sleep(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+async function resumableUpload(createUrl, file, csrfToken, onProgress) {
+    const key = `mcms-upload:${createUrl}:${file.name}:${file.size}:${file.lastModified}`;
+    const headers = {'X-CSRFToken': csrfToken};
+    let upload = JSON.parse(localStorage.getItem(key) || 'null');
+    let offset = 0;
+    
+    // Resume an earlier attempt at the same file if the server still has it
+    if (upload) {
+        const response = await fetch(upload.location, {method: 'HEAD', credentials: 'same-origin'});
+        if (response.ok) {
+            offset = parseInt(response.headers.get('Upload-Offset'), 10);
+        } else {
+            upload = null;
+        }
+    }
+    if (!upload) {
+        const response = await fetch(createUrl, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: Object.assign({
+                'Upload-Length': String(file.size),
+                'Upload-Metadata': 'filename ' + btoa(unescape(encodeURIComponent(file.name)))
+            }, headers)
+        });
+        const data = await response.json();
+        if (response.status !== 201) {
+            showAlert(data.error || 'Upload rejected.', 'error');
+            throw new Error(data.error);
+        }
+        upload = {location: data.location, token: data.token, chunkSize: Math.min(UPLOAD_CHUNK_SIZE, data.max_chunk_size)};
+        localStorage.setItem(key, JSON.stringify(upload));
+    }
+    
+    let failures = 0;
+    while (offset < file.size) {
+        onProgress(Math.floor(offset * 100 / file.size));
+        let response;
+        try {
+            response = await fetch(upload.location, {
+                method: 'PATCH',
+                credentials: 'same-origin',
+                headers: Object.assign({
+                    'Upload-Offset': String(offset),
+                    'Content-Type': 'application/offset+octet-stream'
+                }, headers),
+                body: file.slice(offset, offset + upload.chunkSize)
+            });
+        } catch (networkError) {
+            response = null;
+        }
+        
+        if (response && (response.status === 204 || response.status === 409)) {
+            // 409: the server has a different offset (e.g. a lost response); continue from there
+            offset = parseInt(response.headers.get('Upload-Offset'), 10);
+            failures = 0;
+            continue;
+        }
+        if (response && response.status < 500) {
+            localStorage.removeItem(key);
+            throw new Error(`Upload failed with status ${response.status}`);
+        }
+        if (++failures > UPLOAD_RETRIES) {
+            throw new Error('Upload failed: connection lost');
+        }
+        // Back off, then ask the server how much it already has
+        await sleep(Math.min(30000, 500 * 2 ** failures));
+        try {
+            const head = await fetch(upload.location, {method: 'HEAD', credentials: 'same-origin'});
+            if (head.ok) offset = parseInt(head.headers.get('Upload-Offset'), 10);
+        } catch (networkError) {}
+    }
+    
+    localStorage.removeItem(key);
+    onProgress(100);
+    return upload.token;
+}
+
+// ===== Live Admin Dashboard (Server-Sent Events) =====
+function initializeLiveDashboard() {
+    const statsGrid = document.querySelector('[data-live-stream]');
+    
+    if (!statsGrid || !window.EventSource) return;
+    
+    const source = new EventSource(statsGrid.getAttribute('data-live-stream'));
+    
+    source.addEventListener('counters', function(e) {
+        const counters = JSON.parse(e.data);
+        Object.keys(counters).forEach(key => {
+            const el = document.querySelector(`[data-counter="${key}"]`);
+            if (el) {
+                el.textContent = counters[key];
+            }
+        });
+    });
+    
+    source.addEventListener('complaint', function(e) {
+        prependRecentComplaint(JSON.parse(e.data));
+    });
+}
+
+function prependRecentComplaint(complaint) {
+    const tbody = document.getElementById('recent-complaints');
+    if (!tbody) return;
+    
+    const statusClasses = {
+        'SUBMITTED': 'status-submitted',
+        'UNDER_REVIEW': 'status-review',
+        'IN_PROGRESS': 'status-progress',
+        'RESOLVED': 'status-resolved',
+        'CLOSED': 'status-closed'
+    };
+    
+    const row = document.createElement('tr');
+    const thumbCell = document.createElement('td');
+    if (complaint.proof_file) {
+        const img = document.createElement('img');
+        img.src = `/admin-panel/complaints/${encodeURIComponent(complaint.complaint_id)}/thumbnail/proof/`;
+        img.className = 'evidence-thumb';
+        img.width = img.height = 56;
+        img.alt = `Proof of ${complaint.complaint_id}`;
+        thumbCell.appendChild(img);
+    }
+    row.appendChild(thumbCell);
+    
+    const cells = [
+        complaint.complaint_id,
+        complaint.citizen__username,
+        complaint.subject,
+        complaint.department__name
+    ];
+    cells.forEach(text => {
+        const td = document.createElement('td');
+        td.textContent = text;
+        row.appendChild(td);
+    });
+    
+    const statusCell = document.createElement('td');
+    const badge = document.createElement('span');
+    badge.className = `status-badge ${statusClasses[complaint.status] || 'status-default'}`;
+    badge.textContent = complaint.status.replace('_', ' ');
+    statusCell.appendChild(badge);
+    row.appendChild(statusCell);
+    
+    const actionCell = document.createElement('td');
+    const link = document.createElement('a');
+    link.href = `/admin-panel/complaints/${encodeURIComponent(complaint.complaint_id)}/`;
+    link.className = 'btn btn-secondary';
+    link.textContent = 'View';
+    actionCell.appendChild(link);
+    row.appendChild(actionCell);
+    
+    // Drop the "No complaints yet" placeholder and keep the list at 10 rows
+    tbody.querySelectorAll('td[colspan]').forEach(td => td.parentElement.remove());
+    tbody.insertBefore(row, tbody.firstChild);
+    while (tbody.rows.length > 10) {
+        tbody.deleteRow(-1);
+    }
+}
+
 // ===== Confirm Dialogs =====
 function initializeConfirmDialogs() {
     const confirmBtns = document.querySelectorAll('[data-confirm]');
@@ -6,7 +6,7 @@ Tests core user flows: registration, login, complaint submission, AJAX category
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
-from io import BytesIO
+from io import BytesIO, StringIO
 
 from accounts.models import Citizen
 from departments.models import Department, ComplaintCategory
@@ -149,7 +149,7 @@ class ComplaintSubmissionTests(TestCase):
         self.client.login(username='complainant', password='TestPass123!')
         
         # Create a test file
-        file_content = b'Test PDF content for proof'
+        file_content = b'%PDF-1.4 Test PDF content for proof'
         uploaded_file = SimpleUploadedFile(
             'pothole_proof.pdf',
             file_content,
@@ -319,3 +319,1566 @@ class TemplateRenderingTests(TestCase):
         self.client.login(username='renderer', password='TestPass123!')
         response = self.client.get(reverse('complaints:dashboard'))
         self.assertEqual(response.status_code, 200)
+
+
+class AdminDashboardStreamTests(TestCase):
+    """Test live dashboard counters and the SSE endpoint"""
+    
+    def setUp(self):
+        self.dept = Department.objects.create(code='WATER_SUPPLY', name='Water Supply')
+        self.citizen = Citizen.objects.create_user(
+            username='streamer',
+            email='streamer@example.com',
+            mobile='9444444444',
+            password='TestPass123!'
+        )
+        self.staff = Citizen.objects.create_user(
+            username='control_room',
+            email='control@example.com',
+            mobile='9555555555',
+            password='TestPass123!',
+            is_staff=True
+        )
+    
+    def _complaint(self, **kwargs):
+        return Complaint.objects.create(
+            citizen=self.citizen,
+            department=self.dept,
+            subject='Low water pressure',
+            description='Water pressure has been low for the entire week.',
+            ward_number='4',
+            area='Old Town',
+            **kwargs
+        )
+    
+    def test_counters_and_deltas(self):
+        """Counters aggregate by status and deltas only carry changes"""
+        from adminpanel.live import dashboard_counters, diff_counters
+        
+        self._complaint()
+        self._complaint(status='RESOLVED')
+        counters = dashboard_counters()
+        self.assertEqual(counters['total'], 2)
+        self.assertEqual(counters['pending'], 1)
+        self.assertEqual(counters['resolved'], 1)
+        
+        self._complaint()
+        delta = diff_counters(counters, dashboard_counters())
+        self.assertEqual(delta, {'total': 3, 'pending': 2, 'status_submitted': 2})
+    
+    async def test_broadcaster_fans_out_new_complaints(self):
+        """One poll feeds every subscriber"""
+        from asgiref.sync import sync_to_async
+        from adminpanel.live import DashboardBroadcaster
+        
+        broadcaster = DashboardBroadcaster(interval=3600)
+        queues = [broadcaster.subscribe() for _ in range(3)]
+        await broadcaster.poll()
+        await sync_to_async(self._complaint)()
+        await broadcaster.poll()
+        
+        for queue in queues:
+            self.assertIn('event: counters', queue.get_nowait())
+            self.assertIn('event: counters', queue.get_nowait())
+            self.assertIn('Low water pressure', queue.get_nowait())
+        broadcaster._task.cancel()
+    
+    async def test_broadcaster_logs_failed_polls(self):
+        """A failing poll is logged and the loop carries on"""
+        from adminpanel.live import DashboardBroadcaster
+        
+        broadcaster = DashboardBroadcaster(interval=0)
+        queue = broadcaster.subscribe()
+        broadcaster._task.cancel()
+        
+        async def failing_poll():
+            broadcaster.unsubscribe(queue)  # end the loop after this round
+            raise RuntimeError('database is locked')
+        
+        broadcaster.poll = failing_poll
+        with self.assertLogs('mcms.live', level='ERROR') as logs:
+            await broadcaster._run()
+        self.assertIn('database is locked', logs.output[0])
+    
+    def test_stream_forbidden_for_citizens(self):
+        """Only staff may open the dashboard stream"""
+        self.client.login(username='streamer', password='TestPass123!')
+        response = self.client.get(reverse('adminpanel:dashboard_stream'))
+        self.assertEqual(response.status_code, 403)
+    
+    def test_stream_declines_under_wsgi(self):
+        """Under WSGI the stream answers 204 so EventSource stops retrying"""
+        self.client.login(username='control_room', password='TestPass123!')
+        response = self.client.get(reverse('adminpanel:dashboard_stream'))
+        self.assertEqual(response.status_code, 204)
+
+
+class ViewCacheTests(TestCase):
+    """Test cached view data, signal invalidation and single-flight refresh"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from mcms_config import viewcache
+        
+        cache.clear()
+        viewcache.reset_stats()
+        self.dept = Department.objects.create(code='ELECTRICITY', name='Electricity')
+    
+    def test_reports_hit_cache_until_complaint_saved(self):
+        """Second render is a cache hit; saving a complaint invalidates it"""
+        from mcms_config import viewcache
+        
+        staff = Citizen.objects.create_user(
+            username='analyst', email='analyst@example.com', mobile='9666666666',
+            password='TestPass123!', is_staff=True
+        )
+        self.client.login(username='analyst', password='TestPass123!')
+        self.client.get(reverse('adminpanel:reports'))
+        self.client.get(reverse('adminpanel:reports'))
+        self.assertEqual(viewcache.stats()['reports']['hit'], 1)
+        
+        Complaint.objects.create(
+            citizen=staff, department=self.dept, subject='Transformer sparking',
+            description='Transformer near the school sparks every evening.',
+            ward_number='2', area='School Road'
+        )
+        self.client.get(reverse('adminpanel:reports'))
+        self.assertEqual(viewcache.stats()['reports']['miss'], 2)
+        
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('mcms_view_cache_total{namespace="reports",result="hit"} 1', body)
+        self.assertIn('mcms_view_cache_total{namespace="reports",result="miss"} 2', body)
+    
+    def test_category_change_invalidates_only_its_department(self):
+        """Category saves are scoped to their department's detail page"""
+        from mcms_config import viewcache
+        
+        other = Department.objects.create(code='SANITATION', name='Sanitation')
+        self.client.get(reverse('departments:detail', args=[self.dept.code]))
+        self.client.get(reverse('departments:detail', args=[other.code]))
+        
+        ComplaintCategory.objects.create(department=self.dept, name='Street Lights')
+        response = self.client.get(reverse('departments:detail', args=[self.dept.code]))
+        self.client.get(reverse('departments:detail', args=[other.code]))
+        
+        self.assertIn(b'Street Lights', response.content)
+        self.assertEqual(viewcache.stats()['department_detail'], {'hit': 1, 'stale': 0, 'miss': 3, 'wait': 0})
+    
+    def test_expired_entry_served_stale_while_refresh_locked(self):
+        """Only the lock holder recomputes an expired key"""
+        from mcms_config import viewcache
+        
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            return len(calls)
+        
+        with self.settings(VIEW_CACHE_TIMEOUT=0):
+            self.assertEqual(viewcache.get_or_compute('probe', (), compute), 1)
+            key = viewcache._entry_key('probe', None, ())
+            viewcache._cache().add(f'{key}:lock', 1, 10)
+            self.assertEqual(viewcache.get_or_compute('probe', (), compute), 1)
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(viewcache.stats()['probe']['stale'], 1)
+
+
+class ReferenceDataSnapshotTests(TestCase):
+    """Test the in-process department/category snapshot"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        
+        cache.clear()
+        self.dept = Department.objects.create(code='PUBLIC_HEALTH', name='Public Health')
+        self.category = ComplaintCategory.objects.create(department=self.dept, name='Mosquito Breeding')
+    
+    def test_forms_render_and_validate_without_queries(self):
+        """Department choices come from the snapshot once it is warm"""
+        from complaints.forms import ComplaintFilterForm
+        from departments.refdata import get_snapshot
+        
+        get_snapshot()
+        with self.assertNumQueries(0):
+            form = ComplaintFilterForm(data={'department': 'PUBLIC_HEALTH'})
+            self.assertIn('Public Health', str(form['department']))
+            self.assertTrue(form.is_valid())
+            self.assertEqual(form.cleaned_data['department'], self.dept)
+            self.assertEqual(str(self.category), 'Public Health - Mosquito Breeding')
+    
+    def test_snapshot_reloads_when_version_changes(self):
+        """Saving a department bumps the version stamp"""
+        from departments.refdata import get_snapshot
+        
+        before = get_snapshot()
+        self.dept.is_active = False
+        self.dept.save()
+        after = get_snapshot()
+        
+        self.assertNotEqual(before.version, after.version)
+        self.assertEqual(after.active_departments, [])
+
+
+class StaticAssetPipelineTests(TestCase):
+    """Test hashed, pre-compressed static files and their serving path"""
+    
+    def test_collectstatic_writes_hashed_compressed_assets(self):
+        """Fingerprinted CSS gets a gzip sibling served with immutable caching"""
+        import gzip
+        import tempfile
+        from django.core.management import call_command
+        from django.test import RequestFactory, override_settings
+        from mcms_config.views import serve_static
+        
+        with tempfile.TemporaryDirectory() as static_root:
+            storages = {
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'mcms_config.storage.CompressedManifestStaticFilesStorage'},
+            }
+            with override_settings(STATIC_ROOT=static_root, STORAGES=storages):
+                call_command('collectstatic', interactive=False, verbosity=0)
+                from django.contrib.staticfiles.storage import staticfiles_storage
+                hashed = staticfiles_storage.stored_name('css/style.css')
+                
+                request = RequestFactory().get('/static/' + hashed, HTTP_ACCEPT_ENCODING='gzip, deflate')
+                response = serve_static(request, hashed)
+                body = b''.join(response.streaming_content)
+                response.close()
+            
+            self.assertRegex(hashed, r'^css/style\.[0-9a-f]{12}\.css$')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertIn(b'.stat-card', gzip.decompress(body))
+    
+    def test_identity_served_without_accept_encoding(self):
+        """Clients that do not accept gzip get the original bytes"""
+        import os
+        import tempfile
+        from django.test import RequestFactory, override_settings
+        from mcms_config.views import serve_static
+        
+        with tempfile.TemporaryDirectory() as static_root:
+            os.makedirs(os.path.join(static_root, 'js'))
+            for name, data in (('js/app.js', b'console.log(1);'), ('js/app.js.gz', b'gz')):
+                with open(os.path.join(static_root, name), 'wb') as fh:
+                    fh.write(data)
+            with override_settings(STATIC_ROOT=static_root):
+                response = serve_static(RequestFactory().get('/static/js/app.js'), 'js/app.js')
+                body = b''.join(response.streaming_content)
+                response.close()
+        
+        self.assertEqual(body, b'console.log(1);')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+    
+    def test_malformed_q_values_are_not_acceptable(self):
+        """A bad q-value drops that coding instead of failing the request"""
+        from mcms_config.views import accepted_encodings
+        self.assertEqual(accepted_encodings('gzip;q=abc, br;q=0.5, deflate;q=0'), {'br'})
+        self.assertEqual(accepted_encodings('gzip; q=, identity'), {'identity'})
+
+
+class TunedSQLiteBackendTests(TestCase):
+    """Test the pragmas and busy handling of mcms_config.db.sqlite"""
+    
+    def test_connection_pragmas_applied(self):
+        """Every new connection gets the tuned pragmas, busy_timeout from OPTIONS['timeout']"""
+        from django.db import connection
+        
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], connection.settings_dict['OPTIONS']['timeout'] * 1000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+    
+    def test_busy_timeout_precedence(self):
+        """An explicit busy_timeout pragma beats OPTIONS['timeout'], which beats the default"""
+        from django.db import connection
+        from mcms_config.db.sqlite.base import DatabaseWrapper
+        
+        def busy_timeout(**options):
+            wrapper = DatabaseWrapper({**connection.settings_dict, 'OPTIONS': options})
+            return wrapper.get_pragmas()['busy_timeout']
+        
+        self.assertEqual(busy_timeout(), 5000)
+        self.assertEqual(busy_timeout(timeout=2.5), 2500)
+        self.assertEqual(busy_timeout(timeout=2.5, pragmas={'busy_timeout': 100}), 100)
+    
+    def test_busy_errors_retried_with_backoff(self):
+        """SQLITE_BUSY is retried; other errors are raised immediately"""
+        import sqlite3
+        from mcms_config.db.sqlite.base import retry_busy
+        
+        attempts = []
+        
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise sqlite3.OperationalError('database is locked')
+            return 'ok'
+        
+        self.assertEqual(retry_busy(flaky, 5, 0.001), 'ok')
+        self.assertEqual(len(attempts), 3)
+        
+        def broken():
+            raise sqlite3.OperationalError('no such table: nope')
+        
+        with self.assertRaises(sqlite3.OperationalError):
+            retry_busy(broken, 5, 0.001)
+
+
+class ReadReplicaRouterTests(TestCase):
+    """Test routing of analytical reads to the read-only alias"""
+    
+    def test_reads_routed_only_inside_decorated_views(self):
+        """Reads go to the replica inside @use_read_replica; writes never do"""
+        from django.db import router
+        from django.test import override_settings
+        from mcms_config.routers import use_read_replica
+        
+        replica = {'ALIAS': 'readonly', 'MODE': 'ro', 'MAX_STALENESS': 60}
+        
+        @use_read_replica
+        def view(request):
+            return router.db_for_read(Complaint), router.db_for_write(Complaint)
+        
+        with override_settings(READ_REPLICA=replica):
+            self.assertEqual(view(None), ('readonly', 'default'))
+            self.assertEqual(router.db_for_read(Complaint), 'default')
+    
+    def test_stale_snapshot_falls_back_to_primary(self):
+        """A snapshot older than MAX_STALENESS is not used"""
+        import os
+        import tempfile
+        import time
+        from django.test import override_settings
+        from mcms_config.routers import replica_available
+        
+        with tempfile.NamedTemporaryFile() as snapshot:
+            replica = {'MODE': 'snapshot', 'MAX_STALENESS': 60, 'SNAPSHOT_PATH': snapshot.name}
+            with override_settings(READ_REPLICA=replica):
+                self.assertTrue(replica_available())
+                old = time.time() - 120
+                os.utime(snapshot.name, (old, old))
+                self.assertFalse(replica_available())
+
+
+class QueryInspectorTests(TestCase):
+    """Test per-request query counting and query budgets"""
+    
+    def test_fingerprint_collapses_values(self):
+        """Statements differing only in values share a fingerprint"""
+        from mcms_config.middleware import fingerprint
+        
+        self.assertEqual(
+            fingerprint('SELECT * FROM citizens WHERE id IN (%s, %s, %s)  AND age > 30'),
+            fingerprint("SELECT * FROM citizens WHERE id IN (%s) AND age > 41"),
+        )
+    
+    def test_view_over_budget_fails(self):
+        """A view that exceeds its declared budget raises under test"""
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from django.urls import ResolverMatch
+        from mcms_config.middleware import (
+            QueryBudgetExceeded, query_budget, query_inspector_middleware
+        )
+        
+        @query_budget(2)
+        def chatty_view(request):
+            for _ in range(3):
+                Department.objects.count()
+            return HttpResponse()
+        
+        request = RequestFactory().get('/chatty/')
+        request.resolver_match = ResolverMatch(chatty_view, (), {}, url_name='chatty')
+        middleware = query_inspector_middleware(lambda r: chatty_view(r))
+        
+        with self.assertRaises(QueryBudgetExceeded):
+            with self.assertLogs('mcms.queries', 'WARNING'):
+                middleware(request)
+    
+    def test_admin_complaint_detail_history_is_not_n_plus_one(self):
+        """History rows load their officer in the same query"""
+        dept = Department.objects.create(code='ROADS_TRANSPORT', name='Roads & Transport')
+        staff = Citizen.objects.create_user(
+            username='inspector', email='inspector@example.com', mobile='9777777777',
+            password='TestPass123!', is_staff=True
+        )
+        complaint = Complaint.objects.create(
+            citizen=staff, department=dept, subject='Broken divider',
+            description='Road divider broken near the bus depot junction.',
+            ward_number='7', area='Depot Road'
+        )
+        from complaints.models import ComplaintStatusHistory
+        for _ in range(8):
+            ComplaintStatusHistory.objects.create(
+                complaint=complaint, from_status='SUBMITTED',
+                to_status='UNDER_REVIEW', changed_by=staff
+            )
+        
+        self.client.login(username='inspector', password='TestPass123!')
+        response = self.client.get(reverse('adminpanel:complaint_detail', args=[complaint.complaint_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(response.wsgi_request.query_stats.count, 10)
+
+
+class SyntheticDataTests(TestCase):
+    """Test the synthetic data generator"""
+    
+    def generate(self, **options):
+        from django.core.management import call_command
+        defaults = dict(
+            citizens=30, officers=5, complaints=120, login_attempts=40,
+            seed=11, end='2026-06-30', days=90, batch_size=50, stdout=StringIO(),
+        )
+        defaults.update(options)
+        call_command('generate_synthetic_data', **defaults)
+    
+    def test_generates_requested_volumes(self):
+        """Rows are created for every model with consistent history"""
+        from accounts.models import LoginAttempt
+        from adminpanel.models import MunicipalOfficer
+        from complaints.models import ComplaintStatusHistory
+        self.generate(department_weights='WATER_SUPPLY=1,ROADS_TRANSPORT=0,SANITATION=0,ELECTRICITY=0,PUBLIC_HEALTH=0')
+        
+        self.assertEqual(Citizen.objects.filter(is_staff=False).count(), 30)
+        self.assertEqual(MunicipalOfficer.objects.count(), 5)
+        self.assertEqual(Complaint.objects.count(), 120)
+        self.assertEqual(LoginAttempt.objects.count(), 40)
+        self.assertEqual(set(Complaint.objects.values_list('department', flat=True)), {'WATER_SUPPLY'})
+        self.assertEqual(
+            ComplaintStatusHistory.objects.filter(from_status='').count(), 120
+        )
+        self.assertTrue(Citizen.objects.get(username='syn_0000000').check_password('Synthetic@123'))
+        resolved = Complaint.objects.filter(status='RESOLVED').first()
+        if resolved:
+            self.assertIsNotNone(resolved.resolved_at)
+            self.assertGreaterEqual(resolved.resolved_at, resolved.submitted_at)
+    
+    def test_same_seed_reproduces_data(self):
+        """Re-running with the same seed yields identical complaints"""
+        def snapshot():
+            return list(Complaint.objects.order_by('id').values_list(
+                'complaint_id', 'status', 'department', 'ward_number', 'submitted_at'
+            ))
+        
+        self.generate()
+        first = snapshot()
+        Complaint.objects.all().delete()
+        Citizen.objects.all().delete()
+        self.generate()
+        self.assertEqual(snapshot(), first)
+    
+    def test_rejects_no_citizens_and_skips_taken_mobiles(self):
+        """--citizens 0 is refused; generated users never reuse an existing mobile"""
+        from django.core.management.base import CommandError
+        with self.assertRaises(CommandError):
+            self.generate(citizens=0)
+        
+        Citizen.objects.create_user(
+            username='resident', email='resident@example.com', mobile='6000000001', password='TestPass123!'
+        )
+        self.generate(citizens=3, officers=2)
+        mobiles = list(Citizen.objects.values_list('mobile', flat=True))
+        self.assertEqual(len(mobiles), 6)
+        self.assertEqual(len(set(mobiles)), 6)
+
+
+class MetricsTests(TestCase):
+    """Test the Prometheus metrics endpoint"""
+    
+    def test_metrics_restricted_to_staff_or_internal_ip(self):
+        """External anonymous clients are refused; staff may scrape"""
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, 403)
+        
+        Citizen.objects.create_user(
+            username='scraper', email='scraper@example.com', mobile='9666666666',
+            password='TestPass123!', is_staff=True
+        )
+        self.client.login(username='scraper', password='TestPass123!')
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+    
+    def test_request_login_and_template_metrics_recorded(self):
+        """Route latency, logins, SQL and template timings are exported"""
+        Citizen.objects.create_user(
+            username='counted', email='counted@example.com', mobile='9555555555',
+            password='TestPass123!'
+        )
+        self.client.get(reverse('departments:list'))
+        self.client.login(username='counted', password='wrong-password')
+        
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('mcms_http_request_duration_seconds_count{route="departments:list",method="GET"}', body)
+        self.assertIn('mcms_logins_total{result="failure"}', body)
+        self.assertIn('mcms_db_query_duration_seconds_bucket{alias="default",le="+Inf"}', body)
+        self.assertIn('template="departments/list.html"', body)
+    
+    def test_multiprocess_files_are_summed(self):
+        """Snapshots written by other workers are added to this process's values"""
+        import json, os, tempfile
+        from django.test import override_settings
+        from mcms_config import metrics
+        
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, '1-1.json'), 'w') as f:
+                json.dump([['mcms_logins_total', [['result', 'success']], [5]]], f)
+            with override_settings(METRICS={'MULTIPROCESS_DIR': directory}):
+                before = metrics.REGISTRY.snapshot().get(
+                    ('mcms_logins_total', (('result', 'success'),)), [0]
+                )[0]
+                body = metrics.render()
+        self.assertIn(f'mcms_logins_total{{result="success"}} {int(before) + 5}', body)
+
+    
+    def test_connection_opened_inside_query_inspector(self):
+        """The timing wrapper stays below scoped wrappers, which remove only themselves"""
+        from django.db import connections
+        from mcms_config import metrics
+        from mcms_config.middleware import QueryRecorder
+        connection = connections.create_connection('default')
+        try:
+            with connection.execute_wrapper(QueryRecorder()):
+                connection.cursor().execute('SELECT 1')  # connects: connection_created fires here
+            self.assertEqual(connection.execute_wrappers, [metrics._time_query])
+        finally:
+            connection.close()
+
+
+class StartupImportTests(TestCase):
+    """Test that heavy optional modules stay out of worker boot"""
+    
+    def test_url_conf_does_not_import_pil(self):
+        """PIL is only imported once a CAPTCHA is rendered"""
+        import subprocess, sys
+        from django.conf import settings
+        script = (
+            "import os, sys; os.environ['DJANGO_SETTINGS_MODULE'] = 'mcms_config.settings'\n"
+            "import django; django.setup()\n"
+            "from django.urls import get_resolver; get_resolver().url_patterns\n"
+            "print('PIL' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        self.assertEqual(output, 'False')
+
+
+class SessionWriteCoalescingTests(TestCase):
+    """Test that unchanged sessions are not rewritten on every request"""
+    
+    def setUp(self):
+        Department.objects.create(code='WATER_SUPPLY', name='Water Supply')
+        Citizen.objects.create_user(
+            username='sessionuser', email='sessionuser@example.com', mobile='9444444444',
+            password='TestPass123!'
+        )
+        self.client.login(username='sessionuser', password='TestPass123!')
+    
+    def session_writes(self, path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(path)
+        return [
+            q['sql'] for q in ctx.captured_queries
+            if 'django_session' in q['sql'] and not q['sql'].startswith('SELECT')
+        ]
+    
+    def test_unchanged_session_is_not_written(self):
+        """Repeated page views with unchanged data skip the session UPDATE"""
+        self.session_writes(reverse('complaints:dashboard'))
+        for _ in range(3):
+            self.assertEqual(self.session_writes(reverse('complaints:dashboard')), [])
+    
+    def test_changed_data_and_expiry_threshold_write(self):
+        """Data changes always write; so does an expiry extension past the threshold"""
+        from django.test import override_settings
+        self.session_writes(reverse('complaints:dashboard'))
+        
+        # The login page stores a new CAPTCHA answer in the session
+        self.assertEqual(len(self.session_writes(reverse('accounts:refresh_captcha'))), 1)
+        
+        with override_settings(SESSION_WRITE_THRESHOLD=0):
+            self.assertEqual(len(self.session_writes(reverse('complaints:dashboard'))), 1)
+    
+    def test_process_local_cache_is_bypassed(self):
+        """With a LocMem session cache every worker reads the session from the database"""
+        from django.core.cache import caches
+        from django.conf import settings
+        from django.contrib.sessions.models import Session
+        from mcms_config.sessions import SessionStore
+        
+        store = SessionStore()
+        store['step'] = 1
+        store.save()
+        self.assertIsNone(caches[settings.SESSION_CACHE_ALIAS].get(store.cache_key))
+        
+        # Another worker replaces the data; the next request must not see the old copy
+        other = SessionStore(store.session_key)
+        other['step'] = 2
+        other.save()
+        self.assertEqual(Session.objects.get(pk=store.session_key).get_decoded(), {'step': 2})
+        self.assertEqual(SessionStore(store.session_key)['step'], 2)
+    
+    def test_unshared_session_cache_is_reported(self):
+        """System check mcms.W001 flags a session cache that is not shared; a shared one is used"""
+        import tempfile
+        from django.core.cache import caches
+        from django.test import override_settings
+        from mcms_config.sessions import SessionStore, check_session_cache
+        
+        self.assertEqual([w.id for w in check_session_cache(None)], ['mcms.W001'])
+        with tempfile.TemporaryDirectory() as directory:
+            shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}}
+            with override_settings(CACHES=shared):
+                self.assertEqual(check_session_cache(None), [])
+                # A shared cache is used as the read path again
+                store = SessionStore()
+                store['step'] = 1
+                store.save()
+                self.assertEqual(caches['default'].get(store.cache_key)['data'], {'step': 1})
+
+
+class CitizenImportTests(TestCase):
+    """Test the bulk citizen import command"""
+    
+    def run_import(self, content, suffix):
+        import os, tempfile
+        from django.core.management import call_command
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f'citizens{suffix}')
+            report = os.path.join(directory, 'errors.csv')
+            with open(path, 'w') as f:
+                f.write(content)
+            call_command('import_citizens', path, report=report, workers=1, stdout=StringIO())
+            with open(report) as f:
+                return f.read()
+    
+    def test_csv_import_reports_invalid_and_duplicate_rows(self):
+        """Valid rows are inserted; bad and duplicate rows land in the report"""
+        Citizen.objects.create_user(
+            username='existing', email='existing@example.com', mobile='9333333333',
+            password='TestPass123!'
+        )
+        report = self.run_import(
+            'username,email,mobile,password\n'
+            'ward_one,one@example.com,9000000001,Ward0ne!Secret\n'
+            'ward_two,two@example.com,9000000002,\n'
+            'bad name,bad@example.com,9000000003,\n'
+            'ward_three,existing@example.com,9000000004,\n'
+            'ward_two,other@example.com,9000000005,\n',
+            '.csv',
+        )
+        self.assertTrue(Citizen.objects.get(username='ward_one').check_password('Ward0ne!Secret'))
+        self.assertFalse(Citizen.objects.get(username='ward_two').has_usable_password())
+        self.assertEqual(Citizen.objects.count(), 3)
+        self.assertIn('4,bad name,username', report)
+        self.assertIn('5,ward_three,email,Email already registered.', report)
+        self.assertIn('6,ward_two,username,Duplicate of line 3 in this file.', report)
+    
+    def test_jsonl_import_accepts_prehashed_passwords(self):
+        """Django-encoded hashes are stored without rehashing"""
+        from django.contrib.auth.hashers import make_password
+        import json
+        encoded = make_password('Imported#Pass1')
+        report = self.run_import(
+            json.dumps({'username': 'hashed', 'email': 'hashed@example.com',
+                        'mobile': '8000000001', 'password_hash': encoded, 'is_verified': True}) + '\n'
+            + 'not json\n',
+            '.jsonl',
+        )
+        citizen = Citizen.objects.get(username='hashed')
+        self.assertEqual(citizen.password, encoded)
+        self.assertTrue(citizen.is_verified)
+        self.assertIn('2,,row,Invalid JSON', report)
+    
+    def test_conflicts_left_after_recheck_are_rejected_row_by_row(self):
+        """A batch that fails again after the re-check is inserted one row at a time"""
+        from unittest import mock
+        # Let the duplicate reach the INSERT, as a concurrent registration would
+        with mock.patch(
+            'accounts.management.commands.import_citizens.Command.check_uniqueness',
+            lambda self, rows: rows,
+        ):
+            report = self.run_import(
+                'username,email,mobile\n'
+                'first_in,same@example.com,9000000011\n'
+                'second_in,same@example.com,9000000012\n'
+                'third_in,third@example.com,9000000013\n',
+                '.csv',
+            )
+        self.assertEqual(
+            sorted(Citizen.objects.values_list('username', flat=True)), ['first_in', 'third_in']
+        )
+        self.assertIn('3,second_in,row,Conflicts with a citizen registered during the import.', report)
+
+
+class BatchIntakeApiTests(TestCase):
+    """Test the batch complaint intake API"""
+    
+    def setUp(self):
+        import base64
+        Department.objects.create(code='SANITATION', name='Sanitation')
+        self.operator = Citizen.objects.create_user(
+            username='callcentre', email='callcentre@example.com', mobile='9222222222',
+            password='TestPass123!', is_staff=True
+        )
+        self.resident = Citizen.objects.create_user(
+            username='resident', email='resident@example.com', mobile='9111111111',
+            password='TestPass123!'
+        )
+        token = base64.b64encode(b'callcentre:TestPass123!').decode()
+        self.auth = {'HTTP_AUTHORIZATION': f'Basic {token}'}
+        self.item = {
+            'department': 'SANITATION', 'ward_number': 'Ward 3', 'area': 'Market Road',
+            'subject': 'Garbage pile', 'description': 'Garbage has not been cleared for a week now.',
+            'citizen': '9111111111',
+        }
+    
+    def post(self, items, **headers):
+        import json
+        return self.client.post(
+            reverse('complaints:api_batch'), json.dumps({'complaints': items}),
+            content_type='application/json', **self.auth, **headers
+        )
+    
+    def test_batch_creates_valid_items_and_reports_invalid_ones(self):
+        """Valid items get IDs and history; invalid items carry form errors"""
+        from complaints.models import ComplaintStatusHistory
+        response = self.post([self.item, {**self.item, 'description': 'too short'}, self.item])
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data['created'], data['invalid']), (2, 1))
+        self.assertEqual(data['results'][1]['status'], 'invalid')
+        self.assertIn('description', data['results'][1]['errors'])
+        
+        created = [r['complaint_id'] for r in data['results'] if r['status'] == 'created']
+        self.assertEqual(len(set(created)), 2)
+        self.assertEqual(Complaint.objects.filter(citizen=self.resident).count(), 2)
+        self.assertEqual(
+            ComplaintStatusHistory.objects.filter(complaint__complaint_id__in=created, to_status='SUBMITTED').count(), 2
+        )
+    
+    def test_idempotency_key_replays_original_result(self):
+        """A retried batch returns the stored result without inserting again"""
+        first = self.post([self.item], HTTP_IDEMPOTENCY_KEY='kiosk-7-batch-42')
+        retry = self.post([self.item], HTTP_IDEMPOTENCY_KEY='kiosk-7-batch-42')
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Complaint.objects.count(), 1)
+        
+        other = self.post([self.item, self.item], HTTP_IDEMPOTENCY_KEY='kiosk-7-batch-42')
+        self.assertEqual(other.status_code, 422)
+    
+    def test_requires_authentication_and_staff_for_other_citizens(self):
+        """Anonymous calls are refused; citizens may only file for themselves"""
+        import base64, json
+        response = self.client.post(
+            reverse('complaints:api_batch'), json.dumps({'complaints': [self.item]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+        
+        token = base64.b64encode(b'resident:TestPass123!').decode()
+        self.auth = {'HTTP_AUTHORIZATION': f'Basic {token}'}
+        data = self.post([self.item]).json()
+        self.assertEqual(data['results'][0]['errors']['citizen'][0][:10], 'Only staff')
+
+
+class PasswordHasherCalibrationTests(TestCase):
+    """Test calibrated password hashers and the upgrade at login"""
+    
+    def setUp(self):
+        from django.contrib.auth.hashers import PBKDF2PasswordHasher
+        self.citizen = Citizen.objects.create_user(
+            username='hashcitizen', email='hash@example.com', mobile='9444444444'
+        )
+        # Stored before calibration, with fewer iterations than configured
+        self.citizen.password = PBKDF2PasswordHasher().encode('OldHash#Pass1', 'fixedsalt1234', 1000)
+        self.citizen.save()
+    
+    def login(self):
+        from django.contrib.auth import authenticate
+        user = authenticate(None, username='hashcitizen', password='OldHash#Pass1')
+        self.assertEqual(user, self.citizen)
+        self.citizen.refresh_from_db()
+        return self.citizen.password
+    
+    def test_login_rehashes_with_calibrated_iterations(self):
+        """A successful login re-encodes a hash with outdated parameters"""
+        from django.test import override_settings
+        with override_settings(PASSWORD_HASHING={'ALGORITHM': 'pbkdf2_sha256', 'PBKDF2_ITERATIONS': 2000}):
+            encoded = self.login()
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$2000$'))
+    
+    def test_login_moves_hash_to_preferred_scrypt(self):
+        """Switching the preferred algorithm upgrades old PBKDF2 hashes at login"""
+        from django.contrib.auth.hashers import check_password
+        from django.test import override_settings
+        from mcms_config.hashers import password_hashers
+        hashing = {'ALGORITHM': 'scrypt', 'SCRYPT_WORK_FACTOR': 2 ** 15, 'SCRYPT_PARALLELISM': 2}
+        with override_settings(PASSWORD_HASHING=hashing, PASSWORD_HASHERS=password_hashers('scrypt')):
+            encoded = self.login()
+            # n=2**15 needs more than OpenSSL's default 32 MiB
+            self.assertTrue(encoded.startswith('scrypt$32768$'))
+            self.assertEqual(encoded.split('$')[3:5], ['8', '2'])
+            self.assertTrue(check_password('OldHash#Pass1', encoded))
+    
+    def test_calibration_never_goes_below_defaults(self):
+        """An unreachable target falls back to Django's default costs"""
+        from django.core.management import call_command
+        import json
+        out = StringIO()
+        call_command('calibrate_hashers', target_ms=1, samples=1, json=True, stdout=out, stderr=StringIO())
+        calibration = json.loads(out.getvalue())['calibration']
+        self.assertEqual(calibration['ALGORITHM'], 'scrypt')
+        self.assertEqual(calibration['PBKDF2_ITERATIONS'], 600000)
+        self.assertEqual(calibration['SCRYPT_WORK_FACTOR'], 2 ** 14)
+        self.assertEqual(calibration['SCRYPT_PARALLELISM'], 1)
+        
+        out = StringIO()
+        call_command('calibrate_hashers', status=True, stdout=out)
+        self.assertIn('pbkdf2_sha256 iterations=1000  (re-hashed at next login)', out.getvalue())
+
+
+class ResumableUploadTests(TestCase):
+    """Test chunked, resumable proof uploads"""
+    
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        override = override_settings(RESUMABLE_UPLOADS={'TEMP_DIR': self.temp_dir.name, 'MAX_CHUNK_SIZE': 8})
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.user = Citizen.objects.create_user(
+            username='uploader', email='uploader@example.com', mobile='9555555555',
+            password='TestPass123!'
+        )
+        self.dept = Department.objects.create(code='WATER', name='Water Supply', description='Water')
+        self.client.login(username='uploader', password='TestPass123!')
+    
+    def create(self, filename, length):
+        import base64
+        return self.client.post(
+            reverse('complaints:upload_create'),
+            HTTP_UPLOAD_LENGTH=str(length),
+            HTTP_UPLOAD_METADATA='filename ' + base64.b64encode(filename.encode()).decode(),
+        )
+    
+    def patch(self, location, offset, chunk):
+        return self.client.patch(
+            location, chunk, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+    
+    def test_chunks_resume_and_attach_to_complaint(self):
+        """Chunks append at the server offset; the token then stands in for the file"""
+        from complaints.models import ChunkedUpload
+        content = b'%PDF-1.4 chunked proof'
+        created = self.create('proof.pdf', len(content))
+        self.assertEqual(created.status_code, 201)
+        location, token = created['Location'], created.json()['token']
+        
+        self.assertEqual(self.patch(location, 0, content[:8]).status_code, 204)
+        # A retry of the same chunk is refused with the offset to resume from
+        retry = self.patch(location, 0, content[:8])
+        self.assertEqual((retry.status_code, retry['Upload-Offset']), (409, '8'))
+        self.assertEqual(self.patch(location, 8, content[8:20]).status_code, 413)
+        self.assertEqual(self.client.head(location)['Upload-Offset'], '8')
+        for offset in (8, 16):
+            self.assertEqual(self.patch(location, offset, content[offset:offset + 8]).status_code, 204)
+        self.assertTrue(self.client.get(location).json()['complete'])
+        
+        response = self.client.post(reverse('complaints:submit'), {
+            'department': self.dept.pk, 'ward_number': '4', 'area': 'Market Road',
+            'subject': 'Broken pipe', 'description': 'Water has been leaking for three days now.',
+            'proof_upload': token,
+        })
+        self.assertEqual(response.status_code, 302)
+        complaint = Complaint.objects.get(citizen=self.user)
+        self.assertTrue(complaint.proof_file.name.endswith('proof.pdf'))
+        self.assertEqual(complaint.proof_file.read(), content)
+        complaint.proof_file.close()
+        self.assertFalse(ChunkedUpload.objects.exists())
+    
+    def test_invalid_uploads_are_refused_before_data_is_sent(self):
+        """Extension and declared size are checked at creation; tokens are per user"""
+        self.assertEqual(self.create('script.exe', 10).status_code, 400)
+        self.assertEqual(self.create('huge.jpg', 6 * 1024 * 1024).status_code, 413)
+        # The first chunk must start like the declared type
+        location = self.create('fake.png', 8)['Location']
+        self.assertEqual(self.patch(location, 0, b'GIF89a!!').status_code, 415)
+        
+        token = self.create('photo.jpg', 4).json()['token']
+        other = Citizen.objects.create_user(
+            username='other', email='other@example.com', mobile='9666666666', password='TestPass123!'
+        )
+        self.client.force_login(other)
+        self.assertEqual(self.client.head(reverse('complaints:upload_detail', args=[token])).status_code, 404)
+        response = self.client.post(reverse('complaints:submit'), {
+            'department': self.dept.pk, 'ward_number': '4', 'area': 'Market Road',
+            'subject': 'Broken pipe', 'description': 'Water has been leaking for three days now.',
+            'proof_upload': token,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('proof_file', response.context['form'].errors)
+
+
+class StreamingUploadValidationTests(TestCase):
+    """Test magic-byte sniffing and size limits while the upload streams"""
+    
+    def multipart_request(self, fields):
+        from django.test import RequestFactory
+        from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+        body = encode_multipart(BOUNDARY, fields)
+        return RequestFactory().generic('POST', '/complaints/submit/', body, content_type=MULTIPART_CONTENT)
+    
+    def test_mislabelled_file_stops_parsing_at_first_chunk(self):
+        """A .jpg that is not a JPEG is rejected and the rest of the body is left unread"""
+        request = self.multipart_request({
+            'proof_file': SimpleUploadedFile('photo.jpg', b'MZ\x90\x00 not a jpeg' * 100),
+            'subject': 'After the file',
+        })
+        self.assertNotIn('subject', request.POST)
+        self.assertNotIn('proof_file', request.FILES)
+        self.assertEqual(request.upload_rejection[0], 415)
+        
+        request = self.multipart_request({
+            'proof_file': SimpleUploadedFile('scan.pdf', b'%PDF-1.7\n' + b'0' * 100),
+            'subject': 'After the file',
+        })
+        self.assertEqual(request.POST['subject'], 'After the file')
+        self.assertEqual(request.FILES['proof_file'].size, 109)
+    
+    def test_size_limits_are_enforced_while_streaming(self):
+        """Files past MAX_UPLOAD_SIZE and bodies past MAX_UPLOAD_REQUEST_SIZE are cut off"""
+        from django.test import override_settings
+        png = b'\x89PNG\r\n\x1a\n' + b'\x00' * 2048
+        with override_settings(MAX_UPLOAD_SIZE=1024, MAX_UPLOAD_REQUEST_SIZE=None):
+            request = self.multipart_request({'proof_file': SimpleUploadedFile('big.png', png)})
+            self.assertNotIn('proof_file', request.FILES)
+            self.assertEqual(request.upload_rejection[0], 413)
+        with override_settings(MAX_UPLOAD_REQUEST_SIZE=1024):
+            request = self.multipart_request({'subject': 'x', 'proof_file': SimpleUploadedFile('big.png', png)})
+            self.assertEqual(len(request.POST), 0)
+            self.assertEqual(request.upload_rejection[0], 413)
+    
+    def test_rejected_upload_is_answered_before_the_view(self):
+        """Browsers are sent back to the form with the reason; API clients get 415"""
+        Citizen.objects.create_user(
+            username='sniffer', email='sniffer@example.com', mobile='9777777777', password='TestPass123!'
+        )
+        self.client.login(username='sniffer', password='TestPass123!')
+        data = {'proof_file': SimpleUploadedFile('proof.png', b'GIF89a fake'), 'subject': 'Pothole'}
+        response = self.client.post(reverse('complaints:submit'), data, follow=True)
+        self.assertRedirects(response, reverse('complaints:submit'))
+        self.assertContains(response, 'do not match its .png extension')
+        
+        data['proof_file'].seek(0)
+        response = self.client.post(reverse('complaints:submit'), data, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(Complaint.objects.exists())
+
+
+class MediaLayoutTests(TestCase):
+    """Test the hashed media layout, legacy path redirects and the migration command"""
+    
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.user = Citizen.objects.create_user(
+            username='fanout', email='fanout@example.com', mobile='9888888888', password='TestPass123!'
+        )
+        self.dept = Department.objects.create(code='ROADS', name='Roads', description='Roads')
+    
+    def legacy_complaint(self, filename, content):
+        import os
+        complaint = Complaint.objects.create(
+            citizen=self.user, department=self.dept, ward_number='2', area='Station Road',
+            subject='Pothole', description='A deep pothole near the station.',
+        )
+        name = f'complaints/{complaint.complaint_id}/{filename}'
+        path = os.path.join(self.media_root.name, *name.split('/'))
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(content)
+        Complaint.objects.filter(pk=complaint.pk).update(proof_file=name)
+        return complaint, name
+    
+    def test_new_uploads_use_hashed_directories(self):
+        """Upload paths carry two levels of hash directories above the complaint ID"""
+        from mcms_config.media_layout import fanout, is_fanned, legacy_name
+        complaint = Complaint.objects.create(
+            citizen=self.user, department=self.dept, ward_number='2', area='Station Road',
+            subject='Pothole', description='A deep pothole near the station.',
+            proof_file=SimpleUploadedFile('photo.jpg', b'\xff\xd8\xff photo'),
+        )
+        name = complaint.proof_file.name
+        self.assertEqual(name, f'complaints/{fanout(complaint.complaint_id)}/{complaint.complaint_id}/photo.jpg')
+        self.assertTrue(is_fanned(name))
+        self.assertEqual(legacy_name(name), f'complaints/{complaint.complaint_id}/photo.jpg')
+    
+    def test_command_moves_files_and_old_urls_redirect(self):
+        """Files are relinked and rows rewritten; the old URL then redirects"""
+        import os
+        from django.core.management import call_command
+        from django.http import Http404
+        from django.test import RequestFactory, override_settings
+        from mcms_config.media_layout import fanned_name, resolve
+        from mcms_config.views import serve_media
+        complaint, legacy = self.legacy_complaint('scan.pdf', b'%PDF-1.4 legacy')
+        os.makedirs(os.path.join(self.media_root.name, 'captcha'))
+        open(os.path.join(self.media_root.name, 'captcha', 'captcha_abc.png'), 'wb').close()
+        
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/media/' + legacy).status_code, 200)
+        out = StringIO()
+        call_command('migrate_media_layout', batch_size=1, stdout=out)
+        self.assertIn('Moved 1 complaint files and 1 CAPTCHA images', out.getvalue())
+        
+        complaint.refresh_from_db()
+        self.assertEqual(complaint.proof_file.name, fanned_name(legacy))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root.name, 'complaints', complaint.complaint_id)))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root.name, *fanned_name('captcha/captcha_abc.png').split('/'))))
+        
+        response = self.client.get('/media/' + legacy)
+        self.assertEqual((response.status_code, response['Location']), (301, '/media/' + fanned_name(legacy)))
+        with override_settings(DEBUG=True):
+            self.assertEqual(b''.join(self.client.get(response['Location']).streaming_content), b'%PDF-1.4 legacy')
+        # Without DEBUG the files themselves are left to the front-end server
+        with self.assertRaises(Http404):
+            serve_media(RequestFactory().get(response['Location']), fanned_name(legacy))
+        self.assertIsNone(resolve('complaints/missing.pdf'))
+        # A second run finds nothing left to move
+        call_command('migrate_media_layout', stdout=out)
+        self.assertIn('Moved 0 complaint files and 0 CAPTCHA images', out.getvalue())
+
+
+class ProofBundleTests(TestCase):
+    """Test the streamed ZIP download of complaint files"""
+    
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.dept = Department.objects.create(code='WATER', name='Water Supply')
+        self.citizen = Citizen.objects.create_user(
+            username='bundler', email='bundler@example.com', mobile='9121212121', password='TestPass123!'
+        )
+        self.staff = Citizen.objects.create_user(
+            username='inspector', email='inspector@example.com', mobile='9131313131',
+            password='TestPass123!', is_staff=True
+        )
+    
+    def _complaint(self, ward, **files):
+        return Complaint.objects.create(
+            citizen=self.citizen, department=self.dept, ward_number=ward, area='Market Road',
+            subject='Leak', description='Water has been leaking for three days now.', **files
+        )
+    
+    def test_archive_streams_files_and_manifest(self):
+        """Files are streamed chunk by chunk, JPEGs stored as-is, missing files noted"""
+        import csv
+        import os
+        import zipfile
+        from adminpanel.bundles import CHUNK_SIZE
+        photo = b'\xff\xd8\xff' + os.urandom(200 * 1024)
+        with_files = self._complaint('12', proof_file=SimpleUploadedFile('photo.jpg', photo))
+        gone = self._complaint('12', proof_file=SimpleUploadedFile('scan.pdf', b'%PDF-1.4 gone'))
+        gone.proof_file.storage.delete(gone.proof_file.name)
+        self._complaint('7', proof_file=SimpleUploadedFile('other.pdf', b'%PDF-1.4 other ward'))
+        
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('adminpanel:proof_bundle'), {'department': 'WATER', 'ward': '12'})
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        chunks = list(response.streaming_content)
+        self.assertLess(max(len(chunk) for chunk in chunks), CHUNK_SIZE + 1024)
+        
+        archive = zipfile.ZipFile(BytesIO(b''.join(chunks)))
+        self.assertEqual(archive.testzip(), None)
+        entry = archive.getinfo(f'{with_files.complaint_id}/proof/photo.jpg')
+        self.assertEqual(entry.compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(archive.read(entry), photo)
+        manifest = list(csv.DictReader(archive.read('manifest.csv').decode().splitlines()))
+        self.assertEqual([row['complaint_id'] for row in manifest], [with_files.complaint_id, gone.complaint_id])
+        self.assertEqual(manifest[0]['size'], str(len(photo)))
+        self.assertTrue(manifest[1]['note'].startswith('missing:'))
+    
+    def test_bundle_requires_staff_and_matching_files(self):
+        """Citizens are sent to the admin login; empty selections go back to the list"""
+        self.client.force_login(self.citizen)
+        self.assertTrue(self.client.get(reverse('adminpanel:proof_bundle'))['Location'].startswith('/admin-panel/login/'))
+        
+        self._complaint('3')
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('adminpanel:proof_bundle'), {'ward': '3', 'submitted_from': 'not-a-date'})
+        self.assertRedirects(
+            response, reverse('adminpanel:all_complaints') + '?ward=3&submitted_from=not-a-date',
+            fetch_redirect_response=False
+        )
+
+
+class EvidenceThumbnailTests(TestCase):
+    """Test cached thumbnails of complaint files in the admin lists"""
+    
+    def setUp(self):
+        import os
+        import tempfile
+        from django.test import override_settings
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(self.temp_dir.name, 'media'),
+            THUMBNAILS={'ROOT': os.path.join(self.temp_dir.name, 'thumbs')},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.dept = Department.objects.create(code='ROADS', name='Roads')
+        self.citizen = Citizen.objects.create_user(
+            username='snapper', email='snapper@example.com', mobile='9141414141', password='TestPass123!'
+        )
+        self.staff = Citizen.objects.create_user(
+            username='triage', email='triage@example.com', mobile='9151515151',
+            password='TestPass123!', is_staff=True
+        )
+        self.client.force_login(self.staff)
+    
+    def _complaint(self, upload):
+        return Complaint.objects.create(
+            citizen=self.citizen, department=self.dept, ward_number='5', area='Ring Road',
+            subject='Pothole', description='A deep pothole on the ring road.', proof_file=upload,
+        )
+    
+    def _jpeg(self, name):
+        from PIL import Image
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 900), 'orange').save(buffer, 'JPEG')
+        return SimpleUploadedFile(name, buffer.getvalue())
+    
+    def test_thumbnails_are_cached_by_content_and_long_lived(self):
+        """Identical photos share one cached thumbnail; versioned URLs are immutable"""
+        import os
+        from PIL import Image
+        first, second = self._complaint(self._jpeg('a.jpg')), self._complaint(self._jpeg('b.jpg'))
+        
+        response = self.client.get(reverse('adminpanel:all_complaints'))
+        url = f"{reverse('adminpanel:thumbnail', args=[first.complaint_id, 'proof'])}?v={int(first.last_updated.timestamp())}"
+        self.assertContains(response, url)
+        
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        thumbnail = Image.open(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(thumbnail.size, (160, 120))
+        
+        self.client.get(reverse('adminpanel:thumbnail', args=[second.complaint_id, 'proof']), {'size': '320'})
+        cached = [name for _, _, files in os.walk(os.path.join(self.temp_dir.name, 'thumbs')) for name in files]
+        self.assertEqual(len(cached), 2)  # 160 and 320 of the same content
+        
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+    
+    def test_pdfs_get_a_thumbnail_and_a_full_pool_sheds_load(self):
+        """PDFs render to a JPEG too; past MAX_PENDING queued renders the view answers 503"""
+        import os
+        from django.test import override_settings
+        complaint = self._complaint(SimpleUploadedFile('scan.pdf', b'%PDF-1.4 scanned notice'))
+        url = reverse('adminpanel:thumbnail', args=[complaint.complaint_id, 'proof'])
+        
+        with override_settings(THUMBNAILS={'ROOT': os.path.join(self.temp_dir.name, 'thumbs'), 'MAX_PENDING': 0}):
+            response = self.client.get(url)
+            self.assertEqual((response.status_code, response['Retry-After']), (503, '2'))
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=300')
+    
+    def test_pdf_thumbnail_shows_the_first_page(self):
+        """A one-page PDF is rendered, not replaced by the placeholder icon"""
+        from PIL import Image
+        buffer = BytesIO()
+        Image.new('RGB', (600, 800), 'navy').save(buffer, 'PDF')
+        complaint = self._complaint(SimpleUploadedFile('notice.pdf', buffer.getvalue()))
+        
+        response = self.client.get(reverse('adminpanel:thumbnail', args=[complaint.complaint_id, 'proof']))
+        thumbnail = Image.open(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(thumbnail.size, (120, 160))
+        red, green, blue = thumbnail.getpixel((60, 80))
+        self.assertTrue(blue > 100 and red < 40 and green < 40, (red, green, blue))
+
+
+class StatusTransitionTests(TestCase):
+    """Test conditional complaint updates and the status workflow"""
+    
+    def setUp(self):
+        self.dept = Department.objects.create(code='WATER', name='Water Supply')
+        self.citizen = Citizen.objects.create_user(
+            username='reporter', email='reporter@example.com', mobile='9161616161', password='TestPass123!'
+        )
+        self.staff = Citizen.objects.create_user(
+            username='officer_a', email='officer_a@example.com', mobile='9171717171',
+            password='TestPass123!', is_staff=True
+        )
+        self.complaint = Complaint.objects.create(
+            citizen=self.citizen, department=self.dept, ward_number='9', area='Lake View',
+            subject='No water', description='No water supply since yesterday morning.',
+        )
+        self.url = reverse('adminpanel:complaint_detail', args=[self.complaint.complaint_id])
+        self.client.force_login(self.staff)
+    
+    def form_data(self, response, **values):
+        form = response.context['form']
+        data = {name: value for name, value in form.initial.items() if value is not None and name != 'resolution_proof'}
+        data['officer'] = ''
+        data.update(values)
+        return data
+    
+    def test_stale_edit_is_refused_with_a_conflict(self):
+        """A second officer editing the version the first one already changed gets 409"""
+        from complaints.models import ComplaintStatusHistory
+        first = self.form_data(self.client.get(self.url), status='UNDER_REVIEW', official_remarks='Team assigned')
+        second = self.form_data(self.client.get(self.url), status='IN_PROGRESS', official_remarks='Overwrite')
+        
+        self.assertRedirects(self.client.post(self.url, first), self.url)
+        response = self.client.post(self.url, second)
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'updated by someone else', status_code=409)
+        
+        self.complaint.refresh_from_db()
+        self.assertEqual((self.complaint.status, self.complaint.official_remarks), ('UNDER_REVIEW', 'Team assigned'))
+        self.assertIsNotNone(self.complaint.reviewed_at)
+        self.assertEqual(list(ComplaintStatusHistory.objects.values_list('to_status', flat=True)), ['UNDER_REVIEW'])
+        
+        # The re-rendered form carries the current version, so resubmitting works
+        retry = self.form_data(response, status='IN_PROGRESS')
+        self.assertEqual(retry['version'], self.complaint.last_updated.isoformat())
+        self.assertRedirects(self.client.post(self.url, retry), self.url)
+    
+    def test_illegal_transitions_and_update_sql(self):
+        """Closed complaints are final; an update writes only the changed columns"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from complaints.transitions import IllegalTransition, update_complaint
+        with CaptureQueriesContext(connection) as queries:
+            update_complaint(self.complaint, {'status': 'CLOSED', 'subject': 'No water'}, user=self.staff)
+        update_sql = next(q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE'))
+        self.assertIn('"status" = 5', update_sql)  # STATUS_CODES['CLOSED']
+        self.assertIn('"closed_at"', update_sql)
+        self.assertNotIn('"subject"', update_sql)
+        self.assertIn('"last_updated" =', update_sql.split('WHERE')[1])
+        
+        with self.assertRaises(IllegalTransition):
+            update_complaint(self.complaint, {'status': 'IN_PROGRESS'}, user=self.staff)
+        response = self.client.get(self.url)
+        self.assertEqual([code for code, _ in response.context['form'].fields['status'].choices], ['CLOSED'])
+        response = self.client.post(self.url, self.form_data(response, status='IN_PROGRESS'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('status', response.context['form'].errors)
+
+
+class StatusCodeFieldTests(TestCase):
+    """Test statuses stored as small integers behind the name-based API"""
+    
+    def test_statuses_are_stored_as_codes_and_read_as_names(self):
+        """Rows hold SMALLINT codes; filters, values() and display use the names"""
+        from django.db import connection
+        from complaints.models import STATUS_CODES, ComplaintStatusHistory
+        dept = Department.objects.create(code='PARKS', name='Parks')
+        citizen = Citizen.objects.create_user(
+            username='coder', email='coder@example.com', mobile='9181818181', password='TestPass123!'
+        )
+        complaint = Complaint.objects.create(
+            citizen=citizen, department=dept, ward_number='3', area='Central Park',
+            subject='Broken bench', description='The bench near the gate is broken.', status='UNDER_REVIEW',
+        )
+        ComplaintStatusHistory.objects.create(complaint=complaint, from_status='', to_status='UNDER_REVIEW')
+        
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT status, typeof(status) FROM complaints WHERE id = %s', [complaint.pk])
+            self.assertEqual(cursor.fetchone(), (STATUS_CODES['UNDER_REVIEW'], 'integer'))
+            cursor.execute('SELECT from_status, to_status FROM complaint_status_history')
+            self.assertEqual(cursor.fetchone(), (0, STATUS_CODES['UNDER_REVIEW']))
+        
+        complaint = Complaint.objects.get(status__in=['UNDER_REVIEW', 'IN_PROGRESS'])
+        self.assertEqual((complaint.status, complaint.get_status_display()), ('UNDER_REVIEW', 'Under Review'))
+        self.assertEqual(list(Complaint.objects.values_list('status', flat=True)), ['UNDER_REVIEW'])
+        self.assertEqual(complaint.status_history.get().from_status, '')
+        with self.assertRaises(ValueError):
+            Complaint.objects.filter(status='PENDING').exists()
+
+
+class QueryPlanTests(TestCase):
+    """Test that the open-work queries keep using the partial indexes"""
+    
+    def setUp(self):
+        self.dept = Department.objects.create(code='ROADS', name='Roads')
+        self.citizen = Citizen.objects.create_user(
+            username='planner', email='planner@example.com', mobile='9191919191', password='TestPass123!'
+        )
+        self.staff = Citizen.objects.create_user(
+            username='officer_p', email='officer_p@example.com', mobile='9202020202',
+            password='TestPass123!', is_staff=True
+        )
+        for status, archived in [('SUBMITTED', False), ('IN_PROGRESS', False), ('RESOLVED', False),
+                                 ('CLOSED', False), ('SUBMITTED', True)]:
+            Complaint.objects.create(
+                citizen=self.citizen, department=self.dept, officer=self.staff, ward_number='4',
+                area='Ring Road', subject='Pothole', description='Deep pothole near the bus stop.',
+                status=status, is_archived=archived,
+            )
+    
+    def plan(self, queryset):
+        """EXPLAIN QUERY PLAN of a queryset, run with its parameters bound as in production"""
+        from django.db import connection
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+    
+    def test_open_queries_use_partial_indexes(self):
+        """Open work per department or officer reads the partial index, already in order"""
+        sql, params = Complaint.objects.open().query.sql_with_params()
+        self.assertIn('"status" < %s', sql)  # a range, usable with a bound parameter
+        self.assertEqual(Complaint.objects.open().count(), 2)
+        
+        plan = self.plan(Complaint.objects.open().filter(department=self.dept))
+        self.assertIn('USING INDEX complaints_open_dept_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        plan = self.plan(Complaint.objects.open().filter(department=self.dept).order_by())
+        self.assertIn('complaints_open_dept_idx', plan)  # the pending counts
+        plan = self.plan(Complaint.objects.open().filter(officer=self.staff).order_by('submitted_at'))
+        self.assertIn('USING INDEX complaints_open_officer_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+    
+    def test_dashboard_counts_from_open_queries(self):
+        """Pending and resolved counts, overall and per department, exclude archived complaints"""
+        from django.core.cache import cache
+        cache.clear()
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('adminpanel:dashboard'))
+        self.assertEqual(
+            (response.context['total_complaints'], response.context['pending_complaints'],
+             response.context['resolved_complaints']),
+            (4, 2, 2),
+        )
+        response = self.client.get(reverse('adminpanel:department_complaints', args=[self.dept.code]))
+        self.assertEqual(
+            (response.context['total'], response.context['pending'], response.context['resolved']), (4, 2, 2),
+        )
+        self.assertContains(response, 'Pending: 2')
+
+
+class OfficerQueueTests(TestCase):
+    """Test the officer's own queue of open complaints"""
+    
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        self.dept = Department.objects.create(code='LIGHTS', name='Street Lights')
+        citizen = Citizen.objects.create_user(
+            username='resident', email='resident@example.com', mobile='9212121212', password='TestPass123!'
+        )
+        self.officer, other = [
+            Citizen.objects.create_user(
+                username=name, email=f'{name}@example.com', mobile=mobile, password='TestPass123!', is_staff=True
+            )
+            for name, mobile in [('officer_q', '9222222222'), ('officer_r', '9232323232')]
+        ]
+        start = timezone.now() - timedelta(days=30)
+        rows = [
+            (self.officer, 'SUBMITTED', False, 0), (self.officer, 'IN_PROGRESS', False, 1),
+            (self.officer, 'UNDER_REVIEW', False, 1), (self.officer, 'SUBMITTED', False, 25),
+            (self.officer, 'IN_PROGRESS', False, 28),
+            (self.officer, 'RESOLVED', False, 2), (self.officer, 'SUBMITTED', True, 3), (other, 'SUBMITTED', False, 4),
+        ]
+        for officer, status, archived, day in rows:
+            complaint = Complaint.objects.create(
+                citizen=citizen, department=self.dept, officer=officer, ward_number='12', area='Bus Depot',
+                subject='Light out', description='The street light outside the depot is out.',
+                status=status, is_archived=archived,
+            )
+            # Two complaints share a timestamp, to exercise the id tie-break
+            Complaint.objects.filter(pk=complaint.pk).update(submitted_at=start + timedelta(days=day))
+        self.client.force_login(self.officer)
+    
+    def test_queue_pages_through_own_open_complaints(self):
+        """Oldest first, keyset pages with no gaps or repeats, counts per open status"""
+        from django.test import override_settings
+        expected = list(
+            Complaint.objects.filter(officer=self.officer, is_archived=False, status__lt='RESOLVED')
+            .order_by('submitted_at', 'id').values_list('complaint_id', flat=True)
+        )
+        self.assertEqual(len(expected), 5)
+        seen, after = [], ''
+        with override_settings(MY_QUEUE_PAGE_SIZE=2):
+            for _ in range(5):
+                data = self.client.get(reverse('adminpanel:my_queue_json'), {'after': after} if after else {}).json()
+                seen += [row['complaint_id'] for row in data['complaints']]
+                after = data['next']
+                if not after:
+                    break
+            self.assertEqual(seen, expected)
+            self.assertEqual(data['counts'], {'SUBMITTED': 2, 'UNDER_REVIEW': 1, 'IN_PROGRESS': 2})
+            self.assertEqual(data['total'], 5)
+            self.assertTrue(self.client.get(reverse('adminpanel:my_queue_json')).json()['complaints'][0]['overdue'])
+            
+            response = self.client.get(reverse('adminpanel:my_queue'), {'after': 'not-a-cursor'})
+            self.assertEqual([c.complaint_id for c in response.context['complaints']], expected[:2])
+            self.assertContains(response, 'Next page')
+    
+    def test_queue_page_query_seeks_the_open_officer_index(self):
+        """Later pages are an index range with no sort, whatever their depth"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.test import override_settings
+        with override_settings(MY_QUEUE_PAGE_SIZE=1):
+            cursor = self.client.get(reverse('adminpanel:my_queue_json')).json()['next']
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('adminpanel:my_queue_json'), {'after': cursor})
+        page_sql = next(q['sql'] for q in queries.captured_queries if 'ORDER BY "complaints"."submitted_at"' in q['sql'])
+        with connection.cursor() as db:
+            db.execute('EXPLAIN QUERY PLAN ' + page_sql)
+            plan = ' | '.join(row[-1] for row in db.fetchall())
+        self.assertIn('USING INDEX complaints_open_officer_idx (officer_id=? AND submitted_at>?)', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class ResolutionReportTests(TestCase):
+    """Test resolution-time percentiles from SQL histograms and their rollup"""
+    databases = {'default', 'readonly'}
+    
+    def setUp(self):
+        from datetime import timedelta
+        from django.db import connections
+        from django.utils import timezone
+        # The test replica shares the in-memory database: let it read rows
+        # the test transaction has not committed
+        with connections['readonly'].cursor() as cursor:
+            cursor.execute('PRAGMA read_uncommitted = 1')
+        self.dept = Department.objects.create(code='DRAINS', name='Drainage')
+        citizen = Citizen.objects.create_user(
+            username='timed', email='timed@example.com', mobile='9242424242', password='TestPass123!'
+        )
+        self.staff = Citizen.objects.create_user(
+            username='officer_t', email='officer_t@example.com', mobile='9252525252',
+            password='TestPass123!', is_staff=True
+        )
+        submitted = timezone.now() - timedelta(days=3)
+        self.day = timezone.localtime(submitted).date()
+        for hours in range(1, 11):
+            complaint = Complaint.objects.create(
+                citizen=citizen, department=self.dept, officer=self.staff, ward_number='7', area='Canal Street',
+                subject='Blocked drain', description='The drain outside the school is blocked.', status='RESOLVED',
+            )
+            Complaint.objects.filter(pk=complaint.pk).update(
+                submitted_at=submitted,
+                reviewed_at=submitted + timedelta(minutes=30),
+                resolved_at=submitted + timedelta(hours=hours),
+            )
+    
+    def test_percentiles_live_and_rolled_up(self):
+        """Nearest-rank percentiles within the bucket accuracy, the same before and after the rollup"""
+        from django.core.management import call_command
+        from adminpanel import analytics
+        live = analytics.resolution_times(self.day, self.day, 'department')
+        resolve = live['DRAINS']['resolve']
+        self.assertEqual(resolve['count'], 10)
+        for name, hours in [('median', 5), ('p90', 9), ('p99', 10)]:
+            self.assertAlmostEqual(resolve[name] / 3600, hours, delta=hours * 0.05)
+        self.assertAlmostEqual(live['DRAINS']['review']['median'], 1800, delta=90)
+        self.assertNotIn('close', live['DRAINS'])
+        
+        self.assertIsNone(analytics.rolled_up_range())
+        call_command('rollup_resolution_times', days=7, stdout=StringIO())
+        self.assertEqual(analytics.rolled_up_range(), (self.day, self.day))
+        self.assertEqual(analytics.resolution_times(self.day, self.day, 'department'), live)
+        self.assertEqual(
+            analytics.resolution_times(self.day, self.day, 'officer')[str(self.staff.pk)],
+            analytics.resolution_times(self.day, self.day, 'ward')['7'],
+        )
+    
+    def test_days_outside_the_rollup_are_read_live(self):
+        """Days before the rolled-up range count, and a later run leaves no gap in it"""
+        from datetime import timedelta
+        from django.core.management import call_command
+        from adminpanel import analytics
+        old_day = self.day - timedelta(days=30)
+        old = Complaint.objects.first()
+        Complaint.objects.filter(pk=old.pk).update(
+            submitted_at=old.submitted_at - timedelta(days=30),
+            resolved_at=old.resolved_at - timedelta(days=30),
+        )
+        live = analytics.resolution_times(old_day, self.day, 'department')
+        self.assertEqual(live['DRAINS']['resolve']['count'], 10)
+        
+        call_command('rollup_resolution_times', days=7, stdout=StringIO())
+        self.assertEqual(analytics.rolled_up_range(), (self.day, self.day))
+        self.assertEqual(analytics.resolution_times(old_day, self.day, 'department'), live)
+        
+        # Roll up only the old day, then a run too short to reach it
+        analytics.ResolutionTimeBucket.objects.all().delete()
+        analytics.rollup(old_day, old_day)
+        call_command('rollup_resolution_times', days=1, stdout=StringIO())
+        self.assertEqual(analytics.rolled_up_range(), (old_day, self.day))
+        self.assertEqual(analytics.resolution_times(old_day, self.day, 'department'), live)
+    
+    def test_report_reads_follow_the_read_replica(self):
+        """Inside @use_read_replica the report SQL runs on the replica alias"""
+        from django.db import connections
+        from django.test import override_settings
+        from django.test.utils import CaptureQueriesContext
+        from adminpanel import analytics
+        from mcms_config.routers import use_read_replica
+        
+        @use_read_replica
+        def view(request):
+            return analytics.resolution_times(self.day, self.day, 'department')
+        
+        replica = {'ALIAS': 'readonly', 'MODE': 'ro', 'MAX_STALENESS': 60}
+        with override_settings(READ_REPLICA=replica), CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['readonly']) as readonly:
+                self.assertEqual(view(None)['DRAINS']['resolve']['count'], 10)
+        self.assertEqual(primary.captured_queries, [])
+        self.assertTrue(any('WITH' in q['sql'] for q in readonly.captured_queries))
+    
+    def test_report_page_and_csv_export(self):
+        """The report shows hours per officer; the CSV carries the same numbers"""
+        import csv
+        self.client.force_login(self.staff)
+        url = reverse('adminpanel:resolution_report')
+        response = self.client.get(url, {'dimension': 'officer', 'submitted_from': 'bad', 'submitted_to': '2026-02-30'})
+        self.assertEqual(response.status_code, 200)
+        row, = response.context['rows']
+        self.assertEqual((row['label'], row['metrics'][1]['count']), ('officer_t', 10))
+        self.assertContains(response, 'officer_t')
+        
+        response = self.client.get(reverse('adminpanel:resolution_report_csv'), {'dimension': 'officer'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        header, line = csv.reader(StringIO(response.content.decode()))
+        self.assertEqual(header[:5], ['officer', 'label', 'review_count', 'review_median_hours', 'review_p90_hours'])
+        self.assertEqual(line[:2], [str(self.staff.pk), 'officer_t'])
+        self.assertEqual(line[header.index('resolve_count')], '10')
+        self.assertAlmostEqual(float(line[header.index('resolve_median_hours')]), 5, delta=0.25)
+        self.assertEqual(line[header.index('close_median_hours')], '')
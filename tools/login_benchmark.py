@@ -0,0 +1,140 @@
+"""
+Login throughput benchmark.
+
+Runs django.contrib.auth.authenticate() - user lookup plus one password
+verification, which is what every login and API call pays - in parallel
+worker processes against a scratch database, once per hasher, and reports
+logins per second in total and per core with p50/p95 latency.
+
+    python tools/login_benchmark.py --workers 4 --seconds 10
+    python tools/login_benchmark.py --algorithms scrypt --baseline
+
+Costs come from settings.PASSWORD_HASHING, i.e. the result of
+`manage.py calibrate_hashers --write` when one exists. --baseline adds
+Django's stock PBKDF2 parameters for comparison.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'Bench-Passw0rd!'
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def configurations(algorithms, baseline):
+    """(label, PASSWORD_HASHING) for every hasher to measure"""
+    from django.conf import settings
+    from mcms_config.hashers import DEFAULTS
+
+    configs = [
+        (algorithm, {**settings.PASSWORD_HASHING, 'ALGORITHM': algorithm})
+        for algorithm in algorithms
+    ]
+    if baseline:
+        configs.append(('django default', dict(DEFAULTS)))
+    return configs
+
+
+def worker(username, hashing, seconds, barrier, results):
+    from django.contrib.auth import authenticate
+    from django.test import override_settings
+    from mcms_config.hashers import password_hashers
+
+    latencies = []
+    with override_settings(PASSWORD_HASHING=hashing, PASSWORD_HASHERS=password_hashers(hashing['ALGORITHM'])):
+        authenticate(None, username=username, password=PASSWORD)  # warm up
+        barrier.wait()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            user = authenticate(None, username=username, password=PASSWORD)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if user is None:
+                raise RuntimeError(f'login failed for {username}')
+    results.put(latencies)
+
+
+def run(index, label, hashing, args):
+    from django.db import connections
+    from django.test import override_settings
+    from accounts.models import Citizen
+    from mcms_config.hashers import password_hashers
+
+    username = 'bench_' + label.replace(' ', '_')
+    with override_settings(PASSWORD_HASHING=hashing, PASSWORD_HASHERS=password_hashers(hashing['ALGORITHM'])):
+        user = Citizen(username=username, email=f'{username}@example.com',
+                       mobile=f'9{index:09d}', is_verified=True)
+        user.set_password(PASSWORD)
+        user.save()
+        encoded = user.password
+    connections.close_all()  # never share a connection across fork()
+
+    ctx = multiprocessing.get_context('fork')
+    barrier, results = ctx.Barrier(args.workers), ctx.Queue()
+    procs = [
+        ctx.Process(target=worker, args=(username, hashing, args.seconds, barrier, results))
+        for _ in range(args.workers)
+    ]
+    for proc in procs:
+        proc.start()
+    latencies = [ms for _ in procs for ms in results.get()]
+    for proc in procs:
+        proc.join()
+
+    cores = min(args.workers, os.cpu_count() or 1)
+    per_second = len(latencies) / args.seconds
+    return {
+        'hasher': label,
+        'parameters': encoded.split('$')[1] if hashing['ALGORITHM'] != 'scrypt'
+        else 'n={1} r={3} p={4}'.format(*encoded.split('$')),
+        'workers': args.workers,
+        'logins': len(latencies),
+        'logins_per_second': round(per_second, 1),
+        'logins_per_core_second': round(per_second / cores, 2),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+    }
+
+
+def main(args):
+    with tempfile.TemporaryDirectory(prefix='mcms-login-bench-') as tmp:
+        os.environ['MCMS_DATABASE_PATH'] = os.path.join(tmp, 'db.sqlite3')
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mcms_config.settings')
+        import django
+        django.setup()
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+
+        rows = []
+        for index, (label, hashing) in enumerate(configurations(args.algorithms, args.baseline)):
+            rows.append(run(index, label, hashing, args))
+            if not args.json:
+                row = rows[-1]
+                print(f"{row['hasher']:<16} {row['parameters']:<22} {row['logins']:6d} logins  "
+                      f"{row['logins_per_second']:7.1f}/s  {row['logins_per_core_second']:6.2f}/s/core  "
+                      f"p50 {row['p50_ms']:.0f}ms  p95 {row['p95_ms']:.0f}ms")
+        if args.json:
+            print(json.dumps({'cpus': os.cpu_count(), 'seconds': args.seconds, 'results': rows}, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--algorithms', nargs='+', choices=['pbkdf2_sha256', 'scrypt'],
+                        default=['pbkdf2_sha256', 'scrypt'])
+    parser.add_argument('--baseline', action='store_true', help="Also measure Django's stock PBKDF2")
+    parser.add_argument('--json', action='store_true')
+    main(parser.parse_args())
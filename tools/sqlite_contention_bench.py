@@ -0,0 +1,149 @@
+"""
+Multi-process SQLite write-contention benchmark.
+
+Simulates N gunicorn workers submitting complaints concurrently against one
+database file, once with stock Django SQLite settings (rollback journal,
+deferred transactions, a new connection per request, no retries) and once
+with the tuned settings of mcms_config.db.sqlite (WAL and pragmas, BEGIN
+IMMEDIATE, persistent connection, jittered SQLITE_BUSY retry).
+
+    python tools/sqlite_contention_bench.py --workers 8 --submissions 300
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcms_config.db.sqlite.base import DEFAULT_PRAGMAS, retry_busy  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE complaints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    complaint_id VARCHAR(50) UNIQUE NOT NULL,
+    subject VARCHAR(200) NOT NULL,
+    description TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    submitted_at TEXT NOT NULL
+);
+CREATE TABLE complaint_status_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    complaint_id INTEGER NOT NULL REFERENCES complaints (id),
+    to_status VARCHAR(20) NOT NULL,
+    changed_at TEXT NOT NULL
+);
+CREATE TABLE django_session (
+    session_key VARCHAR(40) PRIMARY KEY,
+    session_data TEXT NOT NULL,
+    expire_date TEXT NOT NULL
+);
+"""
+
+
+def connect(path, tuned):
+    if not tuned:
+        # Stock Django: 5s timeout, rollback journal, no pragmas
+        return sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn = sqlite3.connect(path, timeout=20, isolation_level=None)
+    for name, value in DEFAULT_PRAGMAS.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def submit(conn, worker, n, tuned):
+    """One complaint submission: session touch, id check, two inserts"""
+    complaint_id = f'MCMS-BENCH-{worker:03d}-{n:06d}'
+    conn.execute('BEGIN IMMEDIATE' if tuned else 'BEGIN')
+    try:
+        conn.execute('SELECT 1 FROM complaints WHERE complaint_id = ?', (complaint_id,)).fetchone()
+        cursor = conn.execute(
+            "INSERT INTO complaints (complaint_id, subject, description, status, submitted_at) "
+            "VALUES (?, ?, ?, 'SUBMITTED', datetime('now'))",
+            (complaint_id, 'Benchmark complaint', 'x' * 400),
+        )
+        conn.execute(
+            "INSERT INTO complaint_status_history (complaint_id, to_status, changed_at) "
+            "VALUES (?, 'SUBMITTED', datetime('now'))",
+            (cursor.lastrowid,),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO django_session VALUES (?, ?, datetime('now', '+1 hour'))",
+            (f'session-{worker}', 'x' * 200),
+        )
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def worker_main(path, worker, submissions, tuned, results):
+    ok = errors = 0
+    latencies = []
+    conn = connect(path, tuned) if tuned else None
+    for n in range(submissions):
+        started = time.perf_counter()
+        try:
+            if tuned:
+                retry_busy(submit, 8, 0.01, conn, worker, n, tuned)
+            else:
+                request_conn = connect(path, tuned)
+                try:
+                    submit(request_conn, worker, n, tuned)
+                finally:
+                    request_conn.close()
+            ok += 1
+        except sqlite3.OperationalError:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+    if conn is not None:
+        conn.close()
+    results.put((ok, errors, latencies))
+
+
+def run(label, tuned, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.sqlite3')
+        setup = sqlite3.connect(path)
+        setup.executescript(SCHEMA)
+        setup.close()
+
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(
+                target=worker_main, args=(path, i, args.submissions, tuned, results)
+            )
+            for i in range(args.workers)
+        ]
+        started = time.perf_counter()
+        for proc in procs:
+            proc.start()
+        collected = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - started
+
+    ok = sum(r[0] for r in collected)
+    errors = sum(r[1] for r in collected)
+    latencies = sorted(lat for r in collected for lat in r[2])
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(
+        f"{label:<7} ok={ok:<6} locked={errors:<5} {ok / elapsed:8.0f} writes/s "
+        f"p50={p50:7.2f}ms p99={p99:8.2f}ms elapsed={elapsed:.2f}s"
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--submissions', type=int, default=300, help='per worker')
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.submissions} submissions")
+    run('stock', False, args)
+    run('tuned', True, args)
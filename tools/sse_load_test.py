@@ -0,0 +1,122 @@
+"""
+Load test for the admin dashboard SSE stream.
+
+Opens N concurrent EventSource-style connections against a running ASGI
+server and reports connect latency, time to first event and event counts.
+
+    uvicorn mcms_config.asgi:application --port 8000
+    python tools/sse_load_test.py --connections 300 --duration 30 --sessionid <staff sessionid>
+
+Create a few complaints while it runs to watch 'complaint' events fan out.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+
+async def open_stream(args, stats):
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(args.host, args.port), timeout=10
+        )
+    except Exception as e:
+        stats['errors'].append(repr(e))
+        return
+
+    request = (
+        f"GET {args.path} HTTP/1.1\r\n"
+        f"Host: {args.host}:{args.port}\r\n"
+        "Accept: text/event-stream\r\n"
+        f"Cookie: sessionid={args.sessionid}\r\n"
+        "Connection: keep-alive\r\n\r\n"
+    )
+    writer.write(request.encode())
+    await writer.drain()
+
+    deadline = started + args.duration
+    first_event = None
+    try:
+        status_line = await asyncio.wait_for(reader.readline(), timeout=10)
+        if b' 200 ' not in status_line:
+            stats['errors'].append(status_line.decode(errors='replace').strip())
+            return
+        stats['connected'] += 1
+        stats['connect_times'].append(time.perf_counter() - started)
+
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                line = await asyncio.wait_for(reader.readline(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if not line:
+                break
+            if line.startswith(b'event:'):
+                name = line.split(b':', 1)[1].strip().decode()
+                stats['events'][name] = stats['events'].get(name, 0) + 1
+                if first_event is None:
+                    first_event = time.perf_counter() - started
+                    stats['first_event_times'].append(first_event)
+    except Exception as e:
+        stats['errors'].append(repr(e))
+    finally:
+        writer.close()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def main(args):
+    stats = {
+        'connected': 0,
+        'connect_times': [],
+        'first_event_times': [],
+        'events': {},
+        'errors': [],
+    }
+
+    tasks = []
+    for _ in range(args.connections):
+        tasks.append(asyncio.create_task(open_stream(args, stats)))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.connections)
+    await asyncio.gather(*tasks)
+
+    print(f"connections requested : {args.connections}")
+    print(f"connections opened    : {stats['connected']}")
+    print(f"errors                : {len(stats['errors'])}")
+    for label, values in (('connect', stats['connect_times']),
+                          ('first event', stats['first_event_times'])):
+        if values:
+            print(
+                f"{label:<22}: mean {statistics.mean(values) * 1000:.1f}ms "
+                f"p50 {percentile(values, 50) * 1000:.1f}ms "
+                f"p95 {percentile(values, 95) * 1000:.1f}ms "
+                f"p99 {percentile(values, 99) * 1000:.1f}ms"
+            )
+    for name, count in sorted(stats['events'].items()):
+        print(f"events[{name}]".ljust(22) + f": {count}")
+    for error in stats['errors'][:5]:
+        print('  ', error)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--path', default='/admin-panel/dashboard/stream/')
+    parser.add_argument('--sessionid', required=True, help='sessionid cookie of a staff user')
+    parser.add_argument('--connections', type=int, default=300)
+    parser.add_argument('--duration', type=float, default=30, help='seconds each connection stays open')
+    parser.add_argument('--ramp', type=float, default=2, help='seconds over which connections are opened')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,304 @@
+"""
+End-to-end view latency benchmark.
+
+Drives every page of accounts, complaints, departments and adminpanel
+through the Django test client against seeded datasets, recording
+p50/p95/p99 latency, query count and peak RSS per view. Results are
+written as JSON and compared against a stored baseline.
+
+    python tools/view_benchmark.py --sizes 10000 100000 1000000
+    python tools/view_benchmark.py --sizes 10000 --update-baseline
+
+Datasets are generated once with `manage.py generate_synthetic_data` into
+benchmarks/data/ and reused, migrated to the current schema before every
+run. Each view runs in its own process so peak
+RSS is attributable to that view. Exits with status 1 on regressions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, 'benchmarks', 'data')
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(ROOT, 'benchmarks', 'results.json')
+
+# (name, user, url) - user is None (anonymous), 'citizen' or 'staff'.
+# Only side-effect free GETs, so datasets stay identical between runs.
+CASES = [
+    ('accounts:register', None, '/accounts/register/'),
+    ('accounts:login', None, '/accounts/login/'),
+    ('accounts:refresh_captcha', None, '/accounts/refresh-captcha/'),
+    ('departments:list', None, '/departments/'),
+    ('departments:detail', None, '/departments/{department}/'),
+    ('complaints:dashboard', 'citizen', '/complaints/dashboard/'),
+    ('complaints:submit', 'citizen', '/complaints/submit/'),
+    ('complaints:detail', 'citizen', '/complaints/detail/{complaint_id}/'),
+    ('complaints:track', 'citizen', '/complaints/track/?complaint_id={complaint_id}'),
+    ('adminpanel:login', None, '/admin-panel/login/'),
+    ('adminpanel:dashboard', 'staff', '/admin-panel/dashboard/'),
+    ('adminpanel:all_complaints', 'staff', '/admin-panel/complaints/'),
+    ('adminpanel:all_complaints?status', 'staff', '/admin-panel/complaints/?status=IN_PROGRESS'),
+    ('adminpanel:all_complaints?search', 'staff', '/admin-panel/complaints/?search=pothole'),
+    ('adminpanel:complaint_detail', 'staff', '/admin-panel/complaints/{complaint_id}/'),
+    ('adminpanel:department_complaints', 'staff', '/admin-panel/department/{department}/'),
+    ('adminpanel:reports', 'staff', '/admin-panel/reports/'),
+    ('adminpanel:my_queue', 'staff', '/admin-panel/queue/'),
+    ('adminpanel:resolution_report', 'staff', '/admin-panel/reports/resolution/'),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def dataset_path(size, seed):
+    return os.path.join(DATA_DIR, f'mcms_{size}_s{seed}.sqlite3')
+
+
+def manage(db_path, *args):
+    env = dict(os.environ, MCMS_DATABASE_PATH=db_path)
+    subprocess.run([sys.executable, 'manage.py', *args], cwd=ROOT, env=env, check=True)
+
+
+def ensure_dataset(size, seed):
+    path = dataset_path(size, seed)
+    if os.path.exists(path):
+        # Seeded under older migrations: bring schema and data up to date
+        manage(path, 'migrate', '--verbosity', '0')
+        return path
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp = path + '.building'
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(tmp + suffix):
+            os.remove(tmp + suffix)
+    print(f'Building {size} complaint dataset in {tmp}', file=sys.stderr)
+    manage(tmp, 'migrate', '--verbosity', '0')
+    manage(
+        tmp, 'generate_synthetic_data',
+        '--complaints', str(size),
+        '--citizens', str(max(size // 10, 100)),
+        '--officers', str(max(size // 5000, 10)),
+        '--login-attempts', str(size // 2),
+        '--seed', str(seed),
+        '--end', '2026-01-31',
+        '--prefix', 'bench',
+    )
+    manage(tmp, 'shell', '-c', 'from django.db import connection; connection.cursor().execute("VACUUM")')
+    os.replace(tmp, path)
+    return path
+
+
+# ---- child process: benchmark one view against one dataset ---------------
+
+def run_case(name, requests, warmup, max_seconds):
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mcms_config.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    from accounts.models import Citizen
+    from complaints.models import Complaint
+    from mcms_config.middleware import QueryRecorder
+
+    setup_test_environment()
+    settings.QUERY_INSPECTOR = {**settings.QUERY_INSPECTOR, 'ENABLED': False}
+    # CAPTCHA images rendered by the login/register pages go to a scratch dir
+    media_root = tempfile.TemporaryDirectory()
+    settings.MEDIA_ROOT = media_root.name
+
+    _, user_kind, url = next(case for case in CASES if case[0] == name)
+    complaint = Complaint.objects.filter(citizen__username__startswith='bench_').order_by('id').first()
+    url = url.format(complaint_id=complaint.complaint_id, department=complaint.department_id)
+
+    client = Client()
+    if user_kind == 'citizen':
+        client.force_login(complaint.citizen)
+    elif user_kind == 'staff':
+        client.force_login(Citizen.objects.filter(is_staff=True, username__startswith='bench_').first())
+
+    def measure():
+        recorder = QueryRecorder()
+        wrappers = [connections[alias].execute_wrapper(recorder) for alias in connections]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        started = time.perf_counter()
+        try:
+            response = client.get(url)
+        finally:
+            elapsed = time.perf_counter() - started
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        return elapsed, recorder.count, response.status_code
+
+    cache.clear()
+    cold_latency, cold_queries, _ = measure()
+    for _ in range(warmup if cold_latency < max_seconds / 10 else 0):
+        measure()
+
+    latencies, queries, statuses = [], [], set()
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(requests):
+        # Very slow views stop early but keep enough samples for percentiles
+        if len(latencies) >= 3 and time.perf_counter() > deadline:
+            break
+        elapsed, count, status = measure()
+        latencies.append(elapsed * 1000)
+        queries.append(count)
+        statuses.add(status)
+
+    return {
+        'url': url,
+        'status': sorted(statuses),
+        'requests': len(latencies),
+        'cold_ms': round(cold_latency * 1000, 2),
+        'cold_queries': cold_queries,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'queries': max(queries),
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        'peak_rss_mb': round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1
+        ),
+    }
+
+
+# ---- parent process ------------------------------------------------------
+
+def benchmark(size, args):
+    path = ensure_dataset(size, args.seed)
+    results = {}
+    for name, _, _ in CASES:
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        env = dict(os.environ, MCMS_DATABASE_PATH=path, MCMS_READ_REPLICA_MODE='ro')
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--case', name,
+             '--requests', str(args.requests), '--warmup', str(args.warmup),
+             '--max-seconds', str(args.max_seconds)],
+            cwd=ROOT, env=env, capture_output=True, text=True, timeout=args.timeout,
+        )
+        if proc.returncode != 0:
+            results[name] = {'error': proc.stderr.strip().splitlines()[-1:]}
+        else:
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        row = results[name]
+        if 'error' in row:
+            print(f'{size:>8} {name:<38} ERROR {row["error"]}', file=sys.stderr)
+        else:
+            print(
+                f'{size:>8} {name:<38} p50 {row["p50_ms"]:8.1f}ms p95 {row["p95_ms"]:8.1f}ms '
+                f'p99 {row["p99_ms"]:8.1f}ms q {row["queries"]:3d} rss {row["peak_rss_mb"]:6.1f}MB '
+                f'{row["status"]}',
+                file=sys.stderr,
+            )
+    return results
+
+
+def compare(results, baseline, tolerance, rss_tolerance):
+    """Regressions of results against the baseline, as readable strings"""
+    regressions = []
+    for size, views in results.items():
+        for name, row in views.items():
+            base = baseline.get(size, {}).get(name)
+            if not base or 'error' in base:
+                continue
+            if 'error' in row:
+                regressions.append(f'{size} {name}: now fails ({row["error"]})')
+                continue
+            if row['queries'] > base['queries']:
+                regressions.append(f'{size} {name}: queries {base["queries"]} -> {row["queries"]}')
+            for metric in ('p50_ms', 'p95_ms'):
+                # Absolute floor keeps sub-millisecond noise from failing the run
+                limit = base[metric] * (1 + tolerance) + 2
+                if row[metric] > limit:
+                    regressions.append(f'{size} {name}: {metric} {base[metric]} -> {row[metric]}')
+            if row['peak_rss_mb'] > base['peak_rss_mb'] * (1 + rss_tolerance):
+                regressions.append(
+                    f'{size} {name}: peak_rss_mb {base["peak_rss_mb"]} -> {row["peak_rss_mb"]}'
+                )
+    return regressions
+
+
+def main(args):
+    results = {str(size): benchmark(size, args) for size in args.sizes}
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'requests_per_view': args.requests,
+        'seed': args.seed,
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f'Results written to {args.output}', file=sys.stderr)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.setdefault('results', {}).update(results)
+        baseline.update({k: v for k, v in report.items() if k != 'results'})
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f'Baseline updated: {args.baseline}', file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline to compare against', file=sys.stderr)
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance, args.rss_tolerance)
+    for line in regressions:
+        print(f'REGRESSION {line}', file=sys.stderr)
+    if not regressions:
+        print('No regressions against baseline', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='dataset sizes in complaints')
+    parser.add_argument('--requests', type=int, default=30, help='measured requests per view')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=60,
+                        help='stop measuring a view after this long (minimum 3 requests)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', nargs='*', help='only views whose name contains one of these')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='merge these results into the baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative latency increase before flagging')
+    parser.add_argument('--rss-tolerance', type=float, default=0.20)
+    parser.add_argument('--timeout', type=float, default=1800, help='seconds per view')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.requests, args.warmup, args.max_seconds)))
+    else:
+        sys.exit(main(args))